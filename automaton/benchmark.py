@@ -0,0 +1,26 @@
+'''
+Benchmark.
+'''
+
+import sys
+from argparse import ArgumentParser
+from benchmarks.benchmarks import Benchmarks
+
+parser = ArgumentParser(description='Mede o desempenho do subsistema de autômatos.')
+parser.add_argument('--scale', type=int, default=1, help='multiplica os parâmetros das famílias')
+parser.add_argument('--seed', type=int, default=0, help='semente dos geradores')
+parser.add_argument('--repeat', type=int, default=3, help='repetições de cada medição')
+parser.add_argument('--no-memory', action='store_true', help='não mede o pico de memória (mais rápido)')
+parser.add_argument('--output', help='grava os resultados em JSON')
+parser.add_argument('--baseline', help='compara com os resultados de uma execução anterior')
+parser.add_argument('--threshold', type=float, default=1.25, help='razão a partir da qual há regressão')
+arguments = parser.parse_args()
+
+benchmarks = Benchmarks(arguments.seed, arguments.repeat, not arguments.no_memory)
+benchmarks.run_all(arguments.scale)
+
+if arguments.output is not None:
+    benchmarks.dump(arguments.output)
+
+if arguments.baseline is not None and benchmarks.compare(arguments.baseline, arguments.threshold) > 0:
+    sys.exit(1)
@@ -0,0 +1,235 @@
+'''
+Mede o desempenho da conversão, determinização e minimização de autômatos finitos.
+'''
+
+import json
+import platform
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable
+from benchmarks.generators import Generators
+from source.finite_automaton import FiniteAutomaton, FiniteAutomatonDeterminizer, FiniteAutomatonMinimizer
+from source.regex_fa import RegexToDFAConversor
+
+
+class Benchmarks():
+
+    '''
+    Benchmarks.
+
+    Cada medição guarda o menor tempo entre as repetições e, em uma execução separada com tracemalloc, o
+    pico de memória alocada pelo Python. O tracemalloc deixa as operações bem mais lentas, então a medição
+    de memória pode ser desligada. Os resultados podem ser gravados em JSON e comparados com os de uma
+    execução anterior.
+    '''
+
+    FORMAT_VERSION = 1
+
+    _seed: int
+    _repeat: int
+    _memory: bool
+    _generators: Generators
+    _results: list[dict[str, Any]]
+
+    def __init__(self, seed: int, repeat: int = 3, memory: bool = True) -> None:
+        self._seed = seed
+        self._repeat = repeat
+        self._memory = memory
+        self._generators = Generators(seed)
+        self._results = []
+
+    @property
+    def results(self) -> list[dict[str, Any]]:
+        '''
+        Retorna os resultados medidos.
+        '''
+
+        return self._results
+
+    def random_dfa(self, state_count: int, symbol_count: int) -> FiniteAutomaton:
+        '''
+        Gera um AFD completo aleatório com metade dos estados finais.
+        '''
+
+        return self._generators.random_dfa(state_count, symbol_count)
+
+    def run_all(self, scale: int = 1) -> None:
+        '''
+        Runs the benchmarks. `scale` aumenta os parâmetros das famílias.
+        '''
+
+        print('Running benchmarks\n')
+
+        exponents = range(4, 4 * scale + 9, 4)
+
+        for n in exponents:
+            self.run_conversion('exponential', {'n': n}, Generators.exponential_regex(n))
+
+        for keyword_count in (100 * scale, 1000 * scale):
+            regular_expression = self._generators.keyword_alternation(keyword_count)
+            self.run_conversion('keywords', {'keywords': keyword_count}, regular_expression)
+
+        for depth in (5 * scale, 20 * scale):
+            self.run_conversion('nested_stars', {'depth': depth}, Generators.nested_stars(depth))
+
+        for n in exponents:
+            self.run_determinization('exponential', {'n': n}, Generators.exponential_nfa(n))
+
+        for state_count in (40 * scale, 80 * scale):
+            nfa = self._generators.random_nfa(state_count, 2, 1.2)
+            self.run_determinization('random_nfa', {'states': state_count, 'symbols': 2}, nfa)
+
+        for n in exponents:
+            dfa = FiniteAutomatonDeterminizer.determinize(Generators.exponential_nfa(n))
+            self.run_minimization('exponential', {'n': n}, dfa)
+
+        for n in exponents:
+            self.run_determinize_and_minimize('exponential', {'n': n}, Generators.exponential_nfa(n))
+
+        for state_count in (40 * scale, 80 * scale):
+            nfa = self._generators.random_nfa(state_count, 2, 1.2)
+            self.run_determinize_and_minimize('random_nfa', {'states': state_count, 'symbols': 2}, nfa)
+
+        self.run_all_minimization([1000 * scale, 10000 * scale, 100000 * scale], 2)
+
+    def run_all_minimization(self, state_counts: list[int], symbol_count: int) -> None:
+        '''
+        Runs the benchmarks.
+        '''
+
+        for state_count in state_counts:
+            self.run_minimization('random_dfa',
+                                  {'states': state_count, 'symbols': symbol_count},
+                                  self.random_dfa(state_count, symbol_count))
+
+    def run_conversion(self, family: str, parameters: dict[str, int], regular_expression: str) -> None:
+        '''
+        Runs the benchmark for each backend, with and without the minimization of the result.
+        '''
+
+        for backend in RegexToDFAConversor.BACKENDS:
+            # Os nomes do backend padrão continuam sem sufixo para comparar com resultados antigos.
+            suffix = f'-{backend}' if backend != RegexToDFAConversor.FOLLOWPOS else ''
+
+            self.measure(f'convert{suffix}/{family}',
+                         parameters,
+                         lambda backend=backend: RegexToDFAConversor.convert(regular_expression, backend=backend))
+            self.measure(f'convert{suffix}-minimize/{family}',
+                         parameters,
+                         lambda backend=backend: FiniteAutomatonMinimizer.minimize(
+                             RegexToDFAConversor.convert(regular_expression, backend=backend)))
+
+    def run_determinization(self, family: str, parameters: dict[str, int], nfa: FiniteAutomaton) -> None:
+        '''
+        Runs the benchmark.
+        '''
+
+        self.measure(f'determinize/{family}', parameters, lambda: FiniteAutomatonDeterminizer.determinize(nfa))
+
+    def run_determinize_and_minimize(self, family: str, parameters: dict[str, int], nfa: FiniteAutomaton) -> None:
+        '''
+        Runs the benchmark for the separate passes and for the fused pipeline.
+        '''
+
+        self.measure(f'determinize-minimize/{family}',
+                     parameters,
+                     lambda: FiniteAutomatonMinimizer.minimize(FiniteAutomatonDeterminizer.determinize(nfa)))
+        self.measure(f'determinize-and-minimize/{family}',
+                     parameters,
+                     lambda: FiniteAutomatonMinimizer.determinize_and_minimize(nfa))
+
+    def run_minimization(self, family: str, parameters: dict[str, int], dfa: FiniteAutomaton) -> None:
+        '''
+        Runs the benchmark.
+        '''
+
+        self.measure(f'minimize/{family}', parameters, lambda: FiniteAutomatonMinimizer.minimize(dfa))
+
+    def measure(self, name: str, parameters: dict[str, int], function: Callable[[], FiniteAutomaton]) -> None:
+        '''
+        Mede uma operação e guarda o resultado.
+        '''
+
+        seconds = float('inf')
+
+        for _ in range(self._repeat):
+            start = perf_counter()
+            result = function()
+            seconds = min(seconds, perf_counter() - start)
+
+        peak_memory = None
+
+        if self._memory:
+            tracemalloc.start()
+            function()
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        self._results.append({'name': name,
+                              'parameters': parameters,
+                              'seconds': seconds,
+                              'peak_memory': peak_memory,
+                              'states': result.state_count})
+
+        description = ', '.join(f'{key}={value}' for key, value in parameters.items())
+        memory_description = f', peak {peak_memory / 2 ** 20:.1f} MiB' if peak_memory is not None else ''
+        print(f'{name} ({description}): {result.state_count} states in {seconds:.4f}s{memory_description}')
+
+    def dump(self, path: str) -> None:
+        '''
+        Grava os resultados em JSON.
+        '''
+
+        report = {'version': Benchmarks.FORMAT_VERSION,
+                  'seed': self._seed,
+                  'repeat': self._repeat,
+                  'python': platform.python_version(),
+                  'platform': platform.platform(),
+                  'results': self._results}
+
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+
+    def compare(self, path: str, threshold: float = 1.25) -> int:
+        '''
+        Compara os resultados com os de um arquivo anterior e retorna o número de regressões, isto é,
+        medições mais lentas ou com mais memória que `threshold` vezes a anterior.
+        '''
+
+        with open(path, 'r', encoding='utf-8') as file:
+            baseline = {Benchmarks.key(result): result for result in json.load(file)['results']}
+
+        print(f'\nComparing with {path}\n')
+
+        regressions = 0
+
+        for result in self._results:
+            previous = baseline.get(Benchmarks.key(result))
+
+            if previous is None:
+                continue
+
+            time_ratio = result['seconds'] / max(previous['seconds'], 1e-9)
+            regressed = time_ratio > threshold or result['states'] != previous['states']
+            description = f'time x{time_ratio:.2f}'
+
+            if result['peak_memory'] is not None and previous['peak_memory'] is not None:
+                memory_ratio = result['peak_memory'] / max(previous['peak_memory'], 1)
+                regressed = regressed or memory_ratio > threshold
+                description += f', memory x{memory_ratio:.2f}'
+
+            regressions += regressed
+
+            print(f'{"REGRESSION " if regressed else ""}{Benchmarks.key(result)}: {description}')
+
+        return regressions
+
+    @staticmethod
+    def key(result: dict[str, Any]) -> str:
+        '''
+        Retorna a chave que identifica uma medição entre execuções.
+        '''
+
+        parameters = ','.join(f'{key}={value}' for key, value in sorted(result['parameters'].items()))
+
+        return f'{result["name"]}({parameters})'
@@ -0,0 +1,108 @@
+'''
+Geradores de famílias de entradas difíceis para os benchmarks.
+'''
+
+from array import array
+from random import Random
+from source.finite_automaton import FiniteAutomaton
+from source.transition_table import TransitionTable
+
+
+class Generators():
+
+    '''
+    Geradores parametrizados e reprodutíveis: a mesma semente e os mesmos parâmetros geram a mesma entrada.
+    '''
+
+    _seed: int
+
+    def __init__(self, seed: int) -> None:
+        self._seed = seed
+
+    @staticmethod
+    def exponential_regex(n: int) -> str:
+        '''
+        Retorna (a|b)*a(a|b)^n, cujo AFD mínimo tem 2^(n + 1) estados.
+        '''
+
+        return '(a|b)*a' + '(a|b)' * n
+
+    @staticmethod
+    def exponential_nfa(n: int) -> FiniteAutomaton:
+        '''
+        Retorna o AFND de n + 2 estados de (a|b)*a(a|b)^n, cuja determinização tem 2^(n + 1) estados.
+        '''
+
+        state_count = n + 2
+        targets = array('i', [0, 1, 0])
+        offsets = array('i', [0, 2, 3])
+
+        for state in range(1, state_count):
+            for _ in range(2):
+                if state < state_count - 1:
+                    targets.append(state + 1)
+
+                offsets.append(len(targets))
+
+        return FiniteAutomaton.from_table(lambda state: f'q{state}',
+                                          0,
+                                          [state_count - 1],
+                                          ['a', 'b'],
+                                          TransitionTable(state_count, 2, targets, offsets))
+
+    def keyword_alternation(self, keyword_count: int, keyword_length: int = 8) -> str:
+        '''
+        Retorna a união de palavras-chave aleatórias sobre as letras minúsculas.
+        '''
+
+        generator = Random(self._seed)
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        keywords = {''.join(generator.choice(letters) for _ in range(keyword_length)) for _ in range(keyword_count)}
+
+        return '|'.join(sorted(keywords))
+
+    @staticmethod
+    def nested_stars(depth: int) -> str:
+        '''
+        Retorna ER com `depth` fechos aninhados, como ((a*b)*c)*.
+        '''
+
+        regular_expression = 'a'
+
+        for level in range(depth):
+            regular_expression = f'({regular_expression}*{"abc"[(level + 1) % 3]})'
+
+        return regular_expression + '*'
+
+    def random_dfa(self, state_count: int, symbol_count: int) -> FiniteAutomaton:
+        '''
+        Gera um AFD completo aleatório com metade dos estados finais.
+        '''
+
+        generator = Random(self._seed)
+        targets = array('i', [generator.randrange(state_count) for _ in range(state_count * symbol_count)])
+        final_states = [state for state in range(state_count) if generator.random() < 0.5]
+        symbols = [chr(ord('a') + symbol) for symbol in range(symbol_count)]
+
+        return FiniteAutomaton.from_table(lambda state: f'q{state}',
+                                          0,
+                                          final_states,
+                                          symbols,
+                                          TransitionTable(state_count, symbol_count, targets))
+
+    def random_nfa(self, state_count: int, symbol_count: int, density: float = 2.0) -> FiniteAutomaton:
+        '''
+        Gera um AFND aleatório com, em média, `density` transições por estado e símbolo.
+        '''
+
+        generator = Random(self._seed)
+        edges = [(generator.randrange(state_count), generator.randrange(symbol_count), generator.randrange(state_count))
+                 for _ in range(int(state_count * symbol_count * density))]
+        final_states = [state for state in range(state_count) if generator.random() < 0.2]
+        symbols = [chr(ord('a') + symbol) for symbol in range(symbol_count)]
+
+        return FiniteAutomaton.from_table(lambda state: f'q{state}',
+                                          0,
+                                          final_states,
+                                          symbols,
+                                          TransitionTable.from_edges(state_count, symbol_count, edges))
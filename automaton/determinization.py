@@ -2,11 +2,10 @@
 Determinização.
 '''
 
-from source.finite_automaton import FiniteAutomatonBuilder, FiniteAutomatonDeterminizer
+import sys
+from source.batch import BatchProcessor
+from source.finite_automaton import FiniteAutomatonDeterminizer
 
 
-raw_nfa = input()
-
-nfa = FiniteAutomatonBuilder.build(raw_nfa)
-dfa = FiniteAutomatonDeterminizer.determinize(nfa)
-print(dfa)
+if __name__ == '__main__':
+    sys.exit(BatchProcessor.main('Determiniza autômatos finitos.', FiniteAutomatonDeterminizer.determinize))
@@ -2,11 +2,10 @@
 Minimização.
 '''
 
-from source.finite_automaton import FiniteAutomatonBuilder, FiniteAutomatonMinimizer
+import sys
+from source.batch import BatchProcessor
+from source.finite_automaton import FiniteAutomatonMinimizer
 
 
-raw_dfa = input()
-
-dfa = FiniteAutomatonBuilder.build(raw_dfa)
-minimal_dfa = FiniteAutomatonMinimizer.minimize(dfa)
-print(minimal_dfa)
+if __name__ == '__main__':
+    sys.exit(BatchProcessor.main('Minimiza autômatos finitos.', FiniteAutomatonMinimizer.minimize))
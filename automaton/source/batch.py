@@ -0,0 +1,290 @@
+'''
+Processamento em lote de autômatos finitos.
+'''
+
+import json
+import os
+import signal
+import sys
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from functools import partial
+from io import StringIO
+from multiprocessing import Pool
+from typing import Any, Callable, Iterable, Iterator, TextIO
+from source.finite_automaton import FiniteAutomaton, FiniteAutomatonBuilder, FiniteAutomatonWriter
+from source.instrumentation import Instrumentation
+
+
+class BatchProcessor():
+
+    '''
+    Aplica uma operação a vários autômatos, um por linha, distribuindo o trabalho em um pool de processos.
+
+    Os resultados são escritos assim que ficam prontos: na ordem da entrada ou, no modo marcado, na ordem
+    em que terminam, precedidos do índice da linha. Erros e estouros do tempo limite de um item vão para a
+    saída de erros com o índice da linha e, no modo ordenado, deixam uma linha vazia na saída. O tempo
+    limite usa SIGALRM e não tem efeito em plataformas sem esse sinal.
+
+    A operação recebe o autômato e uma instrumentação opcional. Se `instrumentation` for informada, os
+    relatórios de cada item, calculados nos processos de trabalho, são acumulados nela.
+    '''
+
+    _operation: Callable[[FiniteAutomaton, Instrumentation | None], FiniteAutomaton]
+    _workers: int
+    _timeout: float | None
+    _sort: bool
+    _chunk_size: int
+    _instrumentation: Instrumentation | None
+
+    def __init__(self,
+                 operation: Callable[[FiniteAutomaton, Instrumentation | None], FiniteAutomaton],
+                 workers: int | None = None,
+                 timeout: float | None = None,
+                 sort: bool = True,
+                 chunk_size: int = 1,
+                 instrumentation: Instrumentation | None = None) -> None:
+        self._operation = operation
+        self._workers = workers if workers is not None else os.cpu_count() or 1
+        self._timeout = timeout
+        self._sort = sort
+        self._chunk_size = chunk_size
+        self._instrumentation = instrumentation
+
+        if self._workers < 1:
+            raise ValueError('O número de processos deve ser positivo.')
+
+    def run(self, lines: Iterable[str], output: TextIO, errors: TextIO, tagged: bool = False) -> int:
+        '''
+        Processa as linhas e retorna o número de itens que falharam.
+        '''
+
+        items = enumerate(line.rstrip('\r\n') for line in lines)
+        process = partial(BatchProcessor.process,
+                          self._operation,
+                          self._timeout,
+                          self._sort,
+                          self._instrumentation is not None)
+        failures = 0
+
+        for index, result, error, report in self.results(process, items, tagged):
+            if report is not None:
+                self._instrumentation.merge(report)  # type: ignore
+
+            if error is not None:
+                failures += 1
+                errors.write(f'{index}\t{error}\n')
+                errors.flush()
+
+                if tagged:
+                    continue
+
+                result = ''
+
+            output.write(f'{index}\t{result}\n' if tagged else f'{result}\n')
+            output.flush()
+
+        return failures
+
+    def results(self,
+                process: Callable[[tuple[int, str]], tuple[int, str | None, str | None, dict[str, Any] | None]],
+                items: Iterable[tuple[int, str]],
+                tagged: bool) -> Iterator[tuple[int, str | None, str | None, dict[str, Any] | None]]:
+        '''
+        Itera sobre os resultados, no próprio processo se houver apenas um processo de trabalho.
+        '''
+
+        if self._workers == 1:
+            BatchProcessor.initialize_worker()
+            yield from map(process, items)
+            return
+
+        with Pool(self._workers, initializer=BatchProcessor.initialize_worker) as pool:
+            if tagged:
+                yield from pool.imap_unordered(process, items, self._chunk_size)
+            else:
+                yield from pool.imap(process, items, self._chunk_size)
+
+    @staticmethod
+    def process(operation: Callable[[FiniteAutomaton, Instrumentation | None], FiniteAutomaton],
+                timeout: float | None,
+                sort: bool,
+                instrumented: bool,
+                item: tuple[int, str]) -> tuple[int, str | None, str | None, dict[str, Any] | None]:
+        '''
+        Processa uma linha e retorna (índice, resultado, erro, relatório da instrumentação).
+        '''
+
+        index, raw_data = item
+        instrumentation = Instrumentation() if instrumented else None
+        report = None
+
+        try:
+            with BatchProcessor.time_limit(timeout):
+                result = BatchProcessor.apply(operation, raw_data, sort, instrumentation)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            return index, None, BatchProcessor.describe(error), None
+
+        if instrumentation is not None:
+            report = instrumentation.as_dict()
+
+        return index, result, None, report
+
+    @staticmethod
+    def apply(operation: Callable[[FiniteAutomaton, Instrumentation | None], FiniteAutomaton],
+              raw_data: str,
+              sort: bool = True,
+              instrumentation: Instrumentation | None = None) -> str:
+        '''
+        Aplica a operação a um autômato no formato textual e retorna o resultado no mesmo formato.
+        '''
+
+        output = StringIO()
+
+        with Instrumentation.phase_of(instrumentation, 'read'):
+            finite_automaton = FiniteAutomatonBuilder.build(raw_data)
+
+        finite_automaton = operation(finite_automaton, instrumentation)
+
+        with Instrumentation.phase_of(instrumentation, 'write'):
+            FiniteAutomatonWriter.write(finite_automaton, output, sort)
+
+        return output.getvalue()
+
+    @staticmethod
+    def apply_file(operation: Callable[[FiniteAutomaton, Instrumentation | None], FiniteAutomaton],
+                   file: TextIO,
+                   output: TextIO,
+                   timeout: float | None = None,
+                   sort: bool = True,
+                   instrumentation: Instrumentation | None = None) -> str | None:
+        '''
+        Aplica a operação ao autômato de um arquivo e escreve o resultado sem guardar a entrada inteira.
+
+        Retorna None ou o erro em uma linha, como no modo em lote.
+        '''
+
+        BatchProcessor.initialize_worker()
+
+        try:
+            with BatchProcessor.time_limit(timeout):
+                with Instrumentation.phase_of(instrumentation, 'read'):
+                    finite_automaton = FiniteAutomatonBuilder.build_from_file(file)
+
+                finite_automaton = operation(finite_automaton, instrumentation)
+
+                with Instrumentation.phase_of(instrumentation, 'write'):
+                    FiniteAutomatonWriter.write(finite_automaton, output, sort)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            return BatchProcessor.describe(error)
+
+        output.write('\n')
+
+        return None
+
+    @staticmethod
+    @contextmanager
+    def time_limit(timeout: float | None) -> Iterator[None]:
+        '''
+        Interrompe o bloco com TimeoutError quando o tempo limite acaba, em plataformas com SIGALRM.
+        '''
+
+        timed = timeout is not None and hasattr(signal, 'setitimer')
+
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+
+        try:
+            yield
+        finally:
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+
+    @staticmethod
+    def describe(error: Exception) -> str:
+        '''
+        Retorna um erro em uma linha.
+        '''
+
+        return f'{type(error).__name__}: {error}'
+
+    @staticmethod
+    def initialize_worker() -> None:
+        '''
+        Instala o tratador do tempo limite em um processo de trabalho.
+        '''
+
+        if hasattr(signal, 'SIGALRM'):
+            signal.signal(signal.SIGALRM, BatchProcessor.interrupt)
+
+    @staticmethod
+    def interrupt(_signal_number: int, _frame: object) -> None:
+        '''
+        Interrompe o item atual quando o tempo limite acaba.
+        '''
+
+        raise TimeoutError('Tempo limite excedido.')
+
+    @staticmethod
+    def main(description: str, operation: Callable[[FiniteAutomaton, Instrumentation | None], FiniteAutomaton]) -> int:
+        '''
+        Ponto de entrada dos scripts. Sem `--batch`, lê um autômato e escreve o resultado; os erros são
+        tratados como os de um item do lote.
+        '''
+
+        parser = ArgumentParser(description=description)
+        parser.add_argument('--batch', action='store_true', help='lê um autômato por linha')
+        parser.add_argument('--input', help='arquivo de entrada (padrão: entrada padrão)')
+        parser.add_argument('--workers', type=int, help='número de processos (padrão: número de CPUs)')
+        parser.add_argument('--timeout', type=float, help='tempo limite por autômato, em segundos')
+        parser.add_argument('--tagged', action='store_true',
+                            help='escreve "índice<TAB>resultado" na ordem de término em vez da ordem da entrada')
+        parser.add_argument('--unsorted', action='store_true', help='não ordena as transições da saída')
+        parser.add_argument('--report', action='store_true', help='escreve os tempos e contadores de cada etapa')
+        parser.add_argument('--report-json', help='grava os tempos e contadores de cada etapa em JSON')
+        arguments = parser.parse_args()
+
+        instrumentation = Instrumentation() if arguments.report or arguments.report_json is not None else None
+        file = open(arguments.input, 'r', encoding='utf-8') if arguments.input is not None else sys.stdin
+
+        try:
+            if arguments.batch:
+                processor = BatchProcessor(operation,
+                                           arguments.workers,
+                                           arguments.timeout,
+                                           not arguments.unsorted,
+                                           instrumentation=instrumentation)
+                status = 1 if processor.run(file, sys.stdout, sys.stderr, arguments.tagged) > 0 else 0
+            else:
+                error = BatchProcessor.apply_file(operation,
+                                                  file,
+                                                  sys.stdout,
+                                                  arguments.timeout,
+                                                  not arguments.unsorted,
+                                                  instrumentation)
+
+                if error is not None:
+                    print(error, file=sys.stderr)
+
+                status = 1 if error is not None else 0
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        if instrumentation is not None:
+            BatchProcessor.dump_report(instrumentation, arguments.report, arguments.report_json)
+
+        return status
+
+    @staticmethod
+    def dump_report(instrumentation: Instrumentation, text: bool, json_path: str | None) -> None:
+        '''
+        Escreve o relatório da instrumentação na saída de erros e, opcionalmente, em JSON.
+        '''
+
+        if text:
+            print(instrumentation.report(), file=sys.stderr)
+
+        if json_path is not None:
+            with open(json_path, 'w', encoding='utf-8') as file:
+                json.dump(instrumentation.as_dict(), file, indent=4)
@@ -0,0 +1,52 @@
+'''
+Conjuntos de inteiros representados como máscaras de bits.
+'''
+
+from typing import Iterable
+
+
+class Bitset():
+
+    '''
+    Operações sobre máscaras de bits em que o bit i representa o inteiro i.
+    '''
+
+    @staticmethod
+    def positions(mask: int) -> list[int]:
+        '''
+        Retorna os índices dos bits ativos em ordem crescente.
+        '''
+
+        positions = []
+
+        # Isolar o bit mais baixo custa O(tamanho da máscara) por bit, o que só compensa com poucos bits.
+        if mask.bit_count() <= 8:
+            while mask:
+                lowest_bit = mask & -mask
+                positions.append(lowest_bit.bit_length() - 1)
+                mask ^= lowest_bit
+
+            return positions
+
+        binary = bin(mask)
+        last_index = len(binary) - 1
+        index = binary.rfind('1')
+
+        while index > 1:
+            positions.append(last_index - index)
+            index = binary.rfind('1', 2, index)
+
+        return positions
+
+    @staticmethod
+    def from_positions(positions: Iterable[int]) -> int:
+        '''
+        Retorna a máscara com os bits dos índices informados.
+        '''
+
+        mask = 0
+
+        for position in positions:
+            mask |= 1 << position
+
+        return mask
@@ -0,0 +1,601 @@
+'''
+Derivadas de Brzozowski.
+'''
+
+from array import array
+from collections import deque
+from typing import Any, Iterable
+from source.finite_automaton import FiniteAutomaton, FiniteAutomatonBuilder
+from source.instrumentation import Instrumentation
+from source.transition_table import TransitionTable
+
+
+class RegexTermTable():
+
+    '''
+    Tabela de termos de ERs com hash-consing.
+
+    Cada termo é um inteiro e termos estruturalmente iguais têm o mesmo inteiro, então igualdade é uma
+    comparação de inteiros. Os termos são criados pelos construtores, que normalizam a ER: a união é
+    associativa, comutativa e idempotente (os operandos ficam ordenados e sem repetição), absorve o vazio
+    e descarta a palavra vazia se outro operando já a aceita; a concatenação é associativa à direita,
+    absorve o vazio e tem a palavra vazia como neutro; (r*)* = r* e (& | r)* = r*. Com essas regras, cada
+    ER tem um número finito de derivadas distintas.
+
+    As derivadas são memorizadas por termo e símbolo. Cada termo guarda a máscara dos símbolos com que
+    suas palavras podem começar, e a derivada por um símbolo fora da máscara é o vazio sem recursão.
+    '''
+
+    EMPTY = 0
+    EPSILON = 1
+    SYMBOL = 2
+    STAR = 3
+    CONCATENATION = 4
+    UNION = 5
+
+    EMPTY_TERM = 0
+    EPSILON_TERM = 1
+
+    _kinds: bytearray
+    _lefts: array
+    _rights: array
+    _nullables: bytearray
+    _firsts: list[int]
+    _terms: dict[tuple[int, int, int], int]
+    _symbols: list[str]
+    _symbol_ids: dict[str, int]
+    _derivatives: list[dict[int, int]]
+
+    def __init__(self) -> None:
+        self._kinds = bytearray()
+        self._lefts = array('i')
+        self._rights = array('i')
+        self._nullables = bytearray()
+        self._firsts = []
+        self._terms = {}
+        self._symbols = []
+        self._symbol_ids = {}
+        self._derivatives = []
+
+        self.term(RegexTermTable.EMPTY, -1, -1, False, 0)
+        self.term(RegexTermTable.EPSILON, -1, -1, True, 0)
+
+    @property
+    def symbols(self) -> list[str]:
+        '''
+        Retorna os símbolos na ordem dos seus índices.
+        '''
+
+        return self._symbols
+
+    @property
+    def term_count(self) -> int:
+        '''
+        Retorna o número de termos criados.
+        '''
+
+        return len(self._kinds)
+
+    @property
+    def derivative_count(self) -> int:
+        '''
+        Retorna o número de derivadas memorizadas.
+        '''
+
+        return sum(len(derivatives) for derivatives in self._derivatives)
+
+    def nullable(self, term: int) -> bool:
+        '''
+        Retorna verdadeiro se a linguagem do termo contém a palavra vazia.
+        '''
+
+        return bool(self._nullables[term])
+
+    def symbol_id(self, symbol: str) -> int | None:
+        '''
+        Retorna o índice de um símbolo ou None se ele não aparece em nenhum termo.
+        '''
+
+        return self._symbol_ids.get(symbol)
+
+    def term(self, kind: int, left: int, right: int, nullable: bool, first: int) -> int:
+        '''
+        Retorna o termo único com o tipo e os filhos dados, criando-o se necessário.
+        '''
+
+        key = (kind, left, right)
+        term = self._terms.get(key)
+
+        if term is None:
+            term = len(self._kinds)
+            self._terms[key] = term
+            self._kinds.append(kind)
+            self._lefts.append(left)
+            self._rights.append(right)
+            self._nullables.append(nullable)
+            self._firsts.append(first)
+
+        return term
+
+    def symbol(self, symbol: str) -> int:
+        '''
+        Retorna o termo de um símbolo.
+        '''
+
+        symbol_id = self._symbol_ids.get(symbol)
+
+        if symbol_id is None:
+            symbol_id = len(self._symbols)
+            self._symbol_ids[symbol] = symbol_id
+            self._symbols.append(symbol)
+            self._derivatives.append({})
+
+        return self.term(RegexTermTable.SYMBOL, symbol_id, -1, False, 1 << symbol_id)
+
+    def star(self, term: int) -> int:
+        '''
+        Retorna o fecho de um termo.
+        '''
+
+        if term == RegexTermTable.EMPTY_TERM:
+            return RegexTermTable.EPSILON_TERM
+
+        if term == RegexTermTable.EPSILON_TERM or self._kinds[term] == RegexTermTable.STAR:
+            return term
+
+        if self._kinds[term] == RegexTermTable.UNION:
+            operands = self.union_operands(term)
+
+            if RegexTermTable.EPSILON_TERM in operands:
+                operands.remove(RegexTermTable.EPSILON_TERM)
+
+                return self.star(self.union_all(operands))
+
+        return self.term(RegexTermTable.STAR, term, -1, True, self._firsts[term])
+
+    def concatenation(self, left: int, right: int) -> int:
+        '''
+        Retorna a concatenação de dois termos.
+        '''
+
+        if left == RegexTermTable.EMPTY_TERM or right == RegexTermTable.EMPTY_TERM:
+            return RegexTermTable.EMPTY_TERM
+
+        if left == RegexTermTable.EPSILON_TERM:
+            return right
+
+        if right == RegexTermTable.EPSILON_TERM:
+            return left
+
+        # Reassocia à direita: (r s) t = r (s t).
+        operands = []
+
+        while self._kinds[left] == RegexTermTable.CONCATENATION:
+            operands.append(self._lefts[left])
+            left = self._rights[left]
+
+        operands.append(left)
+        nullables = self._nullables
+        firsts = self._firsts
+
+        for operand in reversed(operands):
+            nullable = nullables[operand]
+            right = self.term(RegexTermTable.CONCATENATION,
+                              operand,
+                              right,
+                              nullable and nullables[right],
+                              firsts[operand] | firsts[right] if nullable else firsts[operand])
+
+        return right
+
+    def union(self, left: int, right: int) -> int:
+        '''
+        Retorna a união de dois termos.
+        '''
+
+        if left == right:
+            return left
+
+        return self.union_all([left, right])
+
+    def union_operands(self, term: int) -> list[int]:
+        '''
+        Retorna os operandos de uma união, ou o próprio termo se ele não é uma união.
+        '''
+
+        kinds = self._kinds
+        operands = []
+
+        while kinds[term] == RegexTermTable.UNION:
+            operands.append(self._lefts[term])
+            term = self._rights[term]
+
+        operands.append(term)
+
+        return operands
+
+    def union_all(self, terms: Iterable[int]) -> int:
+        '''
+        Retorna a união de vários termos.
+        '''
+
+        kinds = self._kinds
+        lefts = self._lefts
+        rights = self._rights
+        operands = set()
+
+        for term in terms:
+            while kinds[term] == RegexTermTable.UNION:
+                operands.add(lefts[term])
+                term = rights[term]
+
+            operands.add(term)
+
+        operands.discard(RegexTermTable.EMPTY_TERM)
+
+        if len(operands) == 0:
+            return RegexTermTable.EMPTY_TERM
+
+        nullables = self._nullables
+
+        # A palavra vazia já pertence à união se outro operando aceita a palavra vazia.
+        if RegexTermTable.EPSILON_TERM in operands and len(operands) > 1:
+            operands.discard(RegexTermTable.EPSILON_TERM)
+
+            if not any(nullables[operand] for operand in operands):
+                operands.add(RegexTermTable.EPSILON_TERM)
+
+        firsts = self._firsts
+        sorted_operands = sorted(operands)
+        union = sorted_operands.pop()
+
+        while len(sorted_operands) > 0:
+            operand = sorted_operands.pop()
+            union = self.term(RegexTermTable.UNION,
+                              operand,
+                              union,
+                              nullables[operand] or nullables[union],
+                              firsts[operand] | firsts[union])
+
+        return union
+
+    def distribute(self, left: int, right: int) -> int:
+        '''
+        Retorna a concatenação de dois termos, distribuída sobre os operandos de `left` se ele é uma união.
+
+        As derivadas de uma concatenação são uniões concatenadas com o restante da ER; distribuir deixa as
+        alternativas no nível da união, onde as repetidas entre derivadas diferentes são identificadas.
+        '''
+
+        if self._kinds[left] != RegexTermTable.UNION:
+            return self.concatenation(left, right)
+
+        return self.union_all([self.concatenation(operand, right) for operand in self.union_operands(left)])
+
+    def derivative(self, term: int, symbol_id: int) -> int:
+        '''
+        Retorna a derivada de um termo por um símbolo.
+
+        Os termos são percorridos em pós-ordem com uma pilha explícita: um termo só é derivado quando as
+        derivadas dos seus filhos já estão memorizadas, então a profundidade da ER não é limitada pela pilha
+        de chamadas.
+        '''
+
+        bit = 1 << symbol_id
+        firsts = self._firsts
+
+        if not firsts[term] & bit:
+            return RegexTermTable.EMPTY_TERM
+
+        derivatives = self._derivatives[symbol_id]
+        derivative = derivatives.get(term)
+
+        if derivative is not None:
+            return derivative
+
+        unprocessed_terms = [term]
+
+        while len(unprocessed_terms) > 0:
+            current = unprocessed_terms[-1]
+
+            if current in derivatives:
+                unprocessed_terms.pop()
+                continue
+
+            pending_children = [child for child in self.derivative_children(current)
+                                if firsts[child] & bit and child not in derivatives]
+
+            if len(pending_children) > 0:
+                unprocessed_terms.extend(pending_children)
+                continue
+
+            unprocessed_terms.pop()
+            derivatives[current] = self.combine_derivatives(current, symbol_id)
+
+        return derivatives[term]
+
+    def derivative_children(self, term: int) -> list[int]:
+        '''
+        Retorna os termos cujas derivadas compõem a derivada de um termo.
+        '''
+
+        kinds = self._kinds
+
+        match kinds[term]:
+            case RegexTermTable.STAR:
+                return [self._lefts[term]]
+            case RegexTermTable.CONCATENATION:
+                children = []
+
+                while kinds[term] == RegexTermTable.CONCATENATION:
+                    left = self._lefts[term]
+                    children.append(left)
+
+                    if not self._nullables[left]:
+                        return children
+
+                    term = self._rights[term]
+
+                children.append(term)
+
+                return children
+            case RegexTermTable.UNION:
+                return self.union_operands(term)
+            case _:
+                return []
+
+    def combine_derivatives(self, term: int, symbol_id: int) -> int:
+        '''
+        Retorna a derivada de um termo a partir das derivadas memorizadas dos seus filhos.
+        '''
+
+        kinds = self._kinds
+        lefts = self._lefts
+        rights = self._rights
+        firsts = self._firsts
+        bit = 1 << symbol_id
+        derivatives = self._derivatives[symbol_id]
+
+        def child_derivative(child: int) -> int:
+            return derivatives[child] if firsts[child] & bit else RegexTermTable.EMPTY_TERM
+
+        match kinds[term]:
+            case RegexTermTable.SYMBOL:
+                return RegexTermTable.EPSILON_TERM
+            case RegexTermTable.STAR:
+                return self.distribute(child_derivative(lefts[term]), term)
+            case RegexTermTable.CONCATENATION:
+                # d(r s) = d(r) s | d(s) se r aceita a palavra vazia, percorrendo a cadeia sem recursão.
+                parts = []
+
+                while kinds[term] == RegexTermTable.CONCATENATION:
+                    left = lefts[term]
+                    parts.append(self.distribute(child_derivative(left), rights[term]))
+
+                    if not self._nullables[left]:
+                        break
+
+                    term = rights[term]
+                else:
+                    parts.append(child_derivative(term))
+
+                return self.union_all(parts)
+            case _:
+                return self.union_all([derivatives[operand]
+                                       for operand in self.union_operands(term) if firsts[operand] & bit])
+
+    def from_postfix(self, postfixed_regex: list[str]) -> int:
+        '''
+        Retorna o termo de uma ER pós-fixada.
+
+        Uniões e concatenações consecutivas são acumuladas em coleções de operandos e normalizadas uma única
+        vez, juntando sempre a menor coleção à maior, para que n alternativas ou n símbolos seguidos custem
+        O(n log n) em vez de O(n²).
+        '''
+
+        operand_stack: list[tuple[str, Any]] = []
+
+        for token in postfixed_regex:
+            match token:
+                case '*':
+                    operand = self.close_operands(operand_stack.pop())
+                    operand_stack.append(('|', [self.star(operand)]))
+                case '.':
+                    right_operands = self.concatenation_operands(operand_stack.pop())
+                    left_operands = self.concatenation_operands(operand_stack.pop())
+
+                    if len(left_operands) >= len(right_operands):
+                        left_operands.extend(right_operands)
+                    else:
+                        right_operands.extendleft(reversed(left_operands))
+                        left_operands = right_operands
+
+                    operand_stack.append(('.', left_operands))
+                case '|':
+                    right_operands = self.union_list(operand_stack.pop())
+                    left_operands = self.union_list(operand_stack.pop())
+
+                    if len(left_operands) < len(right_operands):
+                        left_operands, right_operands = right_operands, left_operands
+
+                    left_operands.extend(right_operands)
+                    operand_stack.append(('|', left_operands))
+                case '&':
+                    operand_stack.append(('|', [RegexTermTable.EPSILON_TERM]))
+                case _:
+                    operand_stack.append(('|', [self.symbol(token)]))
+
+        return self.close_operands(operand_stack.pop()) if len(operand_stack) > 0 else RegexTermTable.EPSILON_TERM
+
+    def close_operands(self, operands: tuple[str, Any]) -> int:
+        '''
+        Retorna o termo de uma coleção de operandos acumulada por `from_postfix`.
+        '''
+
+        operator, terms = operands
+
+        if operator == '|':
+            return self.union_all(terms)
+
+        # A cadeia é montada do fim para o começo, então cada concatenação já é associativa à direita.
+        term = terms.pop()
+
+        while len(terms) > 0:
+            term = self.concatenation(terms.pop(), term)
+
+        return term
+
+    def concatenation_operands(self, operands: tuple[str, Any]) -> deque[int]:
+        '''
+        Retorna os operandos de uma concatenação acumulada ou um operando único.
+        '''
+
+        return operands[1] if operands[0] == '.' else deque([self.close_operands(operands)])
+
+    def union_list(self, operands: tuple[str, Any]) -> list[int]:
+        '''
+        Retorna os operandos de uma união acumulada ou um operando único.
+        '''
+
+        return operands[1] if operands[0] == '|' else [self.close_operands(operands)]
+
+    def term_to_string(self, term: int) -> str:
+        '''
+        Retorna a representação de um termo como ER.
+
+        A pilha guarda termos ainda não escritos e trechos de texto, na ordem inversa da escrita.
+        '''
+
+        kinds = self._kinds
+        lefts = self._lefts
+        rights = self._rights
+        parts = []
+        unprocessed_items: list[int | str] = [term]
+
+        while len(unprocessed_items) > 0:
+            item = unprocessed_items.pop()
+
+            if isinstance(item, str):
+                parts.append(item)
+                continue
+
+            match kinds[item]:
+                case RegexTermTable.EMPTY:
+                    parts.append('{}')
+                case RegexTermTable.EPSILON:
+                    parts.append('&')
+                case RegexTermTable.SYMBOL:
+                    parts.append(self._symbols[lefts[item]])
+                case RegexTermTable.STAR:
+                    operand = lefts[item]
+
+                    if kinds[operand] == RegexTermTable.SYMBOL:
+                        unprocessed_items.extend(('*', operand))
+                    else:
+                        unprocessed_items.extend((')*', operand, '('))
+                case RegexTermTable.CONCATENATION:
+                    for operand in (rights[item], lefts[item]):
+                        if kinds[operand] == RegexTermTable.UNION:
+                            unprocessed_items.extend((')', operand, '('))
+                        else:
+                            unprocessed_items.append(operand)
+                case _:
+                    unprocessed_items.extend((rights[item], '|', lefts[item]))
+
+        return ''.join(parts)
+
+
+class DerivativeAutomatonBuilder():
+
+    '''
+    Construtor de AFDs por derivadas.
+    '''
+
+    @staticmethod
+    def build(table: RegexTermTable, root: int, instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
+        '''
+        Constrói o AFD cujos estados são as derivadas distintas de um termo.
+
+        A derivada vazia é o sumidouro implícito e não vira estado. Os estados são rotulados pela ER da
+        derivada entre colchetes.
+        '''
+
+        symbols = table.symbols
+        sorted_symbols = sorted(symbols)
+        symbol_ids = [table.symbol_id(symbol) for symbol in sorted_symbols]
+        symbol_count = len(sorted_symbols)
+
+        def row(term: int) -> list[int | None]:
+            target_terms = []
+
+            for symbol_id in symbol_ids:
+                target_term = table.derivative(term, symbol_id)
+                target_terms.append(target_term if target_term != RegexTermTable.EMPTY_TERM else None)
+
+            return target_terms
+
+        # A linguagem vazia tem só o estado inicial, que não é final e vai para o sumidouro por todo símbolo.
+        terms, final_states, targets = FiniteAutomatonBuilder.explore_states(root,
+                                                                             row,
+                                                                             table.nullable,
+                                                                             'derivative construction',
+                                                                             instrumentation)
+
+        if instrumentation is not None:
+            instrumentation.count('terms', table.term_count)
+
+        def state_label(state: int) -> str:
+            return f'[{table.term_to_string(terms[state])}]'
+
+        return FiniteAutomaton.from_table(state_label,
+                                          0,
+                                          final_states,
+                                          sorted_symbols,
+                                          TransitionTable(len(terms), symbol_count, targets),
+                                          set(symbols))
+
+
+class DerivativeMatcher():
+
+    '''
+    Reconhecedor que deriva a ER pelos símbolos da palavra, sem construir o AFD.
+
+    Só as derivadas alcançadas pelas palavras lidas são calculadas e elas ficam memorizadas na tabela,
+    então palavras seguintes que passam pelos mesmos estados não refazem o trabalho.
+    '''
+
+    _table: RegexTermTable
+    _root: int
+
+    def __init__(self, table: RegexTermTable, root: int) -> None:
+        self._table = table
+        self._root = root
+
+    @property
+    def table(self) -> RegexTermTable:
+        '''
+        Retorna a tabela de termos.
+        '''
+
+        return self._table
+
+    def accepts(self, word: Iterable[str]) -> bool:
+        '''
+        Retorna verdadeiro se a ER reconhece a palavra.
+        '''
+
+        table = self._table
+        term = self._root
+
+        for symbol in word:
+            symbol_id = table.symbol_id(symbol)
+
+            if symbol_id is None:
+                return False
+
+            term = table.derivative(term, symbol_id)
+
+            if term == RegexTermTable.EMPTY_TERM:
+                return False
+
+        return table.nullable(term)
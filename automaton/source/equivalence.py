@@ -0,0 +1,134 @@
+'''
+Equivalência de autômatos finitos.
+'''
+
+from array import array
+from collections import deque
+from source.finite_automaton import FiniteAutomaton
+from source.product import FiniteAutomatonProduct
+from source.transition_table import NO_STATE
+
+
+class FiniteAutomatonEquivalence():
+
+    '''
+    Teste de equivalência de Hopcroft e Karp.
+
+    Os estados dos dois AFDs, mais um sumidouro para cada um, ficam em uma única estrutura union-find. Os
+    pares são explorados em largura a partir do par inicial e um par só é explorado se seus estados ainda
+    estão em classes diferentes, então o custo é quase linear no número de estados. O primeiro par com
+    aceitação diferente encerra a busca e, como a busca é em largura, o caminho até ele é um contraexemplo
+    de comprimento mínimo. Não depende dos rótulos dos estados.
+    '''
+
+    @staticmethod
+    def equivalent(finite_automaton_a: FiniteAutomaton, finite_automaton_b: FiniteAutomaton) -> bool:
+        '''
+        Retorna verdadeiro se os autômatos reconhecem a mesma linguagem.
+        '''
+
+        return FiniteAutomatonEquivalence.counterexample(finite_automaton_a, finite_automaton_b) is None
+
+    @staticmethod
+    def counterexample(finite_automaton_a: FiniteAutomaton,
+                       finite_automaton_b: FiniteAutomaton) -> list[str] | None:
+        '''
+        Retorna os símbolos de uma palavra mais curta aceita por apenas um dos autômatos ou None se as
+        linguagens são iguais.
+        '''
+
+        dfa_a = FiniteAutomatonProduct.deterministic(finite_automaton_a)
+        dfa_b = FiniteAutomatonProduct.deterministic(finite_automaton_b)
+        symbols = FiniteAutomatonProduct.alphabet_symbols(dfa_a, dfa_b.alphabet | set(dfa_b.symbols))
+        symbol_count = len(symbols)
+
+        # Os estados de A ocupam [0, |A|], com o sumidouro em |A|, e os de B ocupam [|A| + 1, |A| + |B| + 1].
+        sink_a = dfa_a.state_count
+        offset_b = sink_a + 1
+        sink_b = offset_b + dfa_b.state_count
+        element_count = sink_b + 1
+
+        targets = array('i', [0]) * (element_count * symbol_count)
+        final_states = bytearray(element_count)
+
+        for dfa, offset, sink in ((dfa_a, 0, sink_a), (dfa_b, offset_b, sink_b)):
+            dense_targets = dfa.table.dense_targets
+            dfa_symbol_count = dfa.table.symbol_count
+            symbol_ids = [dfa.symbol_id(symbol) for symbol in symbols]
+
+            for state in range(dfa.state_count):
+                row = (offset + state) * symbol_count
+                dfa_row = state * dfa_symbol_count
+
+                for index, symbol in enumerate(symbol_ids):
+                    target = dense_targets[dfa_row + symbol] if symbol is not None else NO_STATE
+                    targets[row + index] = offset + target if target != NO_STATE else sink
+
+            for index in range(symbol_count):
+                targets[sink * symbol_count + index] = sink
+
+            for state in dfa.final_state_ids:
+                final_states[offset + state] = 1
+
+        parents = array('i', range(element_count))
+        sizes = array('i', [1]) * element_count
+
+        def find(element: int) -> int:
+            while parents[element] != element:
+                parents[element] = parents[parents[element]]
+                element = parents[element]
+
+            return element
+
+        initial_a = dfa_a.initial_state_id
+        initial_b = offset_b + dfa_b.initial_state_id
+
+        if final_states[initial_a] != final_states[initial_b]:
+            return []
+
+        # Cada par explorado guarda o par de origem e o símbolo, para reconstruir o contraexemplo.
+        pair_parents = array('i', [-1])
+        pair_symbols = array('i', [-1])
+        pair_states = [(initial_a, initial_b)]
+        unprocessed_pairs = deque([0])
+        parents[initial_b] = initial_a
+        sizes[initial_a] += sizes[initial_b]
+
+        while len(unprocessed_pairs) > 0:
+            pair = unprocessed_pairs.popleft()
+            state_a, state_b = pair_states[pair]
+            row_a = state_a * symbol_count
+            row_b = state_b * symbol_count
+
+            for symbol in range(symbol_count):
+                target_a = targets[row_a + symbol]
+                target_b = targets[row_b + symbol]
+                root_a = find(target_a)
+                root_b = find(target_b)
+
+                if root_a == root_b:
+                    continue
+
+                if final_states[target_a] != final_states[target_b]:
+                    word = [symbols[symbol]]
+
+                    while pair > 0:
+                        word.append(symbols[pair_symbols[pair]])
+                        pair = pair_parents[pair]
+
+                    word.reverse()
+
+                    return word
+
+                if sizes[root_a] < sizes[root_b]:
+                    root_a, root_b = root_b, root_a
+
+                parents[root_b] = root_a
+                sizes[root_a] += sizes[root_b]
+
+                pair_parents.append(pair)
+                pair_symbols.append(symbol)
+                pair_states.append((target_a, target_b))
+                unprocessed_pairs.append(len(pair_states) - 1)
+
+        return None
@@ -2,20 +2,38 @@
 Módulo de autômatos finitos.
 '''
 
-from copy import deepcopy
+from array import array
+from collections import deque
+from io import StringIO
+from typing import Any, Callable, Hashable, Iterable, Iterator, Sequence, TextIO
+
+from source.bitset import Bitset
+from source.instrumentation import Instrumentation
+from source.transition_table import NO_STATE, TransitionTable
+
+# Refinamento de `FiniteAutomatonMinimizer.minimize`: tabela completa, estados finais e número de símbolos.
+Refinement = Callable[[array, bytearray, int], tuple[Sequence[int], dict[str, int]]]
 
 
 class FiniteAutomaton():
 
     '''
     Autômato finito.
+
+    Estados e símbolos são internados como inteiros e as transições ficam em uma `TransitionTable`. Os
+    rótulos dos estados são gerados apenas quando requisitados.
     '''
 
-    _states: set[str]
-    _initial_state: str
-    _final_states: set[str]
+    _state_labels: list[str] | None
+    _state_label_factory: Callable[[int], str] | None
+    _state_ids: dict[str, int] | None
+    _symbols: list[str]
+    _symbol_ids: dict[str, int]
     _alphabet: set[str]
-    _transitions: dict[tuple[str, str], set[str]]
+    _initial_state_id: int
+    _final_state_ids: set[int]
+    _table: TransitionTable
+    _epsilon_closures: dict[int, tuple[int, ...]] | None
 
     def __init__(self,
                  states: set[str],
@@ -23,36 +41,110 @@ class FiniteAutomaton():
                  final_states: set[str],
                  alphabet: set[str],
                  transitions: dict[tuple[str, str], set[str]]) -> None:
-        self._states = states
-        self._initial_state = initial_state
-        self._final_states = final_states
+        labels = states | final_states | {initial_state}
+        symbols = set(alphabet)
+
+        for (source, symbol), target in transitions.items():
+            labels.add(source)
+            labels |= target
+            symbols.add(symbol)
+
+        state_labels = sorted(labels)
+        state_ids = {label: index for index, label in enumerate(state_labels)}
+        sorted_symbols = sorted(symbols)
+        symbol_ids = {symbol: index for index, symbol in enumerate(sorted_symbols)}
+
+        edges = ((state_ids[source], symbol_ids[symbol], state_ids[sub_target])
+                 for (source, symbol), target in transitions.items()
+                 for sub_target in target)
+
+        self._load(state_labels,
+                   state_ids[initial_state],
+                   {state_ids[state] for state in final_states},
+                   sorted_symbols,
+                   TransitionTable.from_edges(len(state_labels), len(sorted_symbols), edges),
+                   alphabet)
+
+    @classmethod
+    def from_table(cls,
+                   state_labels: list[str] | Callable[[int], str],
+                   initial_state: int,
+                   final_states: Iterable[int],
+                   symbols: list[str],
+                   table: TransitionTable,
+                   alphabet: set[str] | None = None) -> 'FiniteAutomaton':
+        '''
+        Cria um autômato diretamente a partir da representação compacta.
+
+        Os rótulos podem ser uma lista ou uma função que gera o rótulo de um estado sob demanda.
+        '''
+
+        finite_automaton = cls.__new__(cls)
+        finite_automaton._load(state_labels,
+                               initial_state,
+                               set(final_states),
+                               symbols,
+                               table,
+                               set(symbols) if alphabet is None else alphabet)
+
+        return finite_automaton
+
+    def _load(self,
+              state_labels: list[str] | Callable[[int], str],
+              initial_state: int,
+              final_states: set[int],
+              symbols: list[str],
+              table: TransitionTable,
+              alphabet: set[str]) -> None:
+        if callable(state_labels):
+            self._state_labels = None
+            self._state_label_factory = state_labels
+        else:
+            self._state_labels = state_labels
+            self._state_label_factory = None
+
+        self._state_ids = None
+        self._symbols = symbols
+        self._symbol_ids = {symbol: index for index, symbol in enumerate(symbols)}
         self._alphabet = alphabet
-        self._transitions = transitions
+        self._initial_state_id = initial_state
+        self._final_state_ids = final_states
+        self._table = table
+        self._epsilon_closures = None
 
     def __str__(self) -> str:
-        final_states = '{' + ','.join(sorted(self._final_states)) + '}'
-        alphabet = '{' + ','.join(sorted(self._alphabet)) + '}'
+        output = StringIO()
+        FiniteAutomatonWriter.write(self, output)
 
-        transitions = []
+        return output.getvalue()
 
-        for (source, symbol), target in self._transitions.items():
-            for sub_target in target:
-                transitions.append((source, symbol, sub_target))
+    def __getstate__(self) -> dict:
+        # A função de rótulos pode não ser serializável, então os rótulos são materializados.
+        state = self.__dict__.copy()
+        state['_state_labels'] = self.state_labels
+        state['_state_label_factory'] = None
+        state['_state_ids'] = None
+        state['_epsilon_closures'] = None
 
-        sorted_transitions = sorted(transitions, key=lambda x: (x[0].strip('{}'), x[1]))
-        processed_transitions = ';'.join([','.join(x) for x in sorted_transitions])
-
-        return f'{len(self._states)};{self._initial_state};{final_states};{alphabet};{processed_transitions}'
+        return state
 
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, FiniteAutomaton):
             return NotImplemented
 
-        return self._states == __value._states and \
-            self._initial_state == __value._initial_state and \
-            self._final_states == __value._final_states and \
+        return self.states == __value.states and \
+            self.initial_state == __value.initial_state and \
+            self.final_states == __value.final_states and \
             self._alphabet == __value._alphabet and \
-            self._transitions == __value._transitions
+            self.labelled_transitions() == __value.labelled_transitions()
+
+    @property
+    def states(self) -> set[str]:
+        '''
+        Retorna os estados.
+        '''
+
+        return set(self.state_labels)
 
     @property
     def initial_state(self) -> str:
@@ -60,7 +152,7 @@ class FiniteAutomaton():
         Retorna o estado inicial.
         '''
 
-        return self._initial_state
+        return self.state_label(self._initial_state_id)
 
     @property
     def final_states(self) -> set[str]:
@@ -68,7 +160,7 @@ class FiniteAutomaton():
         Retorna os estados finais.
         '''
 
-        return self._final_states
+        return {self.state_label(state) for state in self._final_state_ids}
 
     @property
     def alphabet(self) -> set[str]:
@@ -78,43 +170,305 @@ class FiniteAutomaton():
 
         return self._alphabet
 
+    @property
+    def state_count(self) -> int:
+        '''
+        Retorna o número de estados.
+        '''
+
+        return self._table.state_count
+
+    @property
+    def initial_state_id(self) -> int:
+        '''
+        Retorna o índice do estado inicial.
+        '''
+
+        return self._initial_state_id
+
+    @property
+    def final_state_ids(self) -> set[int]:
+        '''
+        Retorna os índices dos estados finais.
+        '''
+
+        return self._final_state_ids
+
+    @property
+    def symbols(self) -> list[str]:
+        '''
+        Retorna os símbolos na ordem dos seus índices.
+        '''
+
+        return self._symbols
+
+    @property
+    def table(self) -> TransitionTable:
+        '''
+        Retorna a tabela de transições.
+        '''
+
+        return self._table
+
+    @property
+    def state_labels(self) -> list[str]:
+        '''
+        Retorna os rótulos dos estados na ordem dos seus índices.
+        '''
+
+        if self._state_labels is None:
+            self._state_labels = list(map(self._state_label_factory, range(self.state_count)))  # type: ignore
+
+        return self._state_labels
+
+    @property
+    def is_deterministic(self) -> bool:
+        '''
+        Retorna verdadeiro se o autômato não tem transições por épsilon nem não determinismo.
+        '''
+
+        if not self._table.is_deterministic:
+            return False
+
+        epsilon = self._symbol_ids.get('&')
+
+        if epsilon is None:
+            return True
+
+        return all(self._table.target(state, epsilon) < 0 for state in range(self.state_count))
+
+    def state_label(self, state: int) -> str:
+        '''
+        Retorna o rótulo de um estado.
+        '''
+
+        if self._state_labels is None:
+            return self._state_label_factory(state)  # type: ignore
+
+        return self._state_labels[state]
+
+    def state_id(self, state: str) -> int | None:
+        '''
+        Retorna o índice de um estado.
+        '''
+
+        if self._state_ids is None:
+            self._state_ids = {label: index for index, label in enumerate(self.state_labels)}
+
+        return self._state_ids.get(state)
+
+    def symbol_id(self, symbol: str) -> int | None:
+        '''
+        Retorna o índice de um símbolo.
+        '''
+
+        return self._symbol_ids.get(symbol)
+
+    def labelled_transitions(self) -> dict[tuple[str, str], set[str]]:
+        '''
+        Retorna as transições indexadas pelos rótulos.
+        '''
+
+        labels = self.state_labels
+        transitions = {}
+
+        for source, symbol, target in self._table.edges():
+            transitions.setdefault((labels[source], self._symbols[symbol]), set()).add(labels[target])
+
+        return transitions
+
     def transition(self, state: str, symbol: str) -> set[str]:
         '''
         Retorna o estado de destino da transição.
         '''
 
-        return self._transitions.get((state, symbol), set())
+        state_id = self.state_id(state)
+        symbol_id = self._symbol_ids.get(symbol)
+
+        if state_id is None or symbol_id is None:
+            return set()
+
+        return {self.state_label(target) for target in self._table.targets(state_id, symbol_id)}
 
     def source_states(self, state: str, symbol: str | None = None) -> set[str]:
         '''
         Retorna todos os estados de origem de uma transição.
         '''
 
-        items = self._transitions.items()
+        target_id = self.state_id(state)
+
+        if target_id is None:
+            return set()
 
         if symbol is None:
-            return {source for (source, _), target in items if state in target}
+            return {self.state_label(source) for source in self._table.predecessors(target_id)}
+
+        symbol_id = self._symbol_ids.get(symbol)
 
-        return {source for (source, selected_symbol), target in items if state in target and symbol == selected_symbol}
+        if symbol_id is None:
+            return set()
+
+        return {self.state_label(source) for source in self._table.sources(target_id, symbol_id)}
 
     def state_epsilon_closure(self, state: str) -> set[str]:
         '''
         Retorna o épsilon-fecho de um estado.
         '''
 
-        epsilon_closure = {state}
+        state_id = self.state_id(state)
 
-        for target_state in self.transition(state, '&'):
-            epsilon_closure |= self.state_epsilon_closure(target_state)
+        if state_id is None:
+            return {state}
 
-        return epsilon_closure
+        return set(map(self.state_label, self.epsilon_closure_states(state_id)))
 
     def epsilon_closure(self) -> dict[str, set[str]]:
         '''
         Retorna o épsilon-fecho de todos os estados.
         '''
 
-        return {state: self.state_epsilon_closure(state) for state in self._states}
+        labels = self.state_labels
+
+        return {labels[state]: {labels[sub_state] for sub_state in self.epsilon_closure_states(state)}
+                for state in range(self.state_count)}
+
+    def epsilon_closure_states(self, state: int) -> tuple[int, ...]:
+        '''
+        Retorna os índices do épsilon-fecho de um estado em ordem crescente.
+        '''
+
+        return self.epsilon_closures().get(state, (state,))
+
+    def epsilon_closure_mask(self, state: int) -> int:
+        '''
+        Retorna o épsilon-fecho de um estado como uma máscara de bits dos índices.
+        '''
+
+        return Bitset.from_positions(self.epsilon_closure_states(state))
+
+    def epsilon_closures(self) -> dict[int, tuple[int, ...]]:
+        '''
+        Retorna os épsilon-fechos que não são apenas o próprio estado, como tuplas ordenadas dos índices.
+
+        Os fechos são calculados uma única vez: o grafo de transições por épsilon é condensado em
+        componentes fortemente conexas (Tarjan iterativo), que são emitidas em ordem topológica reversa.
+        Assim, o fecho de uma componente é a união dos seus estados com os fechos já calculados das
+        componentes sucessoras. Os estados de uma componente compartilham a mesma tupla e estados sem
+        transições por épsilon não ocupam memória.
+        '''
+
+        if self._epsilon_closures is not None:
+            return self._epsilon_closures
+
+        state_count = self.state_count
+        epsilon = self._symbol_ids.get('&')
+        closures: dict[int, tuple[int, ...]] = {}
+
+        if epsilon is None:
+            self._epsilon_closures = closures
+            return closures
+
+        table = self._table
+        indexes = array('i', [-1]) * state_count
+        lowlinks = array('i', [0]) * state_count
+        on_stack = bytearray(state_count)
+        component_stack = []
+        counter = 0
+
+        for root in range(state_count):
+            if indexes[root] != -1:
+                continue
+
+            indexes[root] = lowlinks[root] = counter
+            counter += 1
+            component_stack.append(root)
+            on_stack[root] = 1
+            work_stack = [(root, table.targets(root, epsilon), 0)]
+
+            while len(work_stack) > 0:
+                state, targets, position = work_stack[-1]
+
+                if position < len(targets):
+                    work_stack[-1] = (state, targets, position + 1)
+                    target = targets[position]
+
+                    if indexes[target] == -1:
+                        indexes[target] = lowlinks[target] = counter
+                        counter += 1
+                        component_stack.append(target)
+                        on_stack[target] = 1
+                        work_stack.append((target, table.targets(target, epsilon), 0))
+                    elif on_stack[target]:
+                        lowlinks[state] = min(lowlinks[state], indexes[target])
+
+                    continue
+
+                work_stack.pop()
+
+                if len(work_stack) > 0:
+                    parent = work_stack[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[state])
+
+                if lowlinks[state] != indexes[state]:
+                    continue
+
+                component = []
+
+                while True:
+                    member = component_stack.pop()
+                    on_stack[member] = 0
+                    component.append(member)
+
+                    if member == state:
+                        break
+
+                closure_states = set(component)
+
+                # As componentes sucessoras já foram emitidas; membros desta componente ainda não têm fecho.
+                for member in component:
+                    for target in table.targets(member, epsilon):
+                        closure = closures.get(target)
+
+                        if closure is None:
+                            closure_states.add(target)
+                        else:
+                            closure_states.update(closure)
+
+                if len(closure_states) > 1:
+                    closure = tuple(sorted(closure_states))
+
+                    for member in component:
+                        closures[member] = closure
+
+        self._epsilon_closures = closures
+
+        return closures
+
+    def move_mask(self, state: int, symbol: int) -> int:
+        '''
+        Retorna o épsilon-fecho dos destinos da transição de um estado por um símbolo como máscara de bits.
+        '''
+
+        closures = self.epsilon_closures()
+        mask = 0
+
+        for target in self._table.targets(state, symbol):
+            closure = closures.get(target)
+
+            if closure is None:
+                mask |= 1 << target
+            else:
+                mask |= Bitset.from_positions(closure)
+
+        return mask
+
+    @staticmethod
+    def mask_states(mask: int) -> list[int]:
+        '''
+        Retorna os índices dos bits ativos de uma máscara.
+        '''
+
+        return Bitset.positions(mask)
 
 
 class FiniteAutomatonBuilder():
@@ -129,20 +483,185 @@ class FiniteAutomatonBuilder():
         Processa um string de entrada e retorna um autômato finito.
         '''
 
-        data = raw_data.split(';')
+        return FiniteAutomatonBuilder.build_from_file(StringIO(raw_data))
 
-        states = set()
-        initial_state = data[1]
-        final_states = set(data[2][1:-1].split(','))
-        alphabet = set(data[3][1:-1].split(','))
-        transitions = {}
+    @staticmethod
+    def build_from_file(file: TextIO, chunk_size: int = 65536) -> FiniteAutomaton:
+        '''
+        Lê um autômato de uma linha de um arquivo, em blocos, e retorna um autômato finito.
+
+        As transições são internadas à medida que são lidas e guardadas em vetores de inteiros, então a
+        entrada nunca é mantida inteira na memória. A leitura termina no fim da linha ou do arquivo.
+        '''
+
+        fields = FiniteAutomatonBuilder.read_fields(file, chunk_size)
+
+        try:
+            next(fields)
+            initial_state = next(fields)
+            final_states = set(FiniteAutomatonBuilder.split_labels(next(fields)[1:-1])) - {''}
+            alphabet = set(next(fields)[1:-1].split(',')) - {''}
+        except StopIteration as error:
+            raise ValueError('Cabeçalho do autômato incompleto.') from error
+
+        state_ids = {initial_state: 0}
+        symbol_ids = {}
+
+        for state in sorted(final_states):
+            state_ids.setdefault(state, len(state_ids))
+
+        for symbol in sorted(alphabet):
+            symbol_ids.setdefault(symbol, len(symbol_ids))
+
+        sources = array('i')
+        symbols = array('i')
+        targets = array('i')
+
+        for field in fields:
+            if field == '':
+                continue
+
+            parts = field.split(',')
+
+            if len(parts) != 3:
+                parts = FiniteAutomatonBuilder.split_labels(field)
+
+            source, symbol, target = parts
+            sources.append(state_ids.setdefault(source, len(state_ids)))
+            symbols.append(symbol_ids.setdefault(symbol, len(symbol_ids)))
+            targets.append(state_ids.setdefault(target, len(state_ids)))
+
+        # Renumera estados e símbolos na ordem dos rótulos, como no construtor de FiniteAutomaton.
+        state_labels = sorted(state_ids)
+        state_ranks = array('i', [0]) * len(state_labels)
+        sorted_symbols = sorted(symbol_ids)
+        symbol_ranks = array('i', [0]) * len(sorted_symbols)
+
+        for rank, label in enumerate(state_labels):
+            state_ranks[state_ids[label]] = rank
+
+        for rank, symbol in enumerate(sorted_symbols):
+            symbol_ranks[symbol_ids[symbol]] = rank
+
+        for index, source in enumerate(sources):
+            sources[index] = state_ranks[source]
+            symbols[index] = symbol_ranks[symbols[index]]
+            targets[index] = state_ranks[targets[index]]
+
+        table = TransitionTable.from_edge_arrays(len(state_labels), len(sorted_symbols), sources, symbols, targets)
+
+        return FiniteAutomaton.from_table(state_labels,
+                                          state_ranks[0],
+                                          (state_ranks[state_ids[state]] for state in final_states),
+                                          sorted_symbols,
+                                          table,
+                                          alphabet)
+
+    @staticmethod
+    def split_labels(text: str) -> list[str]:
+        '''
+        Separa um texto nas vírgulas fora de chaves, para que rótulos como {A,BC} fiquem inteiros.
+        '''
 
-        for line in data[4:]:
-            source, symbol, target = line.split(',')
-            states |= {source, target}
-            transitions.setdefault((source, symbol), set()).add(target)
+        if '{' not in text:
+            return text.split(',')
 
-        return FiniteAutomaton(states, initial_state, final_states, alphabet, transitions)
+        labels = []
+        depth = 0
+        start = 0
+
+        for index, char in enumerate(text):
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                labels.append(text[start:index])
+                start = index + 1
+
+        labels.append(text[start:])
+
+        return labels
+
+    @staticmethod
+    def read_fields(file: TextIO, chunk_size: int = 65536) -> Iterator[str]:
+        '''
+        Itera sobre os campos separados por ';' de uma linha de um arquivo, lendo no máximo `chunk_size`
+        caracteres por vez.
+        '''
+
+        remainder = ''
+
+        while True:
+            chunk = file.readline(chunk_size)
+
+            if chunk == '':
+                break
+
+            line_ended = chunk.endswith('\n')
+            fields = (remainder + chunk.rstrip('\r\n')).split(';')
+            remainder = fields.pop()
+
+            yield from fields
+
+            if line_ended:
+                break
+
+        yield remainder
+
+    @staticmethod
+    def explore_states(initial_key: Hashable,
+                       row: Callable[[Any], Iterable[Hashable | None]],
+                       is_final: Callable[[Any], bool],
+                       phase: str,
+                       instrumentation: Instrumentation | None = None) -> tuple[list, list[int], array]:
+        '''
+        Explora em largura os estados de um AFD identificados por chaves, como subconjuntos ou termos, a partir
+        da chave inicial, que recebe o índice 0.
+
+        `row` retorna a chave do destino de um estado por cada símbolo, ou None para o sumidouro implícito.
+        Retorna as chaves dos estados, os estados finais e a tabela densa de destinos.
+        '''
+
+        keys = [initial_key]
+        key_ids = {initial_key: 0}
+        final_states = []
+        targets = array('i')
+        unprocessed_states = deque([0])
+        instrumented = instrumentation is not None
+        worklist_peak = 1
+
+        with Instrumentation.phase_of(instrumentation, phase):
+            while len(unprocessed_states) > 0:
+                if instrumented:
+                    worklist_peak = max(worklist_peak, len(unprocessed_states))
+
+                source = unprocessed_states.popleft()
+                key = keys[source]
+
+                if is_final(key):
+                    final_states.append(source)
+
+                for target_key in row(key):
+                    if target_key is None:
+                        targets.append(NO_STATE)
+                        continue
+
+                    target = key_ids.get(target_key)
+
+                    if target is None:
+                        target = len(keys)
+                        key_ids[target_key] = target
+                        keys.append(target_key)
+                        unprocessed_states.append(target)
+
+                    targets.append(target)
+
+        if instrumentation is not None:
+            instrumentation.count('dfa states', len(keys))
+            instrumentation.maximum('worklist peak', worklist_peak)
+
+        return keys, final_states, targets
 
     @staticmethod
     def build_from_followpos(root_firstpos: set[int],
@@ -154,51 +673,151 @@ class FiniteAutomatonBuilder():
         Constrói um autômato finito a partir de firstpos e followpos.
         '''
 
-        raw_transitions = {}
+        followpos_masks = [0] * (last_symbol_index + 1)
 
-        initial_state = '{' + ','.join(map(str, sorted(root_firstpos))) + '}'
-        d_states = {tuple(root_firstpos): False}
+        for position, targets in followpos.items():
+            for target in targets:
+                followpos_masks[position] |= 1 << target
 
-        while True:
-            current_state = set()
+        root_firstpos_mask = 0
 
-            for state, marked in d_states.items():
-                if not marked:
-                    d_states[state] = True
-                    current_state = state
-                    break
-            else:
-                break
+        for position in root_firstpos:
+            root_firstpos_mask |= 1 << position
+
+        return FiniteAutomatonBuilder.build_from_position_masks(root_firstpos_mask,
+                                                                followpos_masks,
+                                                                symbols,
+                                                                position_symbols,
+                                                                last_symbol_index)
 
-            for symbol in symbols:
-                target = set()
+    @staticmethod
+    def build_from_position_masks(root_firstpos: int,
+                                  followpos: list[int],
+                                  symbols: set[str],
+                                  position_symbols: dict[int, str],
+                                  last_symbol_index: int,
+                                  instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
+        '''
+        Constrói um autômato finito a partir de firstpos e followpos representados como máscaras de bits.
+
+        O bit i de uma máscara representa a posição i e `followpos[i]` é a máscara de followpos(i).
+        '''
 
-                for position in current_state:
-                    if symbol == position_symbols[position]:
-                        target |= followpos[position]
+        sorted_symbols = sorted(symbols)
+        symbol_count = len(sorted_symbols)
+        symbol_positions = {symbol: 0 for symbol in sorted_symbols}
 
-                if len(target) != 0 and tuple(target) not in d_states.keys():
-                    d_states[tuple(target)] = False
+        for position, symbol in position_symbols.items():
+            if symbol in symbol_positions:
+                symbol_positions[symbol] |= 1 << position
 
-                raw_transitions[(tuple(current_state), symbol)] = tuple(target)
+        symbol_masks = [symbol_positions[symbol] for symbol in sorted_symbols]
+        last_symbol_mask = 1 << last_symbol_index
 
-        final_states = set()
+        def row(subset: int) -> list[int | None]:
+            target_subsets = []
 
-        for state in d_states:
-            if last_symbol_index in state:
-                final_states.add(state)
+            for symbol_mask in symbol_masks:
+                target_subset = 0
 
-        states = set(map(lambda x: '{' + ','.join(map(str, sorted(x))) + '}', d_states.keys()))
-        final_states = set(map(lambda x: '{' + ','.join(map(str, sorted(x))) + '}', final_states))
+                for position in FiniteAutomaton.mask_states(subset & symbol_mask):
+                    target_subset |= followpos[position]
 
-        transitions = {}
+                target_subsets.append(target_subset if target_subset != 0 else None)
+
+            return target_subsets
 
-        for (source, symbol), target in raw_transitions.items():
-            if len(target) > 0:
-                transitions[('{' + ','.join(map(str, sorted(source))) + '}', symbol)
-                            ] = {'{' + ','.join(map(str, sorted(target))) + '}'}
+        subsets, final_states, targets = FiniteAutomatonBuilder.explore_states(
+            root_firstpos,
+            row,
+            lambda subset: subset & last_symbol_mask != 0,
+            'subset construction',
+            instrumentation)
 
-        return FiniteAutomaton(states, initial_state, final_states, symbols, transitions)
+        def state_label(state: int) -> str:
+            return '{' + ','.join(map(str, FiniteAutomaton.mask_states(subsets[state]))) + '}'
+
+        return FiniteAutomaton.from_table(state_label,
+                                          0,
+                                          final_states,
+                                          sorted_symbols,
+                                          TransitionTable(len(subsets), symbol_count, targets),
+                                          symbols)
+
+
+class FiniteAutomatonWriter():
+
+    '''
+    Escritor do formato textual.
+    '''
+
+    @staticmethod
+    def write(finite_automaton: FiniteAutomaton, file: TextIO, sort: bool = True, chunk_size: int = 4096) -> None:
+        '''
+        Escreve um autômato em um arquivo, com no máximo `chunk_size` transições por escrita.
+
+        Com `sort`, as transições saem na ordem canônica de `__str__`; os estados de origem são ordenados e as
+        transições são ordenadas apenas dentro de cada grupo de origens. Sem `sort`, as transições saem na
+        ordem da tabela, sem ordenação.
+        '''
+
+        final_states = '{' + ','.join(sorted(finite_automaton.final_states)) + '}'
+        alphabet = '{' + ','.join(sorted(finite_automaton.alphabet)) + '}'
+
+        file.write(f'{finite_automaton.state_count};{finite_automaton.initial_state};{final_states};{alphabet};')
+
+        if sort:
+            transitions = FiniteAutomatonWriter.sorted_transitions(finite_automaton)
+        else:
+            labels = finite_automaton.state_labels
+            symbols = finite_automaton.symbols
+            transitions = (f'{labels[source]},{symbols[symbol]},{labels[target]}'
+                           for source, symbol, target in finite_automaton.table.edges())
+
+        chunk = []
+        separator = ''
+
+        for transition in transitions:
+            chunk.append(transition)
+
+            if len(chunk) == chunk_size:
+                file.write(separator + ';'.join(chunk))
+                chunk.clear()
+                separator = ';'
+
+        if len(chunk) > 0:
+            file.write(separator + ';'.join(chunk))
+
+    @staticmethod
+    def sorted_transitions(finite_automaton: FiniteAutomaton) -> Iterator[str]:
+        '''
+        Itera sobre as transições na ordem canônica: origem sem chaves, símbolo e destino.
+        '''
+
+        labels = finite_automaton.state_labels
+        symbols = finite_automaton.symbols
+        table = finite_automaton.table
+        source_keys = [label.strip('{}') for label in labels]
+        sources = sorted(range(len(labels)), key=source_keys.__getitem__)
+        start = 0
+
+        while start < len(sources):
+            end = start + 1
+
+            while end < len(sources) and source_keys[sources[end]] == source_keys[sources[start]]:
+                end += 1
+
+            # Origens com a mesma chave são intercaladas; a ordenação é estável como em `__str__`.
+            group = sorted(range(start, end), key=sources.__getitem__)
+            transitions = [(symbols[symbol], labels[target], labels[sources[index]])
+                           for index in group
+                           for symbol, target in table.successors(sources[index])]
+            transitions.sort(key=lambda transition: (transition[0], transition[1]))
+
+            for symbol, target, source in transitions:
+                yield f'{source},{symbol},{target}'
+
+            start = end
 
 
 class FiniteAutomatonDeterminizer():
@@ -208,59 +827,237 @@ class FiniteAutomatonDeterminizer():
     '''
 
     @staticmethod
-    def determinize(finite_automaton: FiniteAutomaton) -> FiniteAutomaton:
+    def determinize(finite_automaton: FiniteAutomaton,
+                    instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
         '''
         Determiniza um autômato finito.
         '''
 
-        final_states = set()
+        with Instrumentation.phase_of(instrumentation, 'determinize'):
+            return FiniteAutomatonDeterminizer.construct_subsets(finite_automaton, instrumentation)
+
+    @staticmethod
+    def construct_subsets(finite_automaton: FiniteAutomaton,
+                          instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
+        '''
+        Executa a construção de subconjuntos de `determinize`.
+        '''
+
+        subsets, final_states, targets, symbols, alphabet = FiniteAutomatonDeterminizer.subset_table(finite_automaton,
+                                                                                                    None,
+                                                                                                    instrumentation)
+
+        separator = FiniteAutomatonDeterminizer.label_separator(finite_automaton)
+
+        def state_label(state: int) -> str:
+            return FiniteAutomatonDeterminizer.set_to_state(set(map(finite_automaton.state_label, subsets[state])),
+                                                            separator)
+
+        return FiniteAutomaton.from_table(state_label,
+                                          0,
+                                          final_states,
+                                          symbols,
+                                          TransitionTable(len(subsets), len(symbols), targets),
+                                          alphabet)
+
+    @staticmethod
+    def subset_table(finite_automaton: FiniteAutomaton,
+                     live_states: bytearray | None,
+                     instrumentation: Instrumentation | None) -> tuple[list[tuple], list[int], array, list, set]:
+        '''
+        Constrói a tabela do AFD de subconjuntos, mantendo em cada subconjunto apenas os estados marcados em
+        `live_states`, ou todos quando ele é None.
+
+        Subconjuntos vazios depois do filtro levam ao sumidouro implícito (`NO_STATE`). Retorna os subconjuntos,
+        os estados finais, a tabela densa de destinos, os símbolos e o alfabeto do AFD.
+        '''
+
         alphabet = {x for x in finite_automaton.alphabet if x != '&'}
-        transitions = {}
+        symbols = [symbol for symbol in finite_automaton.symbols if symbol in alphabet]
+        symbol_ids = [finite_automaton.symbol_id(symbol) for symbol in symbols]
+        table = finite_automaton.table
 
-        epsilon_closure = finite_automaton.epsilon_closure()
+        with Instrumentation.phase_of(instrumentation, 'epsilon closure'):
+            closures = finite_automaton.epsilon_closures()
+            closure_count = len(closures)
 
-        initial_state = FiniteAutomatonDeterminizer.set_to_state(epsilon_closure[finite_automaton.initial_state])
-        states = {initial_state}
+            if live_states is not None:
+                closures = {state: tuple(target for target in closure if live_states[target])
+                            for state, closure in closures.items()}
 
-        unprocessed_states = [initial_state]
+            # Os destinos de cada estado já incluem os fechos, então a construção só une os destinos dos estados
+            # de cada subconjunto.
+            moves = []
+            closure_unions = 0
 
-        while len(unprocessed_states) > 0:
-            source = unprocessed_states.pop(0)
+            for symbol in symbol_ids:
+                symbol_moves, symbol_unions = FiniteAutomatonDeterminizer.closed_moves(table,
+                                                                                      symbol,
+                                                                                      closures,
+                                                                                      live_states)
+                moves.append(symbol_moves)
+                closure_unions += symbol_unions
 
-            for symbol in alphabet:
-                target = set()
+        if instrumentation is not None:
+            instrumentation.count('nfa states', finite_automaton.state_count)
+            instrumentation.count('epsilon closures', closure_count)
+            instrumentation.count('closure unions', closure_unions)
 
-                for state in source[1:-1]:
-                    target_set = finite_automaton.transition(state, symbol)
+        final_state_ids = finite_automaton.final_state_ids
 
-                    for state in target_set:
-                        target |= epsilon_closure[state]
+        # Cada estado do AFD é um subconjunto de estados do AFN representado pela tupla ordenada dos índices,
+        # então a memória de um subconjunto é proporcional ao seu tamanho e não ao número de estados do AFN.
+        initial_subset = tuple(state for state in finite_automaton.epsilon_closure_states(
+            finite_automaton.initial_state_id) if live_states is None or live_states[state])
 
-                if len(target) == 0:
-                    continue
+        def row(subset: tuple[int, ...]) -> list[tuple[int, ...] | None]:
+            target_subsets = []
+
+            for symbol_moves in moves:
+                target_states = set()
+
+                for state in subset:
+                    target_states.update(symbol_moves[state])
+
+                target_subsets.append(tuple(sorted(target_states)) if len(target_states) > 0 else None)
+
+            return target_subsets
+
+        subsets, final_states, targets = FiniteAutomatonBuilder.explore_states(
+            initial_subset,
+            row,
+            lambda subset: not final_state_ids.isdisjoint(subset),
+            'subset construction',
+            instrumentation)
+
+        return subsets, final_states, targets, symbols, alphabet
+
+    @staticmethod
+    def closed_moves(table: TransitionTable,
+                     symbol: int,
+                     closures: dict[int, tuple[int, ...]],
+                     live_states: bytearray | None) -> tuple[list[Sequence[int]], int]:
+        '''
+        Retorna os destinos de cada estado por um símbolo unidos aos seus épsilon-fechos, mantendo apenas os
+        estados marcados em `live_states` quando ele não é None, e o número de fechos unidos.
+
+        Um destino único com fecho compartilha a tupla do fecho, então a memória fica proporcional ao número de
+        transições e aos fechos.
+        '''
+
+        symbol_moves = []
+        closure_unions = 0
 
-                target_state = FiniteAutomatonDeterminizer.set_to_state(target)
+        for state in range(table.state_count):
+            state_targets = table.targets(state, symbol)
 
-                for state in target_state:
-                    if state in finite_automaton.final_states:
-                        final_states |= {target_state}
+            if live_states is not None:
+                state_targets = tuple(target for target in state_targets if live_states[target])
 
-                if target_state not in states:
-                    unprocessed_states.append(target_state)
+            if len(closures) > 0 and len(state_targets) > 0:
+                if len(state_targets) == 1:
+                    closure = closures.get(state_targets[0])
 
-                transitions.setdefault((source, symbol), set()).add(target_state)
+                    if closure is not None:
+                        state_targets = closure
+                        closure_unions += 1
+                else:
+                    target_states = set()
 
-                states |= {target_state}
+                    for target in state_targets:
+                        closure = closures.get(target)
+
+                        if closure is not None:
+                            target_states.update(closure)
+                            closure_unions += 1
+                        else:
+                            target_states.add(target)
 
-        return FiniteAutomaton(states, initial_state, final_states, alphabet, transitions)
+                    state_targets = tuple(sorted(target_states))
+
+            symbol_moves.append(state_targets)
+
+        return symbol_moves, closure_unions
 
     @staticmethod
-    def set_to_state(states: set[str]) -> str:
+    def set_to_state(states: set[str], separator: str = '') -> str:
         '''
         Retorna um estado a partir de um conjunto de estados.
         '''
 
-        return '{' + ''.join(sorted(states)) + '}'
+        return '{' + separator.join(sorted(states)) + '}'
+
+    @staticmethod
+    def label_separator(finite_automaton: FiniteAutomaton) -> str:
+        '''
+        Retorna o separador dos rótulos dos subconjuntos de um autômato.
+
+        Sem separador, como em {AB}, só quando todos os rótulos têm um caractere; senão {A,BC} e {AB,C} teriam o
+        mesmo rótulo.
+        '''
+
+        return '' if all(len(label) == 1 for label in finite_automaton.state_labels) else ','
+
+
+class FiniteAutomatonEpsilonRemover():
+
+    '''
+    Removedor de transições por épsilon.
+    '''
+
+    @staticmethod
+    def remove_epsilon_transitions(finite_automaton: FiniteAutomaton) -> FiniteAutomaton:
+        '''
+        Retorna um AFN equivalente sem transições por épsilon.
+
+        Cada estado p passa a ter as transições de todos os estados do seu épsilon-fecho e é final se o
+        fecho contém um estado final. Estados que só eram alcançados por épsilon são descartados.
+        '''
+
+        epsilon = finite_automaton.symbol_id('&')
+
+        if epsilon is None:
+            return finite_automaton
+
+        table = finite_automaton.table
+        final_state_ids = finite_automaton.final_state_ids
+        symbols = [symbol for symbol in finite_automaton.symbols if symbol != '&']
+        symbol_map = [symbol for symbol in range(table.symbol_count) if symbol != epsilon]
+
+        new_ids = {finite_automaton.initial_state_id: 0}
+        old_ids = [finite_automaton.initial_state_id]
+        final_states = []
+        edges = []
+        unprocessed_states = deque([finite_automaton.initial_state_id])
+
+        while len(unprocessed_states) > 0:
+            state = unprocessed_states.popleft()
+            source = new_ids[state]
+            closure = finite_automaton.epsilon_closure_states(state)
+
+            if any(closure_state in final_state_ids for closure_state in closure):
+                final_states.append(source)
+
+            for new_symbol, symbol in enumerate(symbol_map):
+                targets = set()
+
+                for closure_state in closure:
+                    targets.update(table.targets(closure_state, symbol))
+
+                for target in targets:
+                    if target not in new_ids:
+                        new_ids[target] = len(old_ids)
+                        old_ids.append(target)
+                        unprocessed_states.append(target)
+
+                    edges.append((source, new_symbol, new_ids[target]))
+
+        return FiniteAutomaton.from_table(lambda state: finite_automaton.state_label(old_ids[state]),
+                                          0,
+                                          final_states,
+                                          symbols,
+                                          TransitionTable.from_edges(len(old_ids), len(symbols), edges),
+                                          finite_automaton.alphabet - {'&'})
 
 
 class FiniteAutomatonMinimizer():
@@ -270,55 +1067,235 @@ class FiniteAutomatonMinimizer():
     '''
 
     @staticmethod
-    def minimize(finite_automaton: FiniteAutomaton) -> FiniteAutomaton:
+    def minimize(finite_automaton: FiniteAutomaton,
+                 instrumentation: Instrumentation | None = None,
+                 refine: Refinement | None = None) -> FiniteAutomaton:
         '''
         Minimiza um autômato finito determinístico.
+
+        O refinamento da partição é feito por `refine`, que por padrão é o algoritmo de Hopcroft.
+        '''
+
+        if not finite_automaton.is_deterministic:
+            raise ValueError('O autômato não é determinístico.')
+
+        with Instrumentation.phase_of(instrumentation, 'minimize'):
+            return FiniteAutomatonMinimizer.minimize_deterministic(finite_automaton, instrumentation, refine)
+
+    @staticmethod
+    def determinize_and_minimize(finite_automaton: FiniteAutomaton,
+                                 instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
         '''
+        Retorna o AFD mínimo de um autômato finito qualquer sem construir o AFD intermediário completo.
 
-        reachable_states = FiniteAutomatonMinimizer.filter_unreachable_states(finite_automaton)
-        reachable_final_states = finite_automaton.final_states & reachable_states
-        live_states = reachable_final_states.copy()
+        Os estados do AFN que não alcançam um estado final são retirados de cada subconjunto durante a
+        construção, então subconjuntos que só diferem nesses estados viram um só e subconjuntos sem estados
+        vivos viram o sumidouro implícito. Todos os estados construídos são alcançáveis e vivos, e o
+        refinamento trabalha diretamente sobre a tabela de inteiros da construção, sem rótulos. Os rótulos
+        do resultado são os de `minimize(determinize(...))` sem os estados mortos do AFN.
+        '''
 
-        FiniteAutomatonMinimizer.filter_dead_states(finite_automaton, live_states, live_states)
+        with Instrumentation.phase_of(instrumentation, 'determinize and minimize'):
+            with Instrumentation.phase_of(instrumentation, 'trim'):
+                live_states = FiniteAutomatonMinimizer.live_nfa_states(finite_automaton)
 
-        equivalence_classes = FiniteAutomatonMinimizer.refine_equivalence_classes(finite_automaton,
-                                                                                  live_states,
-                                                                                  reachable_final_states)
+            subsets, final_states, targets, symbols, alphabet = FiniteAutomatonDeterminizer.subset_table(
+                finite_automaton, live_states, instrumentation)
+            state_count = len(subsets)
+            symbol_count = len(symbols)
 
-        states = set(map(lambda x: sorted(x)[0], equivalence_classes))
-        final_states = {state for state in states if state in reachable_final_states}
-        alphabet = finite_automaton.alphabet
-        transitions = {}
+            separator = FiniteAutomatonDeterminizer.label_separator(finite_automaton)
+
+            def state_label(state: int) -> str:
+                return FiniteAutomatonDeterminizer.set_to_state(set(map(finite_automaton.state_label, subsets[state])),
+                                                                separator)
+
+            dfa = FiniteAutomaton.from_table(state_label,
+                                             0,
+                                             final_states,
+                                             symbols,
+                                             TransitionTable(state_count, symbol_count, targets),
+                                             alphabet)
+
+            if len(subsets[0]) == 0:
+                return dfa
+
+            # O sumidouro entra como o último estado, para que o AFD fique completo.
+            sink = state_count
+            complete_targets = array('i', [sink]) * ((state_count + 1) * symbol_count)
+            final_state_mask = bytearray(state_count + 1)
+
+            for cell, target in enumerate(targets):
+                if target != NO_STATE:
+                    complete_targets[cell] = target
+
+            for state in final_states:
+                final_state_mask[state] = 1
 
-        for source in states:
-            for symbol in alphabet:
-                old_targets = finite_automaton.transition(source, symbol)
+            with Instrumentation.phase_of(instrumentation, 'refinement'):
+                block_of, block_count = FiniteAutomatonMinimizer.hopcroft(state_count + 1,
+                                                                          symbol_count,
+                                                                          complete_targets,
+                                                                          final_state_mask)
 
-                for equivalence_class in equivalence_classes:
-                    if len(old_targets & equivalence_class) > 0:
-                        transitions.setdefault((source, symbol), set()).add(sorted(equivalence_class)[0])
+            if instrumentation is not None:
+                instrumentation.count('blocks', block_count)
+                instrumentation.count('partition splits', block_count - 2)
 
-        return FiniteAutomaton(states, finite_automaton.initial_state, final_states, alphabet, transitions)
+            with Instrumentation.phase_of(instrumentation, 'quotient'):
+                return FiniteAutomatonMinimizer.quotient(dfa,
+                                                         range(state_count),
+                                                         range(state_count),
+                                                         complete_targets,
+                                                         block_of)
 
     @staticmethod
-    def filter_unreachable_states(finite_automaton: FiniteAutomaton) -> set[str]:
+    def live_nfa_states(finite_automaton: FiniteAutomaton) -> bytearray:
         '''
-        Remove estados inalcançáveis.
+        Retorna os estados que alcançam algum estado final, por qualquer símbolo ou épsilon, marcados com 1.
         '''
 
-        reachable_states = {finite_automaton.initial_state}
-        unprocessed_states = [finite_automaton.initial_state]
+        table = finite_automaton.table
+        live_states = bytearray(table.state_count)
+        unprocessed_states = deque()
+
+        for state in finite_automaton.final_state_ids:
+            live_states[state] = 1
+            unprocessed_states.append(state)
 
         while len(unprocessed_states) > 0:
-            source = unprocessed_states.pop(0)
+            target = unprocessed_states.popleft()
 
-            for symbol in finite_automaton.alphabet:
-                for target in finite_automaton.transition(source, symbol):
-                    if target not in reachable_states:
-                        reachable_states |= {target}
-                        unprocessed_states.append(target)
+            for source in table.predecessors(target):
+                if not live_states[source]:
+                    live_states[source] = 1
+                    unprocessed_states.append(source)
 
-        return reachable_states
+        return live_states
+
+    @staticmethod
+    def minimize_deterministic(finite_automaton: FiniteAutomaton,
+                               instrumentation: Instrumentation | None = None,
+                               refine: Refinement | None = None) -> FiniteAutomaton:
+        '''
+        Executa as etapas de `minimize`: remoção de estados inúteis, refinamento e quociente.
+
+        `refine` recebe a tabela completa dos estados vivos, a marca dos estados finais e o número de símbolos,
+        e retorna o bloco de cada estado e os contadores do refinamento.
+        '''
+
+        table = finite_automaton.table
+        refine = refine if refine is not None else FiniteAutomatonMinimizer.refine_hopcroft
+
+        with Instrumentation.phase_of(instrumentation, 'trim'):
+            reachable_states = FiniteAutomatonMinimizer.reachable_state_ids(finite_automaton)
+            live_states = FiniteAutomatonMinimizer.live_state_ids(finite_automaton, reachable_states)
+
+        if instrumentation is not None:
+            instrumentation.count('input states', table.state_count)
+            instrumentation.count('reachable states', sum(reachable_states))
+            instrumentation.count('live states', sum(live_states))
+
+        if not live_states[finite_automaton.initial_state_id]:
+            return FiniteAutomatonMinimizer.empty_automaton(finite_automaton)
+
+        live_state_list, local_ids, complete_targets, final_states = FiniteAutomatonMinimizer.complete_live_table(
+            finite_automaton, live_states)
+
+        with Instrumentation.phase_of(instrumentation, 'refinement'):
+            block_of, counters = refine(complete_targets, final_states, table.symbol_count)
+
+        if instrumentation is not None:
+            for name, value in counters.items():
+                instrumentation.count(name, value)
+
+        with Instrumentation.phase_of(instrumentation, 'quotient'):
+            return FiniteAutomatonMinimizer.quotient(finite_automaton,
+                                                     live_state_list,
+                                                     local_ids,
+                                                     complete_targets,
+                                                     block_of)
+
+    @staticmethod
+    def refine_hopcroft(complete_targets: Sequence[int],
+                        final_states: bytearray,
+                        symbol_count: int) -> tuple[Sequence[int], dict[str, int]]:
+        '''
+        Refina a tabela completa dos estados vivos pelo algoritmo de Hopcroft para `minimize_deterministic`.
+        '''
+
+        block_of, block_count = FiniteAutomatonMinimizer.hopcroft(len(final_states),
+                                                                  symbol_count,
+                                                                  complete_targets,
+                                                                  final_states)
+
+        # A partição inicial tem dois blocos: há estados finais vivos e o sumidouro não é final.
+        return block_of, {'blocks': block_count, 'partition splits': block_count - 2}
+
+    @staticmethod
+    def empty_automaton(finite_automaton: FiniteAutomaton) -> FiniteAutomaton:
+        '''
+        Retorna o AFD mínimo da linguagem vazia, com o estado inicial do autômato e sem transições.
+        '''
+
+        symbol_count = finite_automaton.table.symbol_count
+
+        return FiniteAutomaton.from_table([finite_automaton.initial_state],
+                                          0,
+                                          (),
+                                          finite_automaton.symbols,
+                                          TransitionTable(1, symbol_count, array('i', [NO_STATE]) * symbol_count),
+                                          finite_automaton.alphabet)
+
+    @staticmethod
+    def complete_live_table(finite_automaton: FiniteAutomaton,
+                            live_states: bytearray) -> tuple[list[int], array, array, bytearray]:
+        '''
+        Renumera os estados vivos de um AFD e completa a tabela com um sumidouro, que recebe o último índice.
+
+        Retorna os estados vivos, o índice local de cada estado (o do sumidouro para os mortos), a tabela
+        completa de destinos e a marca dos estados finais.
+        '''
+
+        table = finite_automaton.table
+        symbol_count = table.symbol_count
+        dense_targets = table.dense_targets
+        live_state_list = [state for state in range(table.state_count) if live_states[state]]
+        sink = len(live_state_list)
+        local_ids = array('i', [sink]) * table.state_count
+        final_states = bytearray(sink + 1)
+
+        for local_id, state in enumerate(live_state_list):
+            local_ids[state] = local_id
+
+        for state in finite_automaton.final_state_ids:
+            if live_states[state]:
+                final_states[local_ids[state]] = 1
+
+        complete_targets = array('i', [sink]) * ((sink + 1) * symbol_count)
+
+        for local_id, state in enumerate(live_state_list):
+            row = state * symbol_count
+            local_row = local_id * symbol_count
+
+            for symbol in range(symbol_count):
+                target = dense_targets[row + symbol]
+
+                if target != NO_STATE:
+                    complete_targets[local_row + symbol] = local_ids[target]
+
+        return live_state_list, local_ids, complete_targets, final_states
+
+    @staticmethod
+    def filter_unreachable_states(finite_automaton: FiniteAutomaton) -> set[str]:
+        '''
+        Remove estados inalcançáveis.
+        '''
+
+        reachable_states = FiniteAutomatonMinimizer.reachable_state_ids(finite_automaton)
+
+        return {finite_automaton.state_label(state)
+                for state in range(finite_automaton.state_count) if reachable_states[state]}
 
     @staticmethod
     def filter_dead_states(finite_automaton: FiniteAutomaton,
@@ -328,16 +1305,61 @@ class FiniteAutomatonMinimizer():
         Remove estados mortos.
         '''
 
-        new_live_states = set()
+        unprocessed_states = deque(live_states)
+
+        while len(unprocessed_states) > 0:
+            state = unprocessed_states.popleft()
+
+            for source in finite_automaton.source_states(state):
+                if source not in visited_live_states:
+                    visited_live_states.add(source)
+                    unprocessed_states.append(source)
+
+    @staticmethod
+    def reachable_state_ids(finite_automaton: FiniteAutomaton) -> bytearray:
+        '''
+        Retorna uma máscara dos estados alcançáveis a partir do estado inicial.
+        '''
+
+        table = finite_automaton.table
+        reachable_states = bytearray(table.state_count)
+        reachable_states[finite_automaton.initial_state_id] = 1
+        unprocessed_states = deque([finite_automaton.initial_state_id])
+
+        while len(unprocessed_states) > 0:
+            source = unprocessed_states.popleft()
+
+            for _, target in table.successors(source):
+                if not reachable_states[target]:
+                    reachable_states[target] = 1
+                    unprocessed_states.append(target)
+
+        return reachable_states
+
+    @staticmethod
+    def live_state_ids(finite_automaton: FiniteAutomaton, reachable_states: bytearray) -> bytearray:
+        '''
+        Retorna uma máscara dos estados alcançáveis que alcançam algum estado final.
+        '''
+
+        table = finite_automaton.table
+        live_states = bytearray(table.state_count)
+        unprocessed_states = deque()
+
+        for state in finite_automaton.final_state_ids:
+            if reachable_states[state]:
+                live_states[state] = 1
+                unprocessed_states.append(state)
 
-        for state in live_states:
-            new_live_states |= finite_automaton.source_states(state)
+        while len(unprocessed_states) > 0:
+            target = unprocessed_states.popleft()
 
-        new_live_states -= visited_live_states
-        visited_live_states |= new_live_states
+            for source in table.predecessors(target):
+                if reachable_states[source] and not live_states[source]:
+                    live_states[source] = 1
+                    unprocessed_states.append(source)
 
-        if len(new_live_states) > 0:
-            FiniteAutomatonMinimizer.filter_dead_states(finite_automaton, visited_live_states, new_live_states)
+        return live_states
 
     @staticmethod
     def refine_equivalence_classes(finite_automaton: FiniteAutomaton,
@@ -347,41 +1369,199 @@ class FiniteAutomatonMinimizer():
         Refina as classes de equivalência.
         '''
 
-        equivalence_classes = [live_states - final_states, final_states]
-        equivalence_classes_temp = deepcopy(equivalence_classes)
+        state_ids = [finite_automaton.state_id(state) for state in live_states]
+        live_state_list = sorted(state for state in state_ids if state is not None)
+        table = finite_automaton.table
+        symbol_count = table.symbol_count
+        sink = len(live_state_list)
+        local_ids = {state: local_id for local_id, state in enumerate(live_state_list)}
+        complete_targets = array('i', [sink]) * ((sink + 1) * symbol_count)
+        local_final_states = bytearray(sink + 1)
 
-        while len(equivalence_classes_temp) > 0:
-            equivalence_class_temp = equivalence_classes_temp.pop(0)
+        for local_id, state in enumerate(live_state_list):
+            local_final_states[local_id] = finite_automaton.state_label(state) in final_states
 
-            for symbol in finite_automaton.alphabet:
-                source_states = set()
+            for symbol in range(symbol_count):
+                for target in table.targets(state, symbol):
+                    complete_targets[local_id * symbol_count + symbol] = local_ids.get(target, sink)
 
-                for state in equivalence_class_temp:
-                    source_states |= finite_automaton.source_states(state, symbol)
+        block_of, block_count = FiniteAutomatonMinimizer.hopcroft(sink + 1,
+                                                                  symbol_count,
+                                                                  complete_targets,
+                                                                  local_final_states)
 
-                index = 0
-                while index < len(equivalence_classes):
-                    equivalence_class = equivalence_classes[index]
+        equivalence_classes = [set() for _ in range(block_count)]
 
-                    if len(source_states & equivalence_class) > 0 and len(equivalence_class - source_states) > 0:
-                        # Set se refere ao conjunto de estados em uma classe de equivalência.
-                        old_set_index = equivalence_classes.index(equivalence_class)
-                        intersected_set = source_states & equivalence_class
-                        subtracted_set = equivalence_class - source_states
-                        index += 1
+        for local_id, state in enumerate(live_state_list):
+            equivalence_classes[block_of[local_id]].add(finite_automaton.state_label(state))
 
-                        equivalence_classes[old_set_index:old_set_index + 1] = [intersected_set, subtracted_set]
+        return [equivalence_class for equivalence_class in equivalence_classes if len(equivalence_class) > 0]
 
-                        if equivalence_class in equivalence_classes_temp:
-                            old_set_temp_index = equivalence_classes_temp.index(equivalence_class)
-                            equivalence_classes_temp[old_set_temp_index:old_set_temp_index + 1] = [
-                                intersected_set, subtracted_set]
-                        else:
-                            if len(intersected_set) <= len(subtracted_set):
-                                equivalence_classes_temp.append(intersected_set)
-                            else:
-                                equivalence_classes_temp.append(subtracted_set)
+    @staticmethod
+    def hopcroft(state_count: int,
+                 symbol_count: int,
+                 targets: Sequence[int],
+                 final_states: bytearray) -> tuple[array, int]:
+        '''
+        Refina a partição {finais, não finais} de um AFD completo pelo algoritmo de Hopcroft.
+
+        Retorna o bloco de cada estado e o número de blocos.
+        '''
+
+        # Índice reverso em CSR: os predecessores de (t, a) ficam em sources[offsets[c]:offsets[c + 1]].
+        cell_count = state_count * symbol_count
+        offsets = array('i', [0]) * (cell_count + 1)
+
+        for source in range(state_count):
+            row = source * symbol_count
+
+            for symbol in range(symbol_count):
+                offsets[targets[row + symbol] * symbol_count + symbol + 1] += 1
+
+        for cell in range(cell_count):
+            offsets[cell + 1] += offsets[cell]
+
+        positions = offsets[:-1]
+        sources = array('i', [0]) * cell_count
+
+        for source in range(state_count):
+            row = source * symbol_count
+
+            for symbol in range(symbol_count):
+                cell = targets[row + symbol] * symbol_count + symbol
+                sources[positions[cell]] = source
+                positions[cell] += 1
+
+        # Partição refinável: os estados de cada bloco ficam contíguos em elements[first[b]:past[b]].
+        block_of = array('i', [0]) * state_count
+        elements = array('i', [0]) * state_count
+        location = array('i', [0]) * state_count
+        final_count = sum(final_states)
+        next_position = [0, state_count - final_count]
+
+        for state in range(state_count):
+            block = 1 if final_states[state] else 0
+            position = next_position[block]
+            next_position[block] += 1
+            block_of[state] = block
+            elements[position] = state
+            location[state] = position
+
+        first = [0, state_count - final_count]
+        past = [state_count - final_count, state_count]
+        marked = [0, 0]
+
+        if final_count in (0, state_count):
+            first = [0]
+            past = [state_count]
+            marked = [0]
+            block_of = array('i', [0]) * state_count
+            waiting = []
+        else:
+            smaller_block = 1 if final_count <= state_count - final_count else 0
+            waiting = [smaller_block * symbol_count + symbol for symbol in range(symbol_count)]
+
+        while len(waiting) > 0:
+            splitter = waiting.pop()
+            splitter_block, symbol = divmod(splitter, symbol_count)
+            touched_blocks = []
+
+            for target in elements[first[splitter_block]:past[splitter_block]]:
+                cell = target * symbol_count + symbol
+
+                for source in sources[offsets[cell]:offsets[cell + 1]]:
+                    block = block_of[source]
+                    position = location[source]
+                    marked_position = first[block] + marked[block]
+
+                    if position < marked_position:
+                        continue
+
+                    swapped_state = elements[marked_position]
+                    elements[marked_position] = source
+                    elements[position] = swapped_state
+                    location[source] = marked_position
+                    location[swapped_state] = position
+
+                    if marked[block] == 0:
+                        touched_blocks.append(block)
+
+                    marked[block] += 1
+
+            for block in touched_blocks:
+                marked_count = marked[block]
+                marked[block] = 0
+                middle = first[block] + marked_count
+
+                if middle == past[block]:
+                    continue
+
+                # O bloco novo recebe a parte menor, que é a única renumerada.
+                new_block = len(first)
+
+                if marked_count <= past[block] - middle:
+                    first.append(first[block])
+                    past.append(middle)
+                    first[block] = middle
+                else:
+                    first.append(middle)
+                    past.append(past[block])
+                    past[block] = middle
+
+                marked.append(0)
+
+                for state in elements[first[new_block]:past[new_block]]:
+                    block_of[state] = new_block
+
+                # O bloco novo é o menor, então ele entra na fila esteja o bloco antigo pendente ou não.
+                for split_symbol in range(symbol_count):
+                    waiting.append(new_block * symbol_count + split_symbol)
+
+        return block_of, len(first)
+
+    @staticmethod
+    def quotient(finite_automaton: FiniteAutomaton,
+                 live_state_list: Sequence[int],
+                 local_ids: Sequence[int],
+                 complete_targets: Sequence[int],
+                 block_of: Sequence[int]) -> FiniteAutomaton:
+        '''
+        Constrói o autômato quociente a partir do bloco de cada estado vivo.
+
+        Cada estado do quociente é rotulado pelo menor rótulo entre os estados do seu bloco.
+        '''
+
+        symbol_count = finite_automaton.table.symbol_count
+        sink = len(live_state_list)
+        quotient_ids = {}
+        members = []
+
+        for local_id, state in enumerate(live_state_list):
+            block = block_of[local_id]
+
+            if block not in quotient_ids:
+                quotient_ids[block] = len(members)
+                members.append([])
+
+            members[quotient_ids[block]].append(state)
+
+        targets = array('i', [NO_STATE]) * (len(members) * symbol_count)
+
+        for quotient_id, block_members in enumerate(members):
+            local_row = local_ids[block_members[0]] * symbol_count
+
+            for symbol in range(symbol_count):
+                target = complete_targets[local_row + symbol]
+
+                if target != sink:
+                    targets[quotient_id * symbol_count + symbol] = quotient_ids[block_of[target]]
 
-                    index += 1
+        final_states = {quotient_id for quotient_id, block_members in enumerate(members)
+                        if block_members[0] in finite_automaton.final_state_ids}
 
-        return equivalence_classes
+        return FiniteAutomaton.from_table(lambda state: min(map(finite_automaton.state_label, members[state])),
+                                          quotient_ids[block_of[local_ids[finite_automaton.initial_state_id]]],
+                                          final_states,
+                                          finite_automaton.symbols,
+                                          TransitionTable(len(members), symbol_count, targets),
+                                          finite_automaton.alphabet)
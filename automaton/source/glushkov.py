@@ -0,0 +1,112 @@
+'''
+Reconhecedor bit-paralelo pelo autômato de posições.
+'''
+
+from typing import Iterable
+from source.parse_tree import ParseTree
+
+
+class GlushkovMatcher():
+
+    '''
+    Reconhecedor que simula o autômato de Glushkov com as posições ativas em um inteiro.
+
+    A árvore deve ser a da ER seguida do marcador `#`, como na conversão por followpos. O estado é a
+    máscara das posições que podem ser lidas a seguir, começando pelo firstpos da raiz. Para ler um
+    símbolo, o estado é filtrado pela máscara das posições do símbolo e o novo estado é a união dos
+    followpos das posições restantes. Essa união é feita por tabelas, uma por byte da máscara, em que a
+    entrada de cada valor do byte é a união dos followpos das posições marcadas nele. As entradas são
+    calculadas no primeiro uso, porque tabelas completas ocupariam memória quadrática no número de
+    posições. A palavra é aceita se o estado final contém a posição de `#`.
+
+    Nenhum estado do AFD é construído, então o custo é linear no tamanho da entrada, com cada passo
+    proporcional ao número de bytes ocupados pelas posições ativas.
+    '''
+
+    _initial_state: int
+    _final_mask: int
+    _symbol_masks: dict[str, int]
+    _followpos: list[int]
+    _followpos_tables: list[list[int | None]]
+    _position_count: int
+
+    def __init__(self, parse_tree: ParseTree) -> None:
+        position_count = parse_tree.last_symbol_index
+
+        self._initial_state = parse_tree.root_firstpos
+        self._final_mask = 1 << position_count
+        self._position_count = position_count
+        self._symbol_masks = {}
+
+        for position, symbol in parse_tree.positions_symbols.items():
+            if position != position_count:
+                self._symbol_masks[symbol] = self._symbol_masks.get(symbol, 0) | 1 << position
+
+        self._followpos = parse_tree.followpos_masks
+        self._followpos_tables = [[None] * 256 for _ in range(0, position_count + 1, 8)]
+
+    @property
+    def position_count(self) -> int:
+        '''
+        Retorna o número de posições, incluindo a do marcador, que é o tamanho do estado em bits.
+        '''
+
+        return self._position_count
+
+    def accepts(self, word: Iterable[str]) -> bool:
+        '''
+        Retorna verdadeiro se a ER reconhece a palavra.
+        '''
+
+        state = self._initial_state
+
+        for symbol in word:
+            state = self.step(state, symbol)
+
+            if state == 0:
+                return False
+
+        return state & self._final_mask != 0
+
+    def step(self, state: int, symbol: str) -> int:
+        '''
+        Retorna as posições ativas depois de ler um símbolo.
+        '''
+
+        active_positions = state & self._symbol_masks.get(symbol, 0)
+
+        if active_positions == 0:
+            return 0
+
+        # Só os bytes entre a menor e a maior posição ativa são consultados.
+        first_chunk = ((active_positions & -active_positions).bit_length() - 1) >> 3
+        active_positions >>= first_chunk << 3
+        tables = self._followpos_tables
+        next_state = 0
+
+        for chunk, value in enumerate(active_positions.to_bytes((active_positions.bit_length() + 7) >> 3, 'little'),
+                                      first_chunk):
+            if value:
+                followpos = tables[chunk][value]
+
+                if followpos is None:
+                    followpos = self.chunk_followpos(chunk, value)
+
+                next_state |= followpos
+
+        return next_state
+
+    def chunk_followpos(self, chunk: int, value: int) -> int:
+        '''
+        Calcula e guarda a união dos followpos das posições 8 * `chunk` + i com o bit i de `value`.
+        '''
+
+        followpos = 0
+
+        for bit in range(8):
+            if (value >> bit) & 1:
+                followpos |= self._followpos[(chunk << 3) + bit]
+
+        self._followpos_tables[chunk][value] = followpos
+
+        return followpos
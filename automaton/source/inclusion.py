@@ -0,0 +1,175 @@
+'''
+Inclusão e universalidade de linguagens de autômatos finitos.
+'''
+
+from collections import deque
+from source.finite_automaton import FiniteAutomaton
+
+
+class FiniteAutomatonInclusion():
+
+    '''
+    Testes de inclusão e universalidade com antichains, sem determinizar os autômatos.
+
+    A inclusão L(A) ⊆ L(B) explora pares (p, S) em que p é um estado de A e S é o subconjunto de estados
+    de B alcançado pela mesma palavra, como máscara de bits. A palavra é um contraexemplo se p é final e S
+    não tem estados finais. Um par (p, S) é descartado se já existe (p, S') com S' ⊆ S, porque toda palavra
+    que leva S a rejeitar também leva S' a rejeitar; assim, para cada p, só os subconjuntos minimais são
+    mantidos. A busca é em largura, então o contraexemplo tem comprimento mínimo. As transições usam os
+    fechos por épsilon calculados uma vez por autômato.
+    '''
+
+    @staticmethod
+    def includes(finite_automaton_a: FiniteAutomaton, finite_automaton_b: FiniteAutomaton) -> bool:
+        '''
+        Retorna verdadeiro se L(A) ⊆ L(B).
+        '''
+
+        return FiniteAutomatonInclusion.inclusion_counterexample(finite_automaton_a, finite_automaton_b) is None
+
+    @staticmethod
+    def universal(finite_automaton: FiniteAutomaton, alphabet: set[str] | None = None) -> bool:
+        '''
+        Retorna verdadeiro se o autômato aceita todas as palavras sobre o seu alfabeto unido a `alphabet`.
+        '''
+
+        return FiniteAutomatonInclusion.universality_counterexample(finite_automaton, alphabet) is None
+
+    @staticmethod
+    def universality_counterexample(finite_automaton: FiniteAutomaton,
+                                    alphabet: set[str] | None = None) -> list[str] | None:
+        '''
+        Retorna os símbolos de uma palavra mais curta rejeitada pelo autômato ou None se ele é universal.
+        '''
+
+        symbols = sorted((finite_automaton.alphabet | (alphabet or set())) - {'&'})
+
+        # O autômato de controle tem um único estado, final, com laços por todos os símbolos.
+        return FiniteAutomatonInclusion.search(finite_automaton, symbols, [0], [[[0]] * len(symbols)], 1)
+
+    @staticmethod
+    def inclusion_counterexample(finite_automaton_a: FiniteAutomaton,
+                                 finite_automaton_b: FiniteAutomaton) -> list[str] | None:
+        '''
+        Retorna os símbolos de uma palavra mais curta aceita por A e rejeitada por B ou None se L(A) ⊆ L(B).
+        '''
+
+        symbols = sorted((finite_automaton_a.alphabet | set(finite_automaton_a.symbols)) - {'&'})
+        successors = []
+
+        for state in range(finite_automaton_a.state_count):
+            state_successors = []
+
+            for symbol in symbols:
+                symbol_id = finite_automaton_a.symbol_id(symbol)
+                target_mask = finite_automaton_a.move_mask(state, symbol_id) if symbol_id is not None else 0
+                state_successors.append(FiniteAutomaton.mask_states(target_mask))
+
+            successors.append(state_successors)
+
+        initial_states = list(finite_automaton_a.epsilon_closure_states(finite_automaton_a.initial_state_id))
+        final_mask = 0
+
+        for state in finite_automaton_a.final_state_ids:
+            final_mask |= 1 << state
+
+        return FiniteAutomatonInclusion.search(finite_automaton_b, symbols, initial_states, successors, final_mask)
+
+    @staticmethod
+    def search(finite_automaton: FiniteAutomaton,
+               symbols: list[str],
+               initial_states: list[int],
+               successors: list[list[list[int]]],
+               final_mask: int) -> list[str] | None:
+        '''
+        Busca em largura com antichains por uma palavra aceita por um autômato de controle e rejeitada por
+        `finite_automaton`.
+
+        O autômato de controle é dado por seus estados iniciais, pelos sucessores de cada estado por cada
+        símbolo de `symbols` e pela máscara dos estados finais.
+        '''
+
+        symbol_ids = [finite_automaton.symbol_id(symbol) for symbol in symbols]
+
+        accepting_mask = 0
+
+        for state in finite_automaton.final_state_ids:
+            accepting_mask |= 1 << state
+
+        subset_moves: dict[int, list[int]] = {}
+        antichains: dict[int, list[int]] = {}
+        node_states = []
+        node_subsets = []
+        node_parents = []
+        node_symbols = []
+        unprocessed_nodes = deque()
+
+        def add(state: int, subset: int, parent: int, symbol: int) -> bool:
+            '''
+            Adiciona um par se não for subsumido e retorna verdadeiro se ele é um contraexemplo.
+            '''
+
+            antichain = antichains.setdefault(state, [])
+
+            for known_subset in antichain:
+                if known_subset & ~subset == 0:
+                    return False
+
+            # Os superconjuntos do novo subconjunto deixam a antichain, mas continuam na fila para que
+            # o contraexemplo continue sendo o mais curto.
+            antichain[:] = [known_subset for known_subset in antichain if subset & ~known_subset != 0]
+            antichain.append(subset)
+
+            node_states.append(state)
+            node_subsets.append(subset)
+            node_parents.append(parent)
+            node_symbols.append(symbol)
+            unprocessed_nodes.append(len(node_states) - 1)
+
+            return (final_mask >> state) & 1 == 1 and subset & accepting_mask == 0
+
+        def word(node: int) -> list[str]:
+            symbols_read = []
+
+            while node_parents[node] >= 0:
+                symbols_read.append(symbols[node_symbols[node]])
+                node = node_parents[node]
+
+            symbols_read.reverse()
+
+            return symbols_read
+
+        initial_subset = finite_automaton.epsilon_closure_mask(finite_automaton.initial_state_id)
+
+        for state in initial_states:
+            if add(state, initial_subset, -1, -1):
+                return word(len(node_states) - 1)
+
+        while len(unprocessed_nodes) > 0:
+            node = unprocessed_nodes.popleft()
+            state = node_states[node]
+            subset = node_subsets[node]
+            target_subsets = subset_moves.get(subset)
+
+            if target_subsets is None:
+                target_subsets = []
+
+                for symbol_id in symbol_ids:
+                    target_subset = 0
+
+                    if symbol_id is not None:
+                        for subset_state in FiniteAutomaton.mask_states(subset):
+                            target_subset |= finite_automaton.move_mask(subset_state, symbol_id)
+
+                    target_subsets.append(target_subset)
+
+                subset_moves[subset] = target_subsets
+
+            for symbol, target_states in enumerate(successors[state]):
+                target_subset = target_subsets[symbol]
+
+                for target_state in target_states:
+                    if add(target_state, target_subset, node, symbol):
+                        return word(len(node_states) - 1)
+
+        return None
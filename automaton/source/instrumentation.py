@@ -0,0 +1,135 @@
+'''
+Instrumentação das etapas de compilação.
+'''
+
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Any, ContextManager, Iterator
+
+
+class Instrumentation():
+
+    '''
+    Registro opcional de tempos por etapa e de contadores.
+
+    As etapas podem ser aninhadas e são nomeadas pelo caminho, como `minimize/refinement`. Os contadores
+    recebem o caminho da etapa em que são registrados. As operações recebem `instrumentation=None` por
+    padrão e, nesse caso, só verificam se o objeto existe fora dos laços internos.
+    '''
+
+    _times: dict[str, float]
+    _calls: dict[str, int]
+    _counters: dict[str, int]
+    _path: list[str]
+
+    def __init__(self) -> None:
+        self._times = {}
+        self._calls = {}
+        self._counters = {}
+        self._path = []
+
+    @property
+    def times(self) -> dict[str, float]:
+        '''
+        Retorna o tempo total de cada etapa, em segundos.
+        '''
+
+        return self._times
+
+    @property
+    def calls(self) -> dict[str, int]:
+        '''
+        Retorna o número de execuções de cada etapa.
+        '''
+
+        return self._calls
+
+    @property
+    def counters(self) -> dict[str, int]:
+        '''
+        Retorna os contadores.
+        '''
+
+        return self._counters
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        '''
+        Mede o tempo de uma etapa.
+        '''
+
+        self._path.append(name)
+        path = '/'.join(self._path)
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            self._times[path] = self._times.get(path, 0.0) + perf_counter() - start
+            self._calls[path] = self._calls.get(path, 0) + 1
+            self._path.pop()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        '''
+        Soma um valor a um contador da etapa atual.
+        '''
+
+        path = '/'.join(self._path + [name])
+        self._counters[path] = self._counters.get(path, 0) + amount
+
+    def maximum(self, name: str, value: int) -> None:
+        '''
+        Guarda o maior valor observado em um contador da etapa atual.
+        '''
+
+        path = '/'.join(self._path + [name])
+        self._counters[path] = max(self._counters.get(path, value), value)
+
+    def merge(self, report: dict[str, Any]) -> None:
+        '''
+        Acumula um relatório de outra instrumentação, como o de um processo de trabalho.
+        '''
+
+        for path, seconds in report['times'].items():
+            self._times[path] = self._times.get(path, 0.0) + seconds
+
+        for path, calls in report['calls'].items():
+            self._calls[path] = self._calls.get(path, 0) + calls
+
+        for path, value in report['counters'].items():
+            if path.endswith('peak'):
+                self._counters[path] = max(self._counters.get(path, value), value)
+            else:
+                self._counters[path] = self._counters.get(path, 0) + value
+
+    def as_dict(self) -> dict[str, Any]:
+        '''
+        Retorna o relatório como um dicionário serializável em JSON.
+        '''
+
+        return {'times': dict(self._times), 'calls': dict(self._calls), 'counters': dict(self._counters)}
+
+    def report(self) -> str:
+        '''
+        Retorna o relatório como texto.
+        '''
+
+        lines = ['Phase times:']
+
+        for path in sorted(self._times):
+            lines.append(f'  {path}: {self._times[path]:.6f}s ({self._calls[path]} calls)')
+
+        lines.append('Counters:')
+
+        for path in sorted(self._counters):
+            lines.append(f'  {path}: {self._counters[path]}')
+
+        return '\n'.join(lines)
+
+    @staticmethod
+    def phase_of(instrumentation: 'Instrumentation | None', name: str) -> ContextManager[None]:
+        '''
+        Retorna a etapa de uma instrumentação ou um contexto vazio se não houver instrumentação.
+        '''
+
+        return instrumentation.phase(name) if instrumentation is not None else nullcontext()
@@ -0,0 +1,213 @@
+'''
+Reconhecedor por AFD construído sob demanda.
+'''
+
+from collections import OrderedDict
+from typing import Iterable
+from source.finite_automaton import FiniteAutomaton
+
+
+class LazyDFAMatcher():
+
+    '''
+    Reconhecedor que simula um autômato finito construindo os estados do AFD durante a leitura.
+
+    Cada estado do AFD é um subconjunto de estados do autômato, representado por uma máscara de bits, e
+    fica em uma cache LRU de tamanho limitado com as transições já calculadas. Quando a taxa de falhas em
+    uma janela de passos passa do limite com a cache cheia, o restante da entrada é lido pela simulação
+    direta de conjuntos de estados, sem cache.
+    '''
+
+    _finite_automaton: FiniteAutomaton
+    _symbol_map: list[int]
+    _symbol_ids: dict[str, int]
+    _symbol_count: int
+    _initial_subset: int
+    _final_mask: int
+    _cache_size: int
+    _thrash_window: int
+    _thrash_ratio: float
+    _cache: OrderedDict[int, list[int | None]]
+    _hits: int
+    _misses: int
+    _evictions: int
+    _fallbacks: int
+
+    def __init__(self,
+                 finite_automaton: FiniteAutomaton,
+                 cache_size: int = 1024,
+                 thrash_window: int = 256,
+                 thrash_ratio: float = 0.5) -> None:
+        if cache_size < 1:
+            raise ValueError('O tamanho da cache deve ser positivo.')
+
+        symbol_ids = [symbol_id for symbol_id, symbol in enumerate(finite_automaton.symbols) if symbol != '&']
+
+        self._finite_automaton = finite_automaton
+        self._symbol_map = symbol_ids
+        self._symbol_ids = {finite_automaton.symbols[symbol_id]: index for index, symbol_id in enumerate(symbol_ids)}
+        self._symbol_count = len(symbol_ids)
+        self._initial_subset = finite_automaton.epsilon_closure_mask(finite_automaton.initial_state_id)
+        self._final_mask = 0
+
+        for state in finite_automaton.final_state_ids:
+            self._final_mask |= 1 << state
+
+        self._cache_size = cache_size
+        self._thrash_window = thrash_window
+        self._thrash_ratio = thrash_ratio
+        self._cache = OrderedDict()
+        self.reset_statistics()
+
+    @property
+    def hits(self) -> int:
+        '''
+        Retorna o número de transições encontradas na cache.
+        '''
+
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        '''
+        Retorna o número de transições calculadas por falta na cache.
+        '''
+
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        '''
+        Retorna o número de estados removidos da cache.
+        '''
+
+        return self._evictions
+
+    @property
+    def fallbacks(self) -> int:
+        '''
+        Retorna o número de entradas terminadas pela simulação sem cache.
+        '''
+
+        return self._fallbacks
+
+    @property
+    def cached_states(self) -> int:
+        '''
+        Retorna o número de estados na cache.
+        '''
+
+        return len(self._cache)
+
+    @property
+    def hit_rate(self) -> float:
+        '''
+        Retorna a fração de transições encontradas na cache.
+        '''
+
+        lookups = self._hits + self._misses
+
+        return self._hits / lookups if lookups > 0 else 0.0
+
+    def reset_statistics(self) -> None:
+        '''
+        Zera os contadores.
+        '''
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._fallbacks = 0
+
+    def clear(self) -> None:
+        '''
+        Esvazia a cache.
+        '''
+
+        self._cache.clear()
+
+    def accepts(self, word: Iterable[str]) -> bool:
+        '''
+        Retorna verdadeiro se o autômato aceita a palavra.
+        '''
+
+        symbols = iter(word)
+        subset = self._initial_subset
+        window_steps = 0
+        window_misses = 0
+
+        for symbol in symbols:
+            symbol_id = self._symbol_ids.get(symbol)
+
+            if symbol_id is None:
+                return False
+
+            row = self._cache.get(subset)
+
+            if row is None:
+                row = [None] * self._symbol_count
+                self._cache[subset] = row
+
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+                    self._evictions += 1
+            else:
+                self._cache.move_to_end(subset)
+
+            target_subset = row[symbol_id]
+
+            if target_subset is None:
+                target_subset = self.move(subset, symbol_id)
+                row[symbol_id] = target_subset
+                self._misses += 1
+                window_misses += 1
+            else:
+                self._hits += 1
+
+            subset = target_subset
+
+            if subset == 0:
+                return False
+
+            window_steps += 1
+
+            if window_steps == self._thrash_window:
+                if len(self._cache) == self._cache_size and window_misses > self._thrash_ratio * window_steps:
+                    self._fallbacks += 1
+                    return self.simulate(subset, symbols)
+
+                window_steps = 0
+                window_misses = 0
+
+        return subset & self._final_mask != 0
+
+    def simulate(self, subset: int, symbols: Iterable[str]) -> bool:
+        '''
+        Continua a leitura a partir de um subconjunto de estados sem usar a cache.
+        '''
+
+        for symbol in symbols:
+            symbol_id = self._symbol_ids.get(symbol)
+
+            if symbol_id is None:
+                return False
+
+            subset = self.move(subset, symbol_id)
+
+            if subset == 0:
+                return False
+
+        return subset & self._final_mask != 0
+
+    def move(self, subset: int, symbol_id: int) -> int:
+        '''
+        Retorna o subconjunto alcançado a partir de um subconjunto por um símbolo.
+        '''
+
+        symbol = self._symbol_map[symbol_id]
+        target_subset = 0
+
+        for state in FiniteAutomaton.mask_states(subset):
+            target_subset |= self._finite_automaton.move_mask(state, symbol)
+
+        return target_subset
@@ -0,0 +1,299 @@
+'''
+Minimização paralela de autômatos finitos determinísticos com NumPy.
+'''
+
+import os
+from array import array
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+from typing import Callable, Iterable
+
+import numpy as np
+
+from source.finite_automaton import FiniteAutomaton, FiniteAutomatonMinimizer
+from source.instrumentation import Instrumentation
+
+
+class ParallelMinimizer():
+
+    '''
+    Minimizador pelo refinamento de Moore com as rodadas divididas entre processos.
+
+    A tabela completa do AFD, com o sumidouro, o bloco de cada estado e os hashes das assinaturas ficam em
+    memória compartilhada, vistos pelos processos como vetores do NumPy. Em cada rodada, cada processo
+    calcula, para uma faixa disjunta de estados, um hash de 64 bits da assinatura de cada estado: o seu
+    bloco e os blocos dos seus sucessores. O processo principal renumera os blocos pelos hashes com
+    `np.unique`, e o refinamento para quando o número de blocos não muda.
+
+    Uma colisão de hashes só pode juntar estados, então a partição final é conferida: se ela não for
+    compatível com as transições, o refinamento é refeito pelo algoritmo de Hopcroft. O número de rodadas é
+    a profundidade de distinção do AFD, pequena em AFDs aleatórios, mas que chega ao número de estados em
+    cadeias; nesses casos `FiniteAutomatonMinimizer.minimize` é mais adequado.
+    '''
+
+    MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+    _worker_memories: list[SharedMemory] = []
+    _worker_arrays: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    _workers: int
+    _rounds: int
+    _parallel_seconds: float
+    _worker_seconds: float
+    _serial_seconds: float
+
+    def __init__(self, workers: int | None = None) -> None:
+        self._workers = workers if workers is not None else os.cpu_count() or 1
+
+        if self._workers < 1:
+            raise ValueError('O número de processos deve ser positivo.')
+
+        self._rounds = 0
+        self._parallel_seconds = 0.0
+        self._worker_seconds = 0.0
+        self._serial_seconds = 0.0
+
+    @property
+    def workers(self) -> int:
+        '''
+        Retorna o número de processos.
+        '''
+
+        return self._workers
+
+    @property
+    def rounds(self) -> int:
+        '''
+        Retorna o número de rodadas de refinamento da última minimização.
+        '''
+
+        return self._rounds
+
+    @property
+    def parallel_seconds(self) -> float:
+        '''
+        Retorna o tempo de relógio gasto nas etapas paralelas da última minimização.
+        '''
+
+        return self._parallel_seconds
+
+    @property
+    def worker_seconds(self) -> float:
+        '''
+        Retorna a soma dos tempos de cálculo dos processos na última minimização.
+        '''
+
+        return self._worker_seconds
+
+    @property
+    def serial_seconds(self) -> float:
+        '''
+        Retorna o tempo gasto pelo processo principal entre as etapas paralelas na última minimização.
+        '''
+
+        return self._serial_seconds
+
+    @property
+    def parallelism(self) -> float:
+        '''
+        Retorna quantos processos estiveram calculando, em média, durante as etapas paralelas.
+        '''
+
+        return self._worker_seconds / self._parallel_seconds if self._parallel_seconds > 0 else 0.0
+
+    @property
+    def efficiency(self) -> float:
+        '''
+        Retorna o paralelismo dividido pelo número de processos.
+        '''
+
+        return self.parallelism / self._workers
+
+    def report(self) -> str:
+        '''
+        Retorna as rodadas e a escala da última minimização como texto.
+        '''
+
+        return f'{self._rounds} rounds with {self._workers} workers: ' \
+            f'{self._parallel_seconds:.3f}s parallel, {self._serial_seconds:.3f}s serial, ' \
+            f'parallelism {self.parallelism:.2f}, efficiency {self.efficiency:.0%}'
+
+    def minimize(self,
+                 finite_automaton: FiniteAutomaton,
+                 instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
+        '''
+        Minimiza um autômato finito determinístico.
+        '''
+
+        self._rounds = 0
+        self._parallel_seconds = 0.0
+        self._worker_seconds = 0.0
+        self._serial_seconds = 0.0
+
+        return FiniteAutomatonMinimizer.minimize(finite_automaton, instrumentation, self.refine_table)
+
+    def refine_table(self,
+                     complete_targets: array,
+                     final_states: bytearray,
+                     symbol_count: int) -> tuple[list[int], dict[str, int]]:
+        '''
+        Refina a tabela completa dos estados vivos para `FiniteAutomatonMinimizer.minimize`.
+        '''
+
+        block_of = self.refine(np.frombuffer(complete_targets, dtype=np.int32).reshape(-1, symbol_count),
+                               np.frombuffer(final_states, dtype=np.uint8))
+
+        return block_of.tolist(), {'rounds': self._rounds, 'blocks': int(block_of.max()) + 1}
+
+    def refine(self, matrix: np.ndarray, final_states: np.ndarray) -> np.ndarray:
+        '''
+        Retorna o bloco de cada estado de um AFD completo na partição de Nerode.
+        '''
+
+        state_count = matrix.shape[0]
+        memories = []
+        shared = []
+
+        try:
+            # A tabela, os blocos e os hashes são copiados uma vez para a memória compartilhada.
+            for shape, dtype in ((matrix.shape, np.int32), ((state_count,), np.int32), ((state_count,), np.uint64)):
+                memory = SharedMemory(create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+                memories.append(memory)
+                shared.append(np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+
+            shared[0][:] = matrix
+            shared[1][:] = final_states
+            step = -(-state_count // self._workers)
+            ranges = [(start, min(start + step, state_count)) for start in range(0, state_count, step)]
+            names = [memory.name for memory in memories]
+
+            if self._workers == 1:
+                ParallelMinimizer.initialize_worker(names, matrix.shape)
+                self.refine_rounds(map, ranges, shared[1], shared[2])
+            else:
+                with Pool(self._workers,
+                          initializer=ParallelMinimizer.initialize_worker,
+                          initargs=(names, matrix.shape)) as pool:
+                    self.refine_rounds(pool.map, ranges, shared[1], shared[2])
+
+            block_of = shared[1].copy()
+        finally:
+            # As visões precisam ser soltas antes de fechar a memória.
+            shared.clear()
+            ParallelMinimizer.release_worker()
+
+            for memory in memories:
+                memory.close()
+                memory.unlink()
+
+        start = perf_counter()
+
+        if not ParallelMinimizer.is_congruence(matrix, final_states, block_of):
+            block_of = np.array(FiniteAutomatonMinimizer.hopcroft(state_count,
+                                                                  matrix.shape[1],
+                                                                  matrix.ravel().tolist(),
+                                                                  bytearray(final_states))[0],
+                                dtype=np.int32)
+
+        self._serial_seconds += perf_counter() - start
+
+        return block_of
+
+    def refine_rounds(self,
+                      map_function: Callable[[Callable[[tuple[int, int]], float], Iterable[tuple[int, int]]],
+                                             Iterable[float]],
+                      ranges: list[tuple[int, int]],
+                      blocks: np.ndarray,
+                      hashes: np.ndarray) -> None:
+        '''
+        Executa as rodadas de Moore, distribuindo as faixas de estados com `map_function`, até a partição
+        estabilizar.
+        '''
+
+        block_count = len(np.unique(blocks))
+
+        while True:
+            self._rounds += 1
+            start = perf_counter()
+            self._worker_seconds += sum(map_function(ParallelMinimizer.hash_signatures, ranges))
+            middle = perf_counter()
+
+            # A assinatura inclui o próprio bloco, então a nova partição refina a anterior.
+            _, inverse = np.unique(hashes, return_inverse=True)
+            blocks[:] = inverse.ravel()
+            new_block_count = int(blocks.max()) + 1
+
+            self._parallel_seconds += middle - start
+            self._serial_seconds += perf_counter() - middle
+
+            if new_block_count == block_count:
+                return
+
+            block_count = new_block_count
+
+    @staticmethod
+    def is_congruence(matrix: np.ndarray, final_states: np.ndarray, block_of: np.ndarray) -> bool:
+        '''
+        Retorna verdadeiro se os estados de cada bloco têm a mesma aceitação e transições para os mesmos blocos.
+        '''
+
+        representatives = np.zeros(int(block_of.max()) + 1, dtype=np.int64)
+        representatives[block_of[::-1]] = np.arange(len(block_of) - 1, -1, -1)
+        representative_of = representatives[block_of]
+
+        return bool(np.array_equal(final_states, final_states[representative_of]) and
+                    np.array_equal(block_of[matrix], block_of[matrix[representative_of]]))
+
+    @staticmethod
+    def initialize_worker(names: list[str], matrix_shape: tuple[int, int]) -> None:
+        '''
+        Abre a memória compartilhada em um processo de trabalho.
+        '''
+
+        memories = [SharedMemory(name=name) for name in names]
+        state_count = matrix_shape[0]
+
+        ParallelMinimizer._worker_memories = memories
+        ParallelMinimizer._worker_arrays = (np.ndarray(matrix_shape, dtype=np.int32, buffer=memories[0].buf),
+                                            np.ndarray((state_count,), dtype=np.int32, buffer=memories[1].buf),
+                                            np.ndarray((state_count,), dtype=np.uint64, buffer=memories[2].buf))
+
+    @staticmethod
+    def release_worker() -> None:
+        '''
+        Solta as visões da memória compartilhada no processo atual.
+        '''
+
+        ParallelMinimizer._worker_arrays = None
+
+        for memory in ParallelMinimizer._worker_memories:
+            memory.close()
+
+        ParallelMinimizer._worker_memories = []
+
+    @staticmethod
+    def hash_signatures(state_range: tuple[int, int]) -> float:
+        '''
+        Calcula os hashes das assinaturas de uma faixa de estados e retorna o tempo gasto.
+        '''
+
+        start = perf_counter()
+        first, past = state_range
+        worker_arrays = ParallelMinimizer._worker_arrays
+
+        if worker_arrays is not None:
+            matrix, blocks, hashes = worker_arrays
+        else:
+            raise RuntimeError('A memória compartilhada não foi aberta neste processo.')
+
+        signature = blocks[first:past].astype(np.uint64)
+
+        for column in range(matrix.shape[1]):
+            signature *= ParallelMinimizer.MULTIPLIER
+            signature ^= blocks[matrix[first:past, column]].astype(np.uint64)
+            signature ^= signature >> np.uint64(29)
+
+        hashes[first:past] = signature
+
+        return perf_counter() - start
@@ -2,276 +2,189 @@
 Árvore.
 '''
 
-from typing import Any
+from array import array
+from source.bitset import Bitset
 
 
 class ParseNode():
 
     '''
-    Nó.
+    Nó. É uma visão sobre uma posição dos vetores da árvore.
     '''
 
-    _value: str
-    _index: int | None
-    _left: Any
-    _right: Any
-    _nullable: bool
-    _firstpos: set[int]
-    _lastpos: set[int]
-
-    def __init__(self, value: str, left: Any, right: Any):
-        self._value = value
-        self._index = None
-        self._left = left
-        self._right = right
-        self._nullable = False
-        self._firstpos = set()
-        self._lastpos = set()
+    __slots__ = ('_tree', '_node')
 
-    def __str__(self) -> str:
-        # Adaptado para https://mshang.ca/syntree/
-
-        result = ''
-
-        firstpos_str = ','.join([str(position) for position in self._firstpos])
-        lastpos_str = ','.join([str(position) for position in self._lastpos])
+    _tree: 'ParseTree'
+    _node: int
 
-        result += f'[<{self._value}>-({self._nullable}/{firstpos_str}/{lastpos_str})'
+    def __init__(self, tree: 'ParseTree', node: int):
+        self._tree = tree
+        self._node = node
 
-        if self._left is not None:
-            result += f' {str(self._left)}'
-
-        if self._right is not None:
-            result += f' {str(self._right)}'
-
-        return result + ']'
+    def __str__(self) -> str:
+        return self._tree.node_to_string(self._node)
 
     @property
-    def nullable(self) -> bool:
+    def value(self) -> str:
         '''
-        Getter para nullable.
+        Getter para value.
         '''
 
-        return self._nullable
+        return self._tree.node_value(self._node)
 
     @property
-    def firstpos(self) -> set[int]:
+    def left(self) -> 'ParseNode | None':
         '''
-        Getter para firstpos.
+        Getter para left.
         '''
 
-        return self._firstpos
+        return self._tree.node(self._tree.lefts[self._node])
 
     @property
-    def lastpos(self) -> set[int]:
+    def right(self) -> 'ParseNode | None':
         '''
-        Getter para lastpos.
+        Getter para right.
         '''
 
-        return self._lastpos
+        return self._tree.node(self._tree.rights[self._node])
 
-    def calculate_index(self, index_counter: list[int], positions_symbols: dict[int, str]) -> None:
-        '''
-        Calcula o valor de index.
-        '''
-
-        if self._left is not None:
-            self._left.calculate_index(index_counter, positions_symbols)
-
-        if self._right is not None:
-            self._right.calculate_index(index_counter, positions_symbols)
-
-        if self._index is None:
-            if self._value not in ('*', '.', '|', '&'):
-                index_counter[0] += 1
-                self._index = index_counter[0]
-                positions_symbols[index_counter[0]] = self._value
-
-    def calculate_nullable(self) -> None:
-        '''
-        Calcula o valor de nullable.
-        '''
-
-        if self._left is not None:
-            self._left.calculate_nullable()
-
-        if self._right is not None:
-            self._right.calculate_nullable()
-
-        match self._value:
-            case '*':
-                self._nullable = True
-            case '.':
-                self._nullable = self._left.nullable and self._right.nullable
-            case '|':
-                self._nullable = self._left.nullable or self._right.nullable
-            case '&':
-                self._nullable = True
-            case _:
-                self._nullable = False
-
-    def calculate_firstpos(self) -> None:
+    @property
+    def nullable(self) -> bool:
         '''
-        Calcula o valor de firstpos.
+        Getter para nullable.
         '''
 
-        if self._left is not None:
-            self._left.calculate_firstpos()
+        return bool(self._tree.nullables[self._node])
 
-        if self._right is not None:
-            self._right.calculate_firstpos()
-
-        match self._value:
-            case '*':
-                self._firstpos = self._left.firstpos.copy()
-            case '.':
-                if self._left.nullable:
-                    self._firstpos = self._left.firstpos | self._right.firstpos
-                else:
-                    self._firstpos = self._left.firstpos.copy()
-            case '|':
-                self._firstpos = self._left.firstpos | self._right.firstpos
-            case '&':
-                self._firstpos = set()
-            case _:
-                self._firstpos = {self._index}  # type: ignore
-
-    def calculate_lastpos(self) -> None:
+    @property
+    def firstpos(self) -> set[int]:
         '''
-        Calcula o valor de lastpos.
+        Getter para firstpos.
         '''
 
-        if self._left is not None:
-            self._left.calculate_lastpos()
-
-        if self._right is not None:
-            self._right.calculate_lastpos()
-
-        match self._value:
-            case '*':
-                self._lastpos = self._left.lastpos.copy()
-            case '.':
-                if self._right.nullable:
-                    self._lastpos = self._left.lastpos | self._right.lastpos
-                else:
-                    self._lastpos = self._right.lastpos.copy()
-            case '|':
-                self._lastpos = self._left.lastpos | self._right.lastpos
-            case '&':
-                self._lastpos = set()
-            case _:
-                self._lastpos = {self._index}  # type: ignore
+        return ParseTree.mask_to_positions(self._tree.firstpos_masks[self._node])
 
-    def calculate_followpos(self, followpos: dict[int, set[int]]) -> None:
+    @property
+    def lastpos(self) -> set[int]:
         '''
-        Calcula o valor de followpos.
+        Getter para lastpos.
         '''
 
-        if self._left is not None:
-            self._left.calculate_followpos(followpos)
-
-        if self._right is not None:
-            self._right.calculate_followpos(followpos)
-
-        match self._value:
-            case '.':
-                for position in self._left.lastpos:
-                    followpos[position] |= self._right.firstpos
-            case '*':
-                for position in self._lastpos:
-                    followpos[position] |= self._firstpos
+        return ParseTree.mask_to_positions(self._tree.lastpos_masks[self._node])
 
 
 class ParseTree():
 
     '''
     Árvore.
+
+    A árvore é guardada em vetores indexados pelo nó: tipo, filhos e posição. firstpos, lastpos e
+    followpos são máscaras de bits em que o bit i representa a posição i. Os nós são criados a partir da
+    ER pós-fixada, então os filhos sempre têm índice menor que o pai e todos os atributos são calculados
+    na mesma passagem que constrói a árvore.
     '''
 
-    _root: ParseNode | None
+    SYMBOL = 0
+    EPSILON = 1
+    STAR = 2
+    CONCATENATION = 3
+    UNION = 4
+
+    _kinds: bytearray
+    _lefts: array
+    _rights: array
+    _positions: array
+    _nullables: bytearray
+    _firstpos: list[int]
+    _lastpos: list[int]
+    _followpos: list[int]
     _last_symbol_index: int
     _symbols: set[str]
     _positions_symbols: dict[int, str]
 
-    def __init__(self, postfixed_regex: list[str | ParseNode]):
-        self._root = None
+    def __init__(self, postfixed_regex: list[str]):
+        self._kinds = bytearray()
+        self._lefts = array('i')
+        self._rights = array('i')
+        self._positions = array('i')
+        self._nullables = bytearray()
+        self._firstpos = []
+        self._lastpos = []
+        self._followpos = [0]
         self._symbols = set()
         self._positions_symbols = {}
 
-        while len(postfixed_regex) > 1:
-            index = 0
-
-            while index < len(postfixed_regex):
-                if postfixed_regex[index] == '*':
-                    if isinstance(postfixed_regex[index - 1], ParseNode):
-                        self._root = ParseNode(postfixed_regex[index], postfixed_regex[index - 1], None)  # type: ignore
-                    else:
-                        subnode = None
-
-                        if postfixed_regex[index - 1] != '&':
-                            self._symbols |= {postfixed_regex[index - 1]}
-
-                        subnode = ParseNode(postfixed_regex[index - 1], None, None)  # type: ignore
-
-                        self._root = ParseNode(postfixed_regex[index], subnode, None)  # type: ignore
-
-                    postfixed_regex.pop(index)
-                    postfixed_regex.pop(index - 1)
-                    postfixed_regex.insert(index - 1, self._root)
-
-                    continue
-                elif postfixed_regex[index] in ('.', '|'):
-                    if isinstance(postfixed_regex[index - 2], ParseNode) and isinstance(postfixed_regex[index - 1], ParseNode):
-                        self._root = ParseNode(postfixed_regex[index], postfixed_regex[index - 2], postfixed_regex[index - 1])  # type: ignore
-                    elif isinstance(postfixed_regex[index - 2], ParseNode):
-                        subnode = None
-
-                        if postfixed_regex[index - 1] != '&':
-                            self._symbols |= {postfixed_regex[index - 1]}
-
-                        subnode = ParseNode(postfixed_regex[index - 1], None, None)  # type: ignore
-
-                        self._root = ParseNode(postfixed_regex[index], postfixed_regex[index - 2], subnode)  # type: ignore
-                    elif isinstance(postfixed_regex[index - 1], ParseNode):
-                        subnode = None
-
-                        if postfixed_regex[index - 2] != '&':
-                            self._symbols |= {postfixed_regex[index - 2]}
-
-                        subnode = ParseNode(postfixed_regex[index - 2], None, None)  # type: ignore
-
-                        self._root = ParseNode(postfixed_regex[index], subnode, postfixed_regex[index - 1])  # type: ignore
-                    else:
-                        left_subnode = None
-
-                        if postfixed_regex[index - 2] != '&':
-                            self._symbols |= {postfixed_regex[index - 2]}
-
-                        left_subnode = ParseNode(postfixed_regex[index - 2], None, None)  # type: ignore
-
-                        right_subnode = None
-
-                        if postfixed_regex[index - 1] != '&':
-                            self._symbols |= {postfixed_regex[index - 1]}
-
-                        right_subnode = ParseNode(postfixed_regex[index - 1], None, None)  # type: ignore
-
-                        self._root = ParseNode(postfixed_regex[index], left_subnode, right_subnode)  # type: ignore
-
-                    postfixed_regex.pop(index)
-                    postfixed_regex.pop(index - 1)
-                    postfixed_regex.pop(index - 2)
-                    postfixed_regex.insert(index - 2, self._root)
-                    index -= 1
-
-                    continue
-
-                index += 1
-
+        kinds = self._kinds
+        nullables = self._nullables
+        firstpos = self._firstpos
+        lastpos = self._lastpos
+        followpos = self._followpos
+        node_stack = []
+        position = 0
+
+        for token in postfixed_regex:
+            node = len(kinds)
+            left = -1
+            right = -1
+            node_position = 0
+
+            match token:
+                case '*':
+                    left = node_stack.pop()
+                    kind = ParseTree.STAR
+                    nullable = True
+                    node_firstpos = firstpos[left]
+                    node_lastpos = lastpos[left]
+
+                    for last_position in ParseTree.mask_positions(node_lastpos):
+                        followpos[last_position] |= node_firstpos
+                case '.':
+                    right = node_stack.pop()
+                    left = node_stack.pop()
+                    kind = ParseTree.CONCATENATION
+                    nullable = nullables[left] and nullables[right]
+                    node_firstpos = firstpos[left] | firstpos[right] if nullables[left] else firstpos[left]
+                    node_lastpos = lastpos[left] | lastpos[right] if nullables[right] else lastpos[right]
+
+                    for last_position in ParseTree.mask_positions(lastpos[left]):
+                        followpos[last_position] |= firstpos[right]
+                case '|':
+                    right = node_stack.pop()
+                    left = node_stack.pop()
+                    kind = ParseTree.UNION
+                    nullable = nullables[left] or nullables[right]
+                    node_firstpos = firstpos[left] | firstpos[right]
+                    node_lastpos = lastpos[left] | lastpos[right]
+                case '&':
+                    kind = ParseTree.EPSILON
+                    nullable = True
+                    node_firstpos = 0
+                    node_lastpos = 0
+                case _:
+                    position += 1
+                    node_position = position
+                    kind = ParseTree.SYMBOL
+                    nullable = False
+                    node_firstpos = 1 << position
+                    node_lastpos = node_firstpos
+                    followpos.append(0)
+                    self._positions_symbols[position] = token
+                    self._symbols.add(token)
+
+            kinds.append(kind)
+            self._lefts.append(left)
+            self._rights.append(right)
+            self._positions.append(node_position)
+            nullables.append(nullable)
+            firstpos.append(node_firstpos)
+            lastpos.append(node_lastpos)
+            node_stack.append(node)
+
+        self._last_symbol_index = position
         self._symbols -= {'#'}
 
     def __str__(self) -> str:
-        return str(self._root)
+        return str(self.root)
 
     @property
     def root(self) -> ParseNode | None:
@@ -279,7 +192,7 @@ class ParseTree():
         Getter para root.
         '''
 
-        return self._root
+        return self.node(len(self._kinds) - 1)
 
     @property
     def symbols(self) -> set[str]:
@@ -305,50 +218,137 @@ class ParseTree():
 
         return self._last_symbol_index
 
-    def calculate_index(self) -> None:
+    @property
+    def lefts(self) -> array:
+        '''
+        Getter para os filhos da esquerda (-1 se não há filho).
+        '''
+
+        return self._lefts
+
+    @property
+    def rights(self) -> array:
+        '''
+        Getter para os filhos da direita (-1 se não há filho).
+        '''
+
+        return self._rights
+
+    @property
+    def nullables(self) -> bytearray:
+        '''
+        Getter para nullable de cada nó.
+        '''
+
+        return self._nullables
+
+    @property
+    def firstpos_masks(self) -> list[int]:
+        '''
+        Getter para firstpos de cada nó.
+        '''
+
+        return self._firstpos
+
+    @property
+    def lastpos_masks(self) -> list[int]:
+        '''
+        Getter para lastpos de cada nó.
+        '''
+
+        return self._lastpos
+
+    @property
+    def followpos_masks(self) -> list[int]:
         '''
-        Calcula os valores de index.
+        Getter para followpos de cada posição (o índice 0 não é usado).
         '''
 
-        index = [0]  # Wrapper mutável (Gambiarra)
+        return self._followpos
 
-        self._root.calculate_index(index, self._positions_symbols)
+    @property
+    def root_firstpos(self) -> int:
+        '''
+        Getter para firstpos da raiz.
+        '''
 
-        self._last_symbol_index = index[0]
+        return self._firstpos[-1] if len(self._firstpos) > 0 else 0
 
-    def calculate_nullable(self) -> None:
+    def node(self, node: int) -> ParseNode | None:
         '''
-        Calcula os valores de nullable.
+        Retorna a visão de um nó.
         '''
 
-        self._root.calculate_nullable()  # type: ignore
+        return ParseNode(self, node) if node >= 0 else None
 
-    def calculate_firstpos(self) -> None:
+    def node_value(self, node: int) -> str:
         '''
-        Calcula os valores de firstpos.
+        Retorna o símbolo ou operador de um nó.
         '''
 
-        self._root.calculate_firstpos()  # type: ignore
+        match self._kinds[node]:
+            case ParseTree.STAR:
+                return '*'
+            case ParseTree.CONCATENATION:
+                return '.'
+            case ParseTree.UNION:
+                return '|'
+            case ParseTree.EPSILON:
+                return '&'
+            case _:
+                return self._positions_symbols[self._positions[node]]
 
-    def calculate_lastpos(self) -> None:
+    def node_to_string(self, node: int) -> str:
         '''
-        Calcula os valores de lastpos.
+        Retorna a representação de uma subárvore.
         '''
 
-        self._root.calculate_lastpos()  # type: ignore
+        # Adaptado para https://mshang.ca/syntree/
+
+        parts = []
+        node_stack: list[int | str] = [node]
+
+        while len(node_stack) > 0:
+            current = node_stack.pop()
+
+            if isinstance(current, str):
+                parts.append(current)
+                continue
+
+            nullable = bool(self._nullables[current])
+            firstpos_str = ','.join(map(str, ParseTree.mask_positions(self._firstpos[current])))
+            lastpos_str = ','.join(map(str, ParseTree.mask_positions(self._lastpos[current])))
+
+            parts.append(f'[<{self.node_value(current)}>-({nullable}/{firstpos_str}/{lastpos_str})')
+            node_stack.append(']')
+
+            for child in (self._rights[current], self._lefts[current]):
+                if child >= 0:
+                    node_stack.append(child)
+                    node_stack.append(' ')
+
+        return ''.join(parts)
 
     def calculate_followpos(self) -> dict[int, set[int]]:
         '''
-        Calcula os valores de followpos.
+        Retorna os valores de followpos como conjuntos.
         '''
 
-        self.calculate_index()
-        self.calculate_nullable()
-        self.calculate_firstpos()
-        self.calculate_lastpos()
+        return {index: ParseTree.mask_to_positions(self._followpos[index])
+                for index in range(1, self._last_symbol_index + 1)}
 
-        followpos = {index: set() for index in range(1, self._last_symbol_index + 1)}
+    @staticmethod
+    def mask_positions(mask: int) -> list[int]:
+        '''
+        Retorna as posições de uma máscara em ordem crescente.
+        '''
 
-        self._root.calculate_followpos(followpos)  # type: ignore
+        return Bitset.positions(mask)
+
+    @staticmethod
+    def mask_to_positions(mask: int) -> set[int]:
+        '''
+        Retorna as posições de uma máscara como conjunto.
+        '''
 
-        return followpos
+        return set(ParseTree.mask_positions(mask))
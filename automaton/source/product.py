@@ -0,0 +1,218 @@
+'''
+Operações booleanas sobre autômatos finitos.
+'''
+
+from array import array
+from collections import deque
+from typing import Callable
+from source.finite_automaton import FiniteAutomaton, FiniteAutomatonDeterminizer
+from source.transition_table import NO_STATE, TransitionTable
+
+
+class FiniteAutomatonProduct():
+
+    '''
+    Construção do produto sob demanda.
+
+    Os operandos são determinizados se necessário e apenas os pares de estados alcançáveis a partir do par
+    inicial são criados, em vez do produto cartesiano completo. Uma transição ausente em um operando leva
+    ao seu sumidouro implícito, representado por `NO_STATE` no par. Pares dos quais nenhuma palavra pode
+    ser aceita pela operação só por causa do sumidouro, como os de uma interseção com um lado no
+    sumidouro, não são criados. Os estados do produto são rotulados como `[p|q]`, com `{}` no lugar do
+    sumidouro.
+    '''
+
+    SINK_LABEL = '{}'
+
+    @staticmethod
+    def intersection(finite_automaton_a: FiniteAutomaton, finite_automaton_b: FiniteAutomaton) -> FiniteAutomaton:
+        '''
+        Retorna um AFD que reconhece L(A) ∩ L(B).
+        '''
+
+        return FiniteAutomatonProduct.product(finite_automaton_a, finite_automaton_b, lambda a, b: a and b)
+
+    @staticmethod
+    def union(finite_automaton_a: FiniteAutomaton, finite_automaton_b: FiniteAutomaton) -> FiniteAutomaton:
+        '''
+        Retorna um AFD que reconhece L(A) ∪ L(B).
+        '''
+
+        return FiniteAutomatonProduct.product(finite_automaton_a, finite_automaton_b, lambda a, b: a or b)
+
+    @staticmethod
+    def difference(finite_automaton_a: FiniteAutomaton, finite_automaton_b: FiniteAutomaton) -> FiniteAutomaton:
+        '''
+        Retorna um AFD que reconhece L(A) - L(B).
+        '''
+
+        return FiniteAutomatonProduct.product(finite_automaton_a, finite_automaton_b, lambda a, b: a and not b)
+
+    @staticmethod
+    def symmetric_difference(finite_automaton_a: FiniteAutomaton,
+                             finite_automaton_b: FiniteAutomaton) -> FiniteAutomaton:
+        '''
+        Retorna um AFD que reconhece as palavras de exatamente uma das linguagens.
+        '''
+
+        return FiniteAutomatonProduct.product(finite_automaton_a, finite_automaton_b, lambda a, b: a != b)
+
+    @staticmethod
+    def complement(finite_automaton: FiniteAutomaton, alphabet: set[str] | None = None) -> FiniteAutomaton:
+        '''
+        Retorna um AFD que reconhece o complemento da linguagem em relação a Σ*, em que Σ é o alfabeto do
+        autômato unido a `alphabet`. O sumidouro só é adicionado se alguma transição estiver ausente.
+        '''
+
+        dfa = FiniteAutomatonProduct.deterministic(finite_automaton)
+        symbols = FiniteAutomatonProduct.alphabet_symbols(dfa, alphabet or set())
+        symbol_ids = [dfa.symbol_id(symbol) for symbol in symbols]
+        state_count = dfa.state_count
+        source_targets = dfa.table.dense_targets
+        source_symbol_count = dfa.table.symbol_count
+        symbol_count = len(symbols)
+
+        targets = array('i', [NO_STATE]) * (state_count * symbol_count)
+        sink = state_count
+        needs_sink = False
+
+        for state in range(state_count):
+            row = state * symbol_count
+            source_row = state * source_symbol_count
+
+            for index, symbol in enumerate(symbol_ids):
+                target = source_targets[source_row + symbol] if symbol is not None else NO_STATE
+
+                if target == NO_STATE:
+                    target = sink
+                    needs_sink = True
+
+                targets[row + index] = target
+
+        final_states = [state for state in range(state_count) if state not in dfa.final_state_ids]
+        state_labels = dfa.state_labels
+
+        if needs_sink:
+            targets.extend(array('i', [sink]) * symbol_count)
+            final_states.append(sink)
+            state_labels = state_labels + [FiniteAutomatonProduct.fresh_label(dfa, FiniteAutomatonProduct.SINK_LABEL)]
+
+        return FiniteAutomaton.from_table(state_labels,
+                                          dfa.initial_state_id,
+                                          final_states,
+                                          symbols,
+                                          TransitionTable(len(state_labels), symbol_count, targets),
+                                          set(symbols))
+
+    @staticmethod
+    def product(finite_automaton_a: FiniteAutomaton,
+                finite_automaton_b: FiniteAutomaton,
+                accept: Callable[[bool, bool], bool]) -> FiniteAutomaton:
+        '''
+        Retorna o produto de dois autômatos explorando apenas os pares alcançáveis. Um par é final se
+        `accept` for verdadeiro para a aceitação de cada componente.
+        '''
+
+        dfa_a = FiniteAutomatonProduct.deterministic(finite_automaton_a)
+        dfa_b = FiniteAutomatonProduct.deterministic(finite_automaton_b)
+        symbols = FiniteAutomatonProduct.alphabet_symbols(dfa_a, dfa_b.alphabet | set(dfa_b.symbols))
+        symbol_count = len(symbols)
+
+        symbol_ids_a = [dfa_a.symbol_id(symbol) for symbol in symbols]
+        symbol_ids_b = [dfa_b.symbol_id(symbol) for symbol in symbols]
+        targets_a = dfa_a.table.dense_targets
+        targets_b = dfa_b.table.dense_targets
+        symbol_count_a = dfa_a.table.symbol_count
+        symbol_count_b = dfa_b.table.symbol_count
+        final_a = dfa_a.final_state_ids
+        final_b = dfa_b.final_state_ids
+
+        # Com um lado no sumidouro, aquele lado nunca mais aceita.
+        dead_sink_a = not accept(False, True) and not accept(False, False)
+        dead_sink_b = not accept(True, False) and not accept(False, False)
+
+        # O par (p, q) tem a chave (p + 1) * (|B| + 1) + q + 1, com -1 para o sumidouro.
+        width = dfa_b.state_count + 1
+        initial_pair = (dfa_a.initial_state_id + 1) * width + dfa_b.initial_state_id + 1
+        pairs = [initial_pair]
+        pair_ids = {initial_pair: 0}
+        final_states = []
+        targets = array('i')
+        unprocessed_states = deque([0])
+
+        while len(unprocessed_states) > 0:
+            source = unprocessed_states.popleft()
+            state_a, state_b = divmod(pairs[source], width)
+            state_a -= 1
+            state_b -= 1
+
+            if accept(state_a in final_a, state_b in final_b):
+                final_states.append(source)
+
+            row_a = state_a * symbol_count_a
+            row_b = state_b * symbol_count_b
+
+            for index in range(symbol_count):
+                symbol_a = symbol_ids_a[index]
+                symbol_b = symbol_ids_b[index]
+                target_a = targets_a[row_a + symbol_a] if state_a != NO_STATE and symbol_a is not None else NO_STATE
+                target_b = targets_b[row_b + symbol_b] if state_b != NO_STATE and symbol_b is not None else NO_STATE
+
+                if (target_a == NO_STATE and dead_sink_a) or (target_b == NO_STATE and dead_sink_b):
+                    targets.append(NO_STATE)
+                    continue
+
+                target_pair = (target_a + 1) * width + target_b + 1
+                target = pair_ids.get(target_pair)
+
+                if target is None:
+                    target = len(pairs)
+                    pair_ids[target_pair] = target
+                    pairs.append(target_pair)
+                    unprocessed_states.append(target)
+
+                targets.append(target)
+
+        def state_label(state: int) -> str:
+            state_a, state_b = divmod(pairs[state], width)
+            label_a = dfa_a.state_label(state_a - 1) if state_a > 0 else FiniteAutomatonProduct.SINK_LABEL
+            label_b = dfa_b.state_label(state_b - 1) if state_b > 0 else FiniteAutomatonProduct.SINK_LABEL
+
+            return f'[{label_a}|{label_b}]'
+
+        return FiniteAutomaton.from_table(state_label,
+                                          0,
+                                          final_states,
+                                          symbols,
+                                          TransitionTable(len(pairs), symbol_count, targets),
+                                          set(symbols))
+
+    @staticmethod
+    def deterministic(finite_automaton: FiniteAutomaton) -> FiniteAutomaton:
+        '''
+        Retorna o próprio autômato se for determinístico ou o resultado da sua determinização.
+        '''
+
+        if finite_automaton.is_deterministic:
+            return finite_automaton
+
+        return FiniteAutomatonDeterminizer.determinize(finite_automaton)
+
+    @staticmethod
+    def alphabet_symbols(finite_automaton: FiniteAutomaton, alphabet: set[str]) -> list[str]:
+        '''
+        Retorna os símbolos de um autômato unidos a um alfabeto, ordenados e sem épsilon.
+        '''
+
+        return sorted((finite_automaton.alphabet | set(finite_automaton.symbols) | alphabet) - {'&'})
+
+    @staticmethod
+    def fresh_label(finite_automaton: FiniteAutomaton, label: str) -> str:
+        '''
+        Retorna um rótulo que não pertence ao autômato, acrescentando apóstrofos se necessário.
+        '''
+
+        while finite_automaton.state_id(label) is not None:
+            label += "'"
+
+        return label
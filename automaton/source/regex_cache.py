@@ -0,0 +1,198 @@
+'''
+Cache de ERs compiladas.
+'''
+
+import os
+from collections import OrderedDict
+from contextlib import suppress
+from hashlib import sha256
+from tempfile import NamedTemporaryFile
+from source.finite_automaton import FiniteAutomaton
+from source.serialization import FiniteAutomatonSerializer
+
+
+class RegexCache():
+
+    '''
+    Cache de autômatos compilados, indexada pela ER normalizada.
+
+    Os autômatos ficam em uma cache LRU em memória com tamanho máximo. Opcionalmente, também são gravados
+    em um diretório, um arquivo por ER no formato binário de `FiniteAutomatonSerializer`, para sobreviverem
+    ao fim do processo. Os arquivos são mapeados na memória na leitura e arquivos ilegíveis ou gravados com
+    outra versão do formato são descartados.
+    '''
+
+    FORMAT_VERSION = FiniteAutomatonSerializer.VERSION
+
+    _max_size: int
+    _directory: str | None
+    _entries: OrderedDict[str, FiniteAutomaton]
+    _hits: int
+    _disk_hits: int
+    _misses: int
+    _evictions: int
+
+    def __init__(self, max_size: int = 1024, directory: str | None = None) -> None:
+        if max_size < 1:
+            raise ValueError('O tamanho da cache deve ser positivo.')
+
+        self._max_size = max_size
+        self._directory = directory
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def size(self) -> int:
+        '''
+        Retorna o número de autômatos em memória.
+        '''
+
+        return len(self._entries)
+
+    @property
+    def max_size(self) -> int:
+        '''
+        Retorna o número máximo de autômatos em memória.
+        '''
+
+        return self._max_size
+
+    @property
+    def hits(self) -> int:
+        '''
+        Retorna o número de consultas atendidas, em memória ou em disco.
+        '''
+
+        return self._hits
+
+    @property
+    def disk_hits(self) -> int:
+        '''
+        Retorna o número de consultas atendidas pelo disco.
+        '''
+
+        return self._disk_hits
+
+    @property
+    def misses(self) -> int:
+        '''
+        Retorna o número de consultas não atendidas.
+        '''
+
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        '''
+        Retorna o número de autômatos removidos da memória.
+        '''
+
+        return self._evictions
+
+    @property
+    def hit_rate(self) -> float:
+        '''
+        Retorna a fração de consultas atendidas.
+        '''
+
+        lookups = self._hits + self._misses
+
+        return self._hits / lookups if lookups > 0 else 0.0
+
+    def get(self, key: str) -> FiniteAutomaton | None:
+        '''
+        Retorna o autômato de uma ER normalizada, se estiver na cache.
+        '''
+
+        finite_automaton = self._entries.get(key)
+
+        if finite_automaton is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return finite_automaton
+
+        finite_automaton = self.load(key)
+
+        if finite_automaton is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._disk_hits += 1
+        self.store(key, finite_automaton)
+
+        return finite_automaton
+
+    def put(self, key: str, finite_automaton: FiniteAutomaton) -> None:
+        '''
+        Adiciona o autômato de uma ER normalizada à cache.
+        '''
+
+        self.store(key, finite_automaton)
+
+        if self._directory is not None:
+            self.dump(key, finite_automaton)
+
+    def clear(self) -> None:
+        '''
+        Esvazia a cache em memória.
+        '''
+
+        self._entries.clear()
+
+    def store(self, key: str, finite_automaton: FiniteAutomaton) -> None:
+        '''
+        Adiciona um autômato à cache em memória, removendo o menos usado se necessário.
+        '''
+
+        self._entries[key] = finite_automaton
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def path(self, key: str) -> str:
+        '''
+        Retorna o caminho do arquivo de uma ER normalizada.
+        '''
+
+        return os.path.join(self._directory, sha256(key.encode('utf-8')).hexdigest() + '.fa')  # type: ignore
+
+    def load(self, key: str) -> FiniteAutomaton | None:
+        '''
+        Lê o autômato de uma ER normalizada do disco.
+        '''
+
+        if self._directory is None:
+            return None
+
+        path = self.path(key)
+
+        try:
+            return FiniteAutomatonSerializer.load(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            with suppress(OSError):
+                os.remove(path)
+
+            return None
+
+    def dump(self, key: str, finite_automaton: FiniteAutomaton) -> None:
+        '''
+        Grava o autômato de uma ER normalizada no disco.
+        '''
+
+        path = self.path(key)
+
+        with NamedTemporaryFile('wb', dir=self._directory, delete=False) as file:
+            FiniteAutomatonSerializer.dump(finite_automaton, file)
+
+        os.replace(file.name, path)
@@ -2,30 +2,126 @@
 Conversor de ER para AF.
 '''
 
+from source.derivatives import DerivativeAutomatonBuilder, DerivativeMatcher, RegexTermTable
+from source.glushkov import GlushkovMatcher
 from source.parse_tree import ParseTree
 from source.finite_automaton import FiniteAutomaton, FiniteAutomatonBuilder
+from source.instrumentation import Instrumentation
+from source.regex_cache import RegexCache
 
 
 class RegexToDFAConversor():
 
     '''
     Conversor de ER para DFA.
+
+    Há dois backends: `followpos`, que constrói o DFA pelas posições da árvore sintática, e `derivatives`,
+    que constrói o DFA pelas derivadas de Brzozowski da ER. As derivadas normalizadas costumam gerar um
+    DFA próximo do mínimo, enquanto os estados de `followpos` são rotulados pelas posições.
     '''
 
+    FOLLOWPOS = 'followpos'
+    DERIVATIVES = 'derivatives'
+    BACKENDS = (FOLLOWPOS, DERIVATIVES)
+
+    @staticmethod
+    def convert(regular_expression: str,
+                cache: RegexCache | None = None,
+                instrumentation: Instrumentation | None = None,
+                backend: str = FOLLOWPOS) -> FiniteAutomaton:
+        '''
+        Converte uma ER para um DFA. Se uma cache for informada, ERs já compiladas não são recompiladas.
+        '''
+
+        if backend not in RegexToDFAConversor.BACKENDS:
+            raise ValueError(f'Backend desconhecido: {backend}.')
+
+        with Instrumentation.phase_of(instrumentation, 'convert'):
+            if cache is not None:
+                key = RegexToDFAConversor.add_concatenation_operator(regular_expression)
+
+                # As chaves de `followpos` não têm prefixo para continuarem compatíveis com caches antigas.
+                if backend != RegexToDFAConversor.FOLLOWPOS:
+                    key = f'{backend}\0{key}'
+
+                finite_automaton = cache.get(key)
+
+                if instrumentation is not None:
+                    instrumentation.count('cache hits' if finite_automaton is not None else 'cache misses')
+
+                if finite_automaton is None:
+                    finite_automaton = RegexToDFAConversor.compile(regular_expression, instrumentation, backend)
+                    cache.put(key, finite_automaton)
+
+                return finite_automaton
+
+            return RegexToDFAConversor.compile(regular_expression, instrumentation, backend)
+
     @staticmethod
-    def convert(regular_expression: str) -> FiniteAutomaton:
+    def compile(regular_expression: str,
+                instrumentation: Instrumentation | None = None,
+                backend: str = FOLLOWPOS) -> FiniteAutomaton:
         '''
-        Converte uma ER para um DFA.
+        Converte uma ER para um DFA sem consultar a cache.
         '''
 
+        if backend == RegexToDFAConversor.DERIVATIVES:
+            return RegexToDFAConversor.compile_derivatives(regular_expression, instrumentation)
+
         new_regular_expression = f'({regular_expression})#'
-        parse_tree = RegexToDFAConversor.parse(new_regular_expression)
-        followpos = parse_tree.calculate_followpos()
 
-        return FiniteAutomatonBuilder.build_from_followpos(parse_tree.root.firstpos,
-                                                           followpos, parse_tree.symbols,
-                                                           parse_tree.positions_symbols,
-                                                           parse_tree.last_symbol_index)
+        with Instrumentation.phase_of(instrumentation, 'parse'):
+            postfixed_regex = RegexToDFAConversor.postfix(new_regular_expression)
+
+        # A árvore calcula nullable, firstpos, lastpos e followpos na mesma passagem que a constrói.
+        with Instrumentation.phase_of(instrumentation, 'followpos'):
+            parse_tree = ParseTree(postfixed_regex)
+
+        if instrumentation is not None:
+            instrumentation.count('positions', parse_tree.last_symbol_index)
+            instrumentation.count('parse nodes', len(parse_tree.lefts))
+
+        return FiniteAutomatonBuilder.build_from_position_masks(parse_tree.root_firstpos,
+                                                                parse_tree.followpos_masks,
+                                                                parse_tree.symbols,
+                                                                parse_tree.positions_symbols,
+                                                                parse_tree.last_symbol_index,
+                                                                instrumentation)
+
+    @staticmethod
+    def compile_derivatives(regular_expression: str,
+                            instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
+        '''
+        Converte uma ER para um DFA pelas derivadas de Brzozowski.
+        '''
+
+        table = RegexTermTable()
+
+        with Instrumentation.phase_of(instrumentation, 'parse'):
+            postfixed_regex = RegexToDFAConversor.postfix(regular_expression)
+
+        with Instrumentation.phase_of(instrumentation, 'terms'):
+            root = table.from_postfix(postfixed_regex)
+
+        return DerivativeAutomatonBuilder.build(table, root, instrumentation)
+
+    @staticmethod
+    def matcher(regular_expression: str) -> DerivativeMatcher:
+        '''
+        Retorna um reconhecedor que deriva a ER durante a leitura, sem construir o DFA.
+        '''
+
+        table = RegexTermTable()
+
+        return DerivativeMatcher(table, table.from_postfix(RegexToDFAConversor.postfix(regular_expression)))
+
+    @staticmethod
+    def glushkov_matcher(regular_expression: str) -> GlushkovMatcher:
+        '''
+        Retorna um reconhecedor bit-paralelo que simula o autômato de posições, sem construir o DFA.
+        '''
+
+        return GlushkovMatcher(RegexToDFAConversor.parse(f'({regular_expression})#'))
 
     @staticmethod
     def parse(regular_expression: str) -> ParseTree:
@@ -33,15 +129,21 @@ class RegexToDFAConversor():
         Gera uma árvore de análise sintática.
         '''
 
-        new_regular_expression = RegexToDFAConversor.add_concatenation_operator(regular_expression)
+        return ParseTree(RegexToDFAConversor.postfix(regular_expression))
+
+    @staticmethod
+    def postfix(regular_expression: str) -> list[str]:
+        '''
+        Retorna os tokens da ER em notação pós-fixada.
+        '''
 
         operator_stack = []
         output_queue = []
 
-        for character in new_regular_expression:
-            match character:
+        for token in RegexToDFAConversor.tokenize(regular_expression):
+            match token:
                 case '(':
-                    operator_stack.append(character)
+                    operator_stack.append(token)
                 case ')':
                     if len(operator_stack) > 0:
                         while operator_stack[-1] != '(':
@@ -50,19 +152,19 @@ class RegexToDFAConversor():
                     operator_stack.pop()
                 case '|' | '*' | '.':
                     while True:
-                        if len(operator_stack) > 0 and RegexToDFAConversor.precedes(operator_stack[-1], character):
+                        if len(operator_stack) > 0 and RegexToDFAConversor.precedes(operator_stack[-1], token):
                             output_queue.append(operator_stack.pop())
                         else:
                             break
 
-                    operator_stack.append(character)
+                    operator_stack.append(token)
                 case _:
-                    output_queue.append(character)
+                    output_queue.append(token)
 
         while len(operator_stack) > 0:
             output_queue.append(operator_stack.pop())
 
-        return ParseTree(output_queue)
+        return output_queue
 
     @staticmethod
     def precedes(operator_a: str, operator_b: str) -> bool:
@@ -94,29 +196,26 @@ class RegexToDFAConversor():
         Adiciona o operador de concatenação à ER.
         '''
 
-        new_regular_expression = ''
+        return ''.join(RegexToDFAConversor.tokenize(regular_expression))
 
-        for i, character in enumerate(regular_expression):
-            if i == 0:
-                new_regular_expression += character
-                continue
+    @staticmethod
+    def tokenize(regular_expression: str) -> list[str]:
+        '''
+        Separa a ER em tokens em uma única passagem, inserindo o operador de concatenação explícito.
+        '''
 
+        tokens = []
+        previous_character = None
+
+        for character in regular_expression:
             match character:
-                case '(':
-                    match regular_expression[i - 1]:
-                        case '(' | '|':
-                            pass
-                        case ')' | '*' | _:
-                            new_regular_expression += '.'
                 case ')' | '|' | '*':
                     pass
                 case _:
-                    match regular_expression[i - 1]:
-                        case '(' | '|':
-                            pass
-                        case ')' | '*' | _:
-                            new_regular_expression += '.'
+                    if previous_character is not None and previous_character not in ('(', '|'):
+                        tokens.append('.')
 
-            new_regular_expression += character
+            tokens.append(character)
+            previous_character = character
 
-        return new_regular_expression
+        return tokens
@@ -0,0 +1,220 @@
+'''
+Formato binário de autômatos finitos.
+'''
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Sequence
+from source.finite_automaton import FiniteAutomaton
+from source.transition_table import TransitionTable
+
+
+class FiniteAutomatonSerializer():
+
+    '''
+    Serializador binário versionado.
+
+    O arquivo começa com um cabeçalho fixo seguido das seções, todas alinhadas em 8 bytes e em little
+    endian: tabela de símbolos, marcadores do alfabeto, offsets CSR (apenas se não determinístico),
+    destinos, estados finais, offsets dos rótulos e rótulos. Na leitura por `load`, o arquivo é mapeado
+    com mmap e as seções de inteiros viram memoryviews sobre o mapeamento, sem cópias, de modo que vários
+    processos podem compartilhar o mesmo autômato somente para leitura.
+    '''
+
+    MAGIC = b'FLAA'
+    VERSION = 1
+    DETERMINISTIC = 1
+
+    # magic, versão, flags, estados, símbolos, estado inicial, número de finais, número de destinos e os
+    # offsets das seções: símbolos, alfabeto, offsets CSR, destinos, finais, offsets dos rótulos, rótulos.
+    HEADER = struct.Struct('<4sHHIIiIQ7Q')
+
+    @staticmethod
+    def dump(finite_automaton: FiniteAutomaton, file: BinaryIO) -> None:
+        '''
+        Grava um autômato no formato binário.
+        '''
+
+        table = finite_automaton.table
+        symbols = finite_automaton.symbols
+        offsets, targets = table.arrays()
+
+        symbol_table = bytearray()
+
+        for symbol in symbols:
+            encoded_symbol = symbol.encode('utf-8')
+            symbol_table += struct.pack('<I', len(encoded_symbol)) + encoded_symbol
+
+        alphabet = bytes(symbol in finite_automaton.alphabet for symbol in symbols)
+
+        labels = bytearray()
+        label_offsets = array('q', [0])
+
+        for label in finite_automaton.state_labels:
+            labels += label.encode('utf-8')
+            label_offsets.append(len(labels))
+
+        sections = [bytes(symbol_table),
+                    alphabet,
+                    FiniteAutomatonSerializer.pack('i', offsets) if offsets is not None else b'',
+                    FiniteAutomatonSerializer.pack('i', targets),
+                    FiniteAutomatonSerializer.pack('i', sorted(finite_automaton.final_state_ids)),
+                    FiniteAutomatonSerializer.pack('q', label_offsets),
+                    bytes(labels)]
+
+        section_offsets = []
+        position = FiniteAutomatonSerializer.HEADER.size
+
+        for section in sections:
+            section_offsets.append(position)
+            position += FiniteAutomatonSerializer.aligned(len(section))
+
+        flags = FiniteAutomatonSerializer.DETERMINISTIC if offsets is None else 0
+
+        file.write(FiniteAutomatonSerializer.HEADER.pack(FiniteAutomatonSerializer.MAGIC,
+                                                         FiniteAutomatonSerializer.VERSION,
+                                                         flags,
+                                                         table.state_count,
+                                                         table.symbol_count,
+                                                         finite_automaton.initial_state_id,
+                                                         len(finite_automaton.final_state_ids),
+                                                         len(targets),
+                                                         *section_offsets))
+
+        for section in sections:
+            file.write(section)
+            file.write(bytes(FiniteAutomatonSerializer.aligned(len(section)) - len(section)))
+
+    @staticmethod
+    def load(path: str) -> FiniteAutomaton:
+        '''
+        Lê um autômato de um arquivo mapeando-o na memória.
+        '''
+
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return FiniteAutomatonSerializer.load_buffer(buffer)
+
+    @staticmethod
+    def load_buffer(buffer: bytes | mmap.mmap) -> FiniteAutomaton:
+        '''
+        Lê um autômato de um buffer no formato binário. As seções de inteiros não são copiadas.
+        '''
+
+        view = memoryview(buffer)
+        header = FiniteAutomatonSerializer.HEADER
+
+        if len(view) < header.size:
+            raise ValueError('Arquivo truncado.')
+
+        magic, version, flags, state_count, symbol_count, initial_state, final_count, target_count, \
+            symbols_offset, alphabet_offset, offsets_offset, targets_offset, finals_offset, \
+            label_offsets_offset, labels_offset = header.unpack_from(view, 0)
+
+        if magic != FiniteAutomatonSerializer.MAGIC:
+            raise ValueError('O arquivo não contém um autômato.')
+
+        if version != FiniteAutomatonSerializer.VERSION:
+            raise ValueError(f'Versão do formato não suportada: {version}.')
+
+        if state_count > 0 and not 0 <= initial_state < state_count:
+            raise ValueError('Estado inicial inválido.')
+
+        symbols = []
+        position = symbols_offset
+
+        for _ in range(symbol_count):
+            (length,) = struct.unpack('<I', FiniteAutomatonSerializer.section(view, position, 4, alphabet_offset))
+            symbol = FiniteAutomatonSerializer.section(view, position + 4, length, alphabet_offset)
+            symbols.append(bytes(symbol).decode('utf-8'))
+            position += 4 + length
+
+        markers = FiniteAutomatonSerializer.section(view, alphabet_offset, symbol_count)
+        alphabet = {symbol for symbol, marker in zip(symbols, markers) if marker}
+
+        cell_count = state_count * symbol_count
+        offsets = None
+
+        if not flags & FiniteAutomatonSerializer.DETERMINISTIC:
+            offsets = FiniteAutomatonSerializer.unpack(view, 'i', offsets_offset, cell_count + 1)
+
+            if offsets[cell_count] != target_count:
+                raise ValueError('Offsets de transições inconsistentes.')
+        elif target_count != cell_count:
+            raise ValueError('Tabela de transições inconsistente.')
+
+        targets = FiniteAutomatonSerializer.unpack(view, 'i', targets_offset, target_count)
+        final_states = FiniteAutomatonSerializer.unpack(view, 'i', finals_offset, final_count)
+        label_offsets = FiniteAutomatonSerializer.unpack(view, 'q', label_offsets_offset, state_count + 1)
+
+        # Os rótulos são a última seção, então o seu fim alinhado é o tamanho do arquivo.
+        FiniteAutomatonSerializer.section(view, labels_offset, label_offsets[state_count])
+
+        def state_label(state: int) -> str:
+            start = labels_offset + label_offsets[state]
+            end = labels_offset + label_offsets[state + 1]
+
+            return bytes(view[start:end]).decode('utf-8')
+
+        return FiniteAutomaton.from_table(state_label,
+                                          initial_state,
+                                          final_states,
+                                          symbols,
+                                          TransitionTable(state_count, symbol_count, targets, offsets),
+                                          alphabet)
+
+    @staticmethod
+    def pack(typecode: str, values: Sequence[int]) -> bytes:
+        '''
+        Retorna os inteiros em little endian.
+        '''
+
+        packed = array(typecode, values)
+
+        if sys.byteorder == 'big':
+            packed.byteswap()
+
+        return packed.tobytes()
+
+    @staticmethod
+    def unpack(view: memoryview, typecode: str, offset: int, count: int) -> Sequence[int]:
+        '''
+        Retorna uma seção de inteiros, como memoryview sem cópia quando a máquina é little endian.
+        '''
+
+        size = array(typecode).itemsize
+        section = FiniteAutomatonSerializer.section(view, offset, count * size)
+
+        if sys.byteorder == 'little':
+            return section.cast(typecode)
+
+        values = array(typecode, section.tobytes())
+        values.byteswap()
+
+        return values
+
+    @staticmethod
+    def section(view: memoryview, offset: int, size: int, end: int | None = None) -> memoryview:
+        '''
+        Retorna `size` bytes a partir de `offset`, conferindo que eles e o alinhamento que os segue cabem no
+        buffer, ou apenas em `end` quando dado.
+        '''
+
+        limit = len(view) if end is None else min(end, len(view))
+        padded_size = size if end is not None else FiniteAutomatonSerializer.aligned(size)
+
+        if offset < FiniteAutomatonSerializer.HEADER.size or size < 0 or offset + padded_size > limit:
+            raise ValueError('Arquivo truncado ou corrompido.')
+
+        return view[offset:offset + size]
+
+    @staticmethod
+    def aligned(size: int) -> int:
+        '''
+        Arredonda um tamanho para o múltiplo de 8 seguinte.
+        '''
+
+        return (size + 7) & ~7
@@ -0,0 +1,335 @@
+'''
+Tabela de transições compacta.
+'''
+
+from array import array
+from typing import Iterable, Iterator, Sequence
+
+
+NO_STATE = -1
+
+
+class TransitionTable():
+
+    '''
+    Tabela de transições indexada por inteiros.
+
+    Tabelas determinísticas são densas: a entrada `state * symbol_count + symbol` guarda o destino ou
+    `NO_STATE`. Tabelas não determinísticas usam o formato CSR: os destinos da célula
+    `state * symbol_count + symbol` ficam em `targets[offsets[cell]:offsets[cell + 1]]`.
+    '''
+
+    _state_count: int
+    _symbol_count: int
+    _targets: Sequence[int]
+    _offsets: Sequence[int] | None
+    _reverse_sources: Sequence[int] | None
+    _reverse_offsets: Sequence[int] | None
+
+    def __init__(self,
+                 state_count: int,
+                 symbol_count: int,
+                 targets: Sequence[int],
+                 offsets: Sequence[int] | None = None) -> None:
+        self._state_count = state_count
+        self._symbol_count = symbol_count
+        self._targets = targets
+        self._offsets = offsets
+        self._reverse_sources = None
+        self._reverse_offsets = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_reverse_sources'] = None
+        state['_reverse_offsets'] = None
+
+        # Tabelas lidas de um arquivo mapeado guardam memoryviews, que não podem ser serializadas.
+        for name in ('_targets', '_offsets'):
+            if isinstance(state[name], memoryview):
+                state[name] = array('i', state[name].tobytes())
+
+        return state
+
+    @staticmethod
+    def from_edges(state_count: int, symbol_count: int, edges: Iterable[tuple[int, int, int]]) -> 'TransitionTable':
+        '''
+        Constrói uma tabela a partir de arestas (origem, símbolo, destino).
+        '''
+
+        keys = sorted({(source * symbol_count + symbol) * state_count + target for source, symbol, target in edges})
+        cell_count = state_count * symbol_count
+
+        deterministic = True
+        previous_cell = NO_STATE
+
+        for key in keys:
+            cell = key // state_count
+
+            if cell == previous_cell:
+                deterministic = False
+                break
+
+            previous_cell = cell
+
+        if deterministic:
+            targets = array('i', [NO_STATE]) * cell_count
+
+            for key in keys:
+                targets[key // state_count] = key % state_count
+
+            return TransitionTable(state_count, symbol_count, targets)
+
+        offsets = array('i', [0]) * (cell_count + 1)
+        targets = array('i', [0]) * len(keys)
+
+        for index, key in enumerate(keys):
+            offsets[key // state_count + 1] += 1
+            targets[index] = key % state_count
+
+        for cell in range(cell_count):
+            offsets[cell + 1] += offsets[cell]
+
+        return TransitionTable(state_count, symbol_count, targets, offsets)
+
+    @staticmethod
+    def from_edge_arrays(state_count: int,
+                         symbol_count: int,
+                         sources: Sequence[int],
+                         symbols: Sequence[int],
+                         targets: Sequence[int]) -> 'TransitionTable':
+        '''
+        Constrói uma tabela a partir de vetores paralelos de arestas, sem criar uma tupla por aresta.
+
+        As arestas são distribuídas nas células por contagem e repetições são descartadas.
+        '''
+
+        cell_count = state_count * symbol_count
+        offsets = array('i', [0]) * (cell_count + 1)
+
+        for source, symbol in zip(sources, symbols):
+            offsets[source * symbol_count + symbol + 1] += 1
+
+        for cell in range(cell_count):
+            offsets[cell + 1] += offsets[cell]
+
+        positions = offsets[:-1]
+        packed_targets = array('i', [0]) * len(targets)
+
+        for source, symbol, target in zip(sources, symbols, targets):
+            cell = source * symbol_count + symbol
+            packed_targets[positions[cell]] = target
+            positions[cell] += 1
+
+        del positions
+
+        # Compacta as células ordenando os destinos e removendo repetições.
+        deterministic = True
+        write = 0
+
+        for cell in range(cell_count):
+            start = offsets[cell]
+            end = offsets[cell + 1]
+            offsets[cell] = write
+
+            if end - start == 1:
+                packed_targets[write] = packed_targets[start]
+                write += 1
+            elif end > start:
+                cell_targets = sorted(set(packed_targets[start:end]))
+                packed_targets[write:write + len(cell_targets)] = array('i', cell_targets)
+                write += len(cell_targets)
+                deterministic = deterministic and len(cell_targets) == 1
+
+        offsets[cell_count] = write
+        del packed_targets[write:]
+
+        if not deterministic:
+            return TransitionTable(state_count, symbol_count, packed_targets, offsets)
+
+        dense_targets = array('i', [NO_STATE]) * cell_count
+
+        for cell in range(cell_count):
+            if offsets[cell + 1] > offsets[cell]:
+                dense_targets[cell] = packed_targets[offsets[cell]]
+
+        return TransitionTable(state_count, symbol_count, dense_targets)
+
+    @property
+    def state_count(self) -> int:
+        '''
+        Retorna o número de estados.
+        '''
+
+        return self._state_count
+
+    @property
+    def symbol_count(self) -> int:
+        '''
+        Retorna o número de símbolos.
+        '''
+
+        return self._symbol_count
+
+    @property
+    def is_deterministic(self) -> bool:
+        '''
+        Retorna verdadeiro se cada célula tem no máximo um destino.
+        '''
+
+        return self._offsets is None
+
+    @property
+    def dense_targets(self) -> Sequence[int]:
+        '''
+        Retorna a tabela densa de uma tabela determinística.
+        '''
+
+        if self._offsets is not None:
+            raise ValueError('A tabela não é determinística.')
+
+        return self._targets
+
+    @property
+    def edge_count(self) -> int:
+        '''
+        Retorna o número de transições.
+        '''
+
+        if self._offsets is None:
+            return sum(1 for target in self._targets if target != NO_STATE)
+
+        return len(self._targets)
+
+    def arrays(self) -> tuple[Sequence[int] | None, Sequence[int]]:
+        '''
+        Retorna os vetores (offsets, destinos) da tabela. Os offsets são None em tabelas densas.
+        '''
+
+        return self._offsets, self._targets
+
+    def target(self, state: int, symbol: int) -> int:
+        '''
+        Retorna o destino de uma transição determinística ou `NO_STATE`.
+        '''
+
+        cell = state * self._symbol_count + symbol
+
+        if self._offsets is None:
+            return self._targets[cell]
+
+        start = self._offsets[cell]
+        end = self._offsets[cell + 1]
+
+        if end - start > 1:
+            raise ValueError('A transição não é determinística.')
+
+        return self._targets[start] if end > start else NO_STATE
+
+    def targets(self, state: int, symbol: int) -> Sequence[int]:
+        '''
+        Retorna os destinos de uma transição.
+        '''
+
+        cell = state * self._symbol_count + symbol
+
+        if self._offsets is None:
+            target = self._targets[cell]
+            return (target,) if target != NO_STATE else ()
+
+        return self._targets[self._offsets[cell]:self._offsets[cell + 1]]
+
+    def edges(self) -> Iterator[tuple[int, int, int]]:
+        '''
+        Itera sobre as transições como tuplas (origem, símbolo, destino).
+        '''
+
+        symbol_count = self._symbol_count
+
+        if self._offsets is None:
+            for cell, target in enumerate(self._targets):
+                if target != NO_STATE:
+                    yield cell // symbol_count, cell % symbol_count, target
+
+            return
+
+        offsets = self._offsets
+        targets = self._targets
+
+        for cell in range(len(offsets) - 1):
+            for index in range(offsets[cell], offsets[cell + 1]):
+                yield cell // symbol_count, cell % symbol_count, targets[index]
+
+    def successors(self, state: int) -> Iterator[tuple[int, int]]:
+        '''
+        Itera sobre as transições de saída de um estado como tuplas (símbolo, destino).
+        '''
+
+        symbol_count = self._symbol_count
+        first_cell = state * symbol_count
+
+        if self._offsets is None:
+            for symbol in range(symbol_count):
+                target = self._targets[first_cell + symbol]
+
+                if target != NO_STATE:
+                    yield symbol, target
+
+            return
+
+        offsets = self._offsets
+        targets = self._targets
+
+        for symbol in range(symbol_count):
+            for index in range(offsets[first_cell + symbol], offsets[first_cell + symbol + 1]):
+                yield symbol, targets[index]
+
+    def sources(self, state: int, symbol: int) -> Sequence[int]:
+        '''
+        Retorna os estados de origem das transições que chegam em um estado por um símbolo.
+        '''
+
+        if self._reverse_offsets is None:
+            self._build_reverse_index()
+
+        cell = state * self._symbol_count + symbol
+
+        return self._reverse_sources[self._reverse_offsets[cell]:self._reverse_offsets[cell + 1]]  # type: ignore
+
+    def predecessors(self, state: int) -> Sequence[int]:
+        '''
+        Retorna os estados de origem das transições que chegam em um estado por qualquer símbolo.
+        '''
+
+        if self._reverse_offsets is None:
+            self._build_reverse_index()
+
+        first_cell = state * self._symbol_count
+
+        return self._reverse_sources[self._reverse_offsets[first_cell]:  # type: ignore
+                                     self._reverse_offsets[first_cell + self._symbol_count]]  # type: ignore
+
+    def _build_reverse_index(self) -> None:
+        '''
+        Constrói o índice reverso em CSR, indexado por (destino, símbolo).
+        '''
+
+        symbol_count = self._symbol_count
+        cell_count = self._state_count * symbol_count
+        reverse_offsets = array('i', [0]) * (cell_count + 1)
+
+        for _, symbol, target in self.edges():
+            reverse_offsets[target * symbol_count + symbol + 1] += 1
+
+        for cell in range(cell_count):
+            reverse_offsets[cell + 1] += reverse_offsets[cell]
+
+        positions = reverse_offsets[:-1]
+        reverse_sources = array('i', [0]) * reverse_offsets[-1]
+
+        for source, symbol, target in self.edges():
+            cell = target * symbol_count + symbol
+            reverse_sources[positions[cell]] = source
+            positions[cell] += 1
+
+        self._reverse_sources = reverse_sources
+        self._reverse_offsets = reverse_offsets
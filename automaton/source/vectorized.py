@@ -0,0 +1,188 @@
+'''
+Operações vetorizadas com NumPy sobre autômatos finitos determinísticos.
+'''
+
+from array import array
+from typing import Sequence
+
+import numpy as np
+
+from source.finite_automaton import FiniteAutomaton, FiniteAutomatonMinimizer
+from source.instrumentation import Instrumentation
+from source.transition_table import NO_STATE
+
+
+class VectorizedAcceptor():
+
+    '''
+    Reconhecedor em lote sobre a matriz de transições de um AFD.
+
+    As palavras são agrupadas por comprimento e cada grupo avança uma coluna de símbolos por vez, de modo
+    que o laço em Python percorre apenas as posições das palavras e não cada caractere de cada palavra.
+    Os símbolos do alfabeto devem ter um caractere.
+    '''
+
+    _matrix: np.ndarray
+    _accepting: np.ndarray
+    _initial_state: int
+    _symbol_columns: np.ndarray
+    _chunk_size: int
+
+    def __init__(self, finite_automaton: FiniteAutomaton, chunk_size: int = 65536) -> None:
+        symbols = finite_automaton.symbols
+
+        if any(len(symbol) != 1 for symbol in symbols):
+            raise ValueError('Os símbolos devem ter um caractere.')
+
+        self._matrix = VectorizedAcceptor.transition_matrix(finite_automaton)
+        self._accepting = np.zeros(self._matrix.shape[0], dtype=bool)
+        self._accepting[list(finite_automaton.final_state_ids)] = True
+        self._initial_state = finite_automaton.initial_state_id
+        self._chunk_size = chunk_size
+
+        # Códigos fora do alfabeto caem na última coluna, que leva ao sumidouro.
+        unknown_column = len(symbols)
+        code_points = [ord(symbol) for symbol in symbols]
+        self._symbol_columns = np.full(max(code_points, default=0) + 2, unknown_column, dtype=np.int32)
+        self._symbol_columns[code_points] = np.arange(len(symbols), dtype=np.int32)
+
+    @staticmethod
+    def transition_matrix(finite_automaton: FiniteAutomaton) -> np.ndarray:
+        '''
+        Retorna a matriz de transições completa de um AFD.
+
+        A matriz tem uma linha a mais para o sumidouro e uma coluna a mais para símbolos desconhecidos; as
+        transições ausentes vão para o sumidouro.
+        '''
+
+        if not finite_automaton.is_deterministic:
+            raise ValueError('O autômato não é determinístico.')
+
+        table = finite_automaton.table
+        state_count = table.state_count
+        symbol_count = table.symbol_count
+        sink = state_count
+
+        targets = np.array(table.dense_targets, dtype=np.int32).reshape(state_count, symbol_count)
+        matrix = np.full((state_count + 1, symbol_count + 1), sink, dtype=np.int32)
+        matrix[:state_count, :symbol_count] = np.where(targets == NO_STATE, sink, targets)
+
+        return matrix
+
+    def accepts(self, words: Sequence[str]) -> np.ndarray:
+        '''
+        Retorna um vetor booleano indicando quais palavras são aceitas.
+        '''
+
+        results = np.zeros(len(words), dtype=bool)
+        buckets = {}
+
+        for index, word in enumerate(words):
+            buckets.setdefault(len(word), []).append(index)
+
+        for length, indexes in buckets.items():
+            for start in range(0, len(indexes), self._chunk_size):
+                chunk = indexes[start:start + self._chunk_size]
+                results[chunk] = self.accepts_same_length([words[index] for index in chunk], length)
+
+        return results
+
+    def accepts_same_length(self, words: Sequence[str], length: int) -> np.ndarray:
+        '''
+        Retorna quais palavras de um mesmo comprimento são aceitas.
+        '''
+
+        states = np.full(len(words), self._initial_state, dtype=np.int32)
+
+        if length > 0:
+            code_points = np.frombuffer(''.join(words).encode('utf-32-le'), dtype=np.uint32).reshape(len(words), length)
+            code_points = np.minimum(code_points, len(self._symbol_columns) - 1)
+            columns = self._symbol_columns[code_points]
+
+            for position in range(length):
+                states = self._matrix[states, columns[:, position]]
+
+        return self._accepting[states]
+
+
+class VectorizedMinimizer():
+
+    '''
+    Minimizador pelo refinamento de Moore com cada rodada feita em operações do NumPy.
+
+    A assinatura de um estado é o seu bloco seguido dos blocos dos seus sucessores por cada símbolo, uma
+    linha da matriz `blocks[matrix]`. Os blocos da rodada seguinte são os índices das linhas distintas dadas
+    por `np.unique`. Como a assinatura inclui o próprio bloco, cada partição refina a anterior, e o
+    refinamento para quando o número de blocos não muda. O número de rodadas é a profundidade de distinção
+    do AFD, então o método é adequado a AFDs aleatórios com alfabetos pequenos, mas não a cadeias longas.
+    '''
+
+    @staticmethod
+    def minimize(finite_automaton: FiniteAutomaton, instrumentation: Instrumentation | None = None) -> FiniteAutomaton:
+        '''
+        Minimiza um autômato finito determinístico.
+        '''
+
+        return FiniteAutomatonMinimizer.minimize(finite_automaton, instrumentation, VectorizedMinimizer.refine_table)
+
+    @staticmethod
+    def refine_table(complete_targets: array,
+                     final_states: bytearray,
+                     symbol_count: int) -> tuple[list[int], dict[str, int]]:
+        '''
+        Refina a tabela completa dos estados vivos para `FiniteAutomatonMinimizer.minimize`.
+        '''
+
+        matrix = np.frombuffer(complete_targets, dtype=np.int32).reshape(-1, symbol_count)
+        block_of, rounds = VectorizedMinimizer.refine(matrix, np.frombuffer(final_states, dtype=np.uint8))
+
+        return block_of.tolist(), {'rounds': rounds, 'blocks': int(block_of.max()) + 1}
+
+    @staticmethod
+    def refine(matrix: np.ndarray, final_states: np.ndarray) -> tuple[np.ndarray, int]:
+        '''
+        Retorna o bloco de cada estado de um AFD completo na partição de Nerode e o número de rodadas.
+        '''
+
+        blocks = final_states.astype(np.int64)
+        block_count = len(np.unique(blocks))
+        rounds = 0
+
+        while True:
+            rounds += 1
+            signatures = np.empty((matrix.shape[0], matrix.shape[1] + 1), dtype=np.int64)
+            signatures[:, 0] = blocks
+            signatures[:, 1:] = blocks[matrix]
+            _, inverse = np.unique(signatures, axis=0, return_inverse=True)
+            blocks = inverse.ravel()
+            new_block_count = int(blocks.max()) + 1
+
+            if new_block_count == block_count:
+                return blocks, rounds
+
+            block_count = new_block_count
+
+    @staticmethod
+    def equivalence_classes(finite_automaton: FiniteAutomaton,
+                            live_states: set[str],
+                            final_states: set[str]) -> list[set[str]]:
+        '''
+        Retorna as classes de equivalência dos estados vivos, como em `refine_equivalence_classes`.
+        '''
+
+        matrix = VectorizedAcceptor.transition_matrix(finite_automaton)
+        sink = matrix.shape[0] - 1
+        live = np.zeros(sink + 1, dtype=bool)
+        state_ids = (finite_automaton.state_id(state) for state in live_states)
+        live[[state for state in state_ids if state is not None]] = True
+        accepting = np.zeros(sink + 1, dtype=np.uint8)
+        accepting[[state for state in range(sink) if finite_automaton.state_label(state) in final_states]] = 1
+
+        # Os destinos fora dos estados vivos vão para o sumidouro, como na tabela completa do minimizador.
+        block_of, _ = VectorizedMinimizer.refine(np.where(live[matrix], matrix, sink), accepting & live)
+        equivalence_classes: dict[int, set[str]] = {}
+
+        for state in np.flatnonzero(live[:sink]).tolist():
+            equivalence_classes.setdefault(int(block_of[state]), set()).add(finite_automaton.state_label(state))
+
+        return list(equivalence_classes.values())
@@ -9,11 +9,61 @@ from tests.tests import Tests
 with open(join('tests','cases', 'determinization.json'), 'r') as file:
     nfa_automata = loads(file.read())
 
+with open(join('tests', 'cases', 'text_format.json'), 'r') as file:
+    text_automata = loads(file.read())
+
 with open(join('tests', 'cases', 'minimization.json'), 'r') as file:
     dfa_automata = loads(file.read())
 
+with open(join('tests', 'cases', 'epsilon_removal.json'), 'r') as file:
+    epsilon_nfa_automata = loads(file.read())
+
+with open(join('tests', 'cases', 'matching.json'), 'r') as file:
+    matching_automata = loads(file.read())
+
+with open(join('tests', 'cases', 'vectorized_acceptance.json'), 'r') as file:
+    vectorized_automata = loads(file.read())
+
+with open(join('tests', 'cases', 'derivatives.json'), 'r') as file:
+    derivative_regexes = loads(file.read())
+
+with open(join('tests', 'cases', 'product.json'), 'r') as file:
+    product_automata = loads(file.read())
+
+with open(join('tests', 'cases', 'equivalence.json'), 'r') as file:
+    equivalence_automata = loads(file.read())
+
+with open(join('tests', 'cases', 'inclusion.json'), 'r') as file:
+    inclusion_automata = loads(file.read())
+
+text_tests = Tests(text_automata.items())
 nfa_tests = Tests(nfa_automata.items())
 dfa_tests = Tests(dfa_automata.items())
+epsilon_nfa_tests = Tests(epsilon_nfa_automata.items())
+matching_tests = Tests(matching_automata.items())
+vectorized_tests = Tests(vectorized_automata.items())
+derivative_tests = Tests(derivative_regexes.items())
+product_tests = Tests(product_automata.items())
+equivalence_tests = Tests(equivalence_automata.items())
+inclusion_tests = Tests(inclusion_automata['inclusion'].items())
+universality_tests = Tests(inclusion_automata['universality'].items())
 
+text_tests.run_all_text_format()
 nfa_tests.run_all_determinizattion()
+nfa_tests.run_all_determinize_and_minimize()
 dfa_tests.run_all_minimization()
+dfa_tests.run_all_vectorized_minimization()
+dfa_tests.run_all_parallel_minimization()
+dfa_tests.run_all_batch()
+epsilon_nfa_tests.run_all_epsilon_removal()
+epsilon_nfa_tests.run_all_instrumentation()
+matching_tests.run_all_matching()
+vectorized_tests.run_all_vectorized_acceptance()
+derivative_tests.run_all_derivatives()
+derivative_tests.run_all_glushkov()
+derivative_tests.run_all_cache()
+nfa_tests.run_all_serialization()
+product_tests.run_all_product()
+equivalence_tests.run_all_equivalence()
+inclusion_tests.run_all_inclusion()
+universality_tests.run_all_universality()
@@ -2,7 +2,31 @@
 Testa a determinização de autômatos finitos não determinísticos.
 '''
 
-from source.finite_automaton import FiniteAutomatonBuilder, FiniteAutomatonDeterminizer, FiniteAutomatonMinimizer
+import os
+import subprocess
+import sys
+from collections import deque
+from io import BytesIO, StringIO
+from tempfile import TemporaryDirectory
+from typing import Any, Callable
+from source.finite_automaton import FiniteAutomaton, FiniteAutomatonBuilder, FiniteAutomatonDeterminizer, \
+    FiniteAutomatonMinimizer, FiniteAutomatonEpsilonRemover
+from source.equivalence import FiniteAutomatonEquivalence
+from source.inclusion import FiniteAutomatonInclusion
+from source.instrumentation import Instrumentation
+from source.lazy_dfa import LazyDFAMatcher
+from source.product import FiniteAutomatonProduct
+from source.regex_cache import RegexCache
+from source.regex_fa import RegexToDFAConversor
+from source.serialization import FiniteAutomatonSerializer
+
+try:
+    from source.parallel_minimization import ParallelMinimizer
+    from source.vectorized import VectorizedAcceptor, VectorizedMinimizer
+except ImportError:
+    ParallelMinimizer = None
+    VectorizedAcceptor = None
+    VectorizedMinimizer = None
 
 
 class Tests():
@@ -11,11 +35,22 @@ class Tests():
     Tests.
     '''
 
-    _automata: list[tuple[str, str]]
+    _automata: list[tuple[str, Any]]
 
-    def __init__(self, automata: list[tuple[str, str]]) -> None:
+    def __init__(self, automata: list[tuple[str, Any]]) -> None:
         self._automata = automata
 
+    def run_all_text_format(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for input_automaton, output_automaton in self._automata:
+            self.run_text_format(input_automaton, output_automaton)
+            print()
+
     def run_all_minimization(self) -> None:
         '''
         Runs the tests.
@@ -27,6 +62,63 @@ class Tests():
             self.run_minimization(input_dfa, output_dfa)
             print()
 
+    def run_all_vectorized_minimization(self) -> None:
+        '''
+        Runs the tests. They are skipped when NumPy is not installed.
+        '''
+
+        print('Running tests\n')
+
+        if VectorizedMinimizer is None:
+            print('NumPy is not installed, skipping\n')
+            return
+
+        for input_dfa, _ in self._automata:
+            self.run_vectorized_minimization(input_dfa)
+            print()
+
+    def run_all_parallel_minimization(self) -> None:
+        '''
+        Runs the tests with one and two workers. They are skipped when NumPy is not installed.
+        '''
+
+        print('Running tests\n')
+
+        if ParallelMinimizer is None:
+            print('NumPy is not installed, skipping\n')
+            return
+
+        for input_dfa, _ in self._automata:
+            for workers in (1, 2):
+                self.run_parallel_minimization(input_dfa, workers)
+                print()
+
+    def run_all_batch(self) -> None:
+        '''
+        Runs the tests of the minimization script.
+        '''
+
+        print('Running tests\n')
+
+        self.run_batch([input_dfa for input_dfa, _ in self._automata], [output_dfa for _, output_dfa in self._automata])
+        print()
+        self.run_batch_timeout()
+        print()
+        self.run_single_error()
+        print()
+
+    def run_all_instrumentation(self) -> None:
+        '''
+        Runs the tests of the determinization counters and of --report.
+        '''
+
+        print('Running tests\n')
+
+        self.run_instrumentation()
+        print()
+        self.run_report()
+        print()
+
     def run_all_determinizattion(self) -> None:
         '''
         Runs the tests.
@@ -38,6 +130,161 @@ class Tests():
             self.run_determinization(input_nfa, output_dfa)
             print()
 
+    def run_all_determinize_and_minimize(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for input_nfa, _ in self._automata:
+            self.run_determinize_and_minimize(input_nfa)
+            print()
+
+    def run_all_epsilon_removal(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for input_nfa, output_nfa in self._automata:
+            self.run_epsilon_removal(input_nfa, output_nfa)
+            print()
+
+    def run_all_matching(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for automaton, words in self._automata:
+            self.run_matching(automaton, words)
+            print()
+
+    def run_all_vectorized_acceptance(self) -> None:
+        '''
+        Runs the tests. They are skipped when NumPy is not installed.
+        '''
+
+        print('Running tests\n')
+
+        if VectorizedAcceptor is None:
+            print('NumPy is not installed, skipping\n')
+            return
+
+        for automaton, words in self._automata:
+            self.run_vectorized_acceptance(automaton, words)
+            print()
+
+    def run_all_derivatives(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for regular_expression, words in self._automata:
+            self.run_derivatives(regular_expression, words)
+            print()
+
+    def run_all_glushkov(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for regular_expression, words in self._automata:
+            self.run_glushkov(regular_expression, words)
+            print()
+
+    def run_all_cache(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for regular_expression, _ in self._automata:
+            self.run_cache(regular_expression)
+            print()
+
+    def run_all_serialization(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for input_nfa, output_dfa in self._automata:
+            self.run_serialization(input_nfa, output_dfa)
+            print()
+
+    def run_all_product(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for operation, cases in self._automata:
+            for automaton_a, automaton_b, words in cases:
+                self.run_product(operation, automaton_a, automaton_b, words)
+                print()
+
+    def run_all_equivalence(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for automaton_a, cases in self._automata:
+            for automaton_b, length in cases:
+                self.run_equivalence(automaton_a, automaton_b, length)
+                print()
+
+    def run_all_inclusion(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for automaton_a, cases in self._automata:
+            for automaton_b, length in cases:
+                self.run_inclusion(automaton_a, automaton_b, length)
+                print()
+
+    def run_all_universality(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        for automaton, length in self._automata:
+            self.run_universality(automaton, length)
+            print()
+
+    def run_text_format(self, input_automaton: str, output_automaton: str) -> None:
+        '''
+        Runs the test. The header counts every state, including the initial and final states without transitions.
+        '''
+
+        print(f'Running tests for {input_automaton}')
+
+        finite_automaton = FiniteAutomatonBuilder.build(input_automaton)
+        streamed_automaton = FiniteAutomatonBuilder.build_from_file(StringIO(input_automaton), chunk_size=4)
+
+        if str(finite_automaton) == str(streamed_automaton) == output_automaton:
+            print(f'{input_automaton} passed with result {finite_automaton}')
+        else:
+            print(f'{input_automaton} failed')
+            print(f'Compare:\n[Result  ]: {finite_automaton} {streamed_automaton}\n[Expected]: {output_automaton}')
+
     def run_determinization(self, input_nfa: str, output_dfa: str) -> None:
         '''
         Runs the test.
@@ -54,6 +301,24 @@ class Tests():
             print(f'{input_nfa} failed')
             print(f'Compare:\n[Result  ]: {dfa}\n[Expected]: {output_dfa}')
 
+    def run_determinize_and_minimize(self, input_nfa: str) -> None:
+        '''
+        Runs the test. The result must match minimizing the determinized automaton.
+        '''
+
+        print(f'Running tests for {input_nfa}')
+
+        nfa = FiniteAutomatonBuilder.build(input_nfa)
+        minimal_dfa = FiniteAutomatonMinimizer.determinize_and_minimize(nfa)
+        expected_dfa = FiniteAutomatonMinimizer.minimize(FiniteAutomatonDeterminizer.determinize(nfa))
+
+        if minimal_dfa.state_count == expected_dfa.state_count and \
+                FiniteAutomatonEquivalence.equivalent(minimal_dfa, expected_dfa):
+            print(f'{input_nfa} passed with result {minimal_dfa}')
+        else:
+            print(f'{input_nfa} failed')
+            print(f'Compare:\n[Result  ]: {minimal_dfa}\n[Expected]: {expected_dfa}')
+
     def run_minimization(self, input_dfa: str, output_dfa: str) -> None:
         '''
         Runs the test.
@@ -69,3 +334,491 @@ class Tests():
         else:
             print(f'{input_dfa} failed')
             print(f'Compare:\n[Result  ]: {minimal_dfa}\n[Expected]: {output_dfa}')
+
+    def run_vectorized_minimization(self, input_dfa: str) -> None:
+        '''
+        Runs the test. The partition and the result must match the ones of the Hopcroft minimizer.
+        '''
+
+        print(f'Running tests for {input_dfa}')
+
+        dfa = FiniteAutomatonBuilder.build(input_dfa)
+        minimal_dfa = VectorizedMinimizer.minimize(dfa)
+        expected_dfa = FiniteAutomatonMinimizer.minimize(dfa)
+
+        reachable_states = FiniteAutomatonMinimizer.reachable_state_ids(dfa)
+        live_state_ids = FiniteAutomatonMinimizer.live_state_ids(dfa, reachable_states)
+        live_states = {dfa.state_label(state) for state in range(dfa.state_count) if live_state_ids[state]}
+        classes = VectorizedMinimizer.equivalence_classes(dfa, live_states, dfa.final_states)
+        expected_classes = FiniteAutomatonMinimizer.refine_equivalence_classes(dfa, live_states, dfa.final_states)
+
+        if sorted(map(sorted, classes)) == sorted(map(sorted, expected_classes)) and \
+                str(minimal_dfa) == str(expected_dfa):
+            print(f'{input_dfa} passed with result {minimal_dfa}')
+        else:
+            print(f'{input_dfa} failed')
+            print(f'Compare:\n[Result  ]: {minimal_dfa} {classes}\n[Expected]: {expected_dfa} {expected_classes}')
+
+    def run_parallel_minimization(self, input_dfa: str, workers: int) -> None:
+        '''
+        Runs the test. The result must match the one of the Hopcroft minimizer.
+        '''
+
+        print(f'Running tests for {input_dfa} with {workers} workers')
+
+        dfa = FiniteAutomatonBuilder.build(input_dfa)
+        minimizer = ParallelMinimizer(workers)
+        minimal_dfa = minimizer.minimize(dfa)
+        expected_dfa = FiniteAutomatonMinimizer.minimize(dfa)
+
+        if str(minimal_dfa) == str(expected_dfa):
+            print(f'{input_dfa} passed with result {minimal_dfa} ({minimizer.rounds} rounds)')
+        else:
+            print(f'{input_dfa} failed')
+            print(f'Compare:\n[Result  ]: {minimal_dfa}\n[Expected]: {expected_dfa}')
+
+    def run_batch(self, input_dfas: list[str], output_dfas: list[str]) -> None:
+        '''
+        Runs the test. A malformed line must be reported on the standard error with its index, leave an empty
+        line in the output and make the script exit with a failure.
+        '''
+
+        print('Running tests for a batch with a malformed line')
+
+        lines = input_dfas[:1] + ['3;A;{C};{a};A,a'] + input_dfas[1:]
+        expected_output = output_dfas[:1] + [''] + output_dfas[1:]
+        completed = subprocess.run([sys.executable, 'minimization.py', '--batch', '--workers', '2'],
+                                   input='\n'.join(lines) + '\n',
+                                   capture_output=True,
+                                   text=True,
+                                   check=False)
+        errors = completed.stderr.splitlines()
+
+        if completed.returncode == 1 and completed.stdout.splitlines() == expected_output and \
+                len(errors) == 1 and errors[0].startswith('1\tValueError: '):
+            print(f'Batch passed with errors {errors}')
+        else:
+            print('Batch failed')
+            print(f'Compare:\n[Result  ]: {completed.returncode} {completed.stdout!r} {completed.stderr!r}\n'
+                  f'[Expected]: 1 {expected_output}')
+
+    def run_batch_timeout(self) -> None:
+        '''
+        Runs the test. A line that exceeds the time limit must be reported without stopping the batch.
+        '''
+
+        print('Running tests for a batch with a timeout')
+
+        # (a|b)*a(a|b)^19: the subset construction reaches 2^20 states, far beyond the time limit.
+        transitions = ['0,a,0', '0,b,0', '0,a,1'] + [f'{state},{symbol},{state + 1}'
+                                                     for state in range(1, 20) for symbol in 'ab']
+        lines = ['21;0;{20};{a,b};' + ';'.join(transitions), '2;A;{B};{a};A,a,A;A,a,B']
+        completed = subprocess.run([sys.executable, 'determinization.py', '--batch', '--timeout', '0.1'],
+                                   input='\n'.join(lines) + '\n',
+                                   capture_output=True,
+                                   text=True,
+                                   check=False)
+        expected_output = ['', '2;{A};{{AB}};{a};{A},a,{AB};{AB},a,{AB}']
+        expected_errors = ['0\tTimeoutError: Tempo limite excedido.']
+
+        if completed.returncode == 1 and completed.stdout.splitlines() == expected_output and \
+                completed.stderr.splitlines() == expected_errors:
+            print(f'Batch passed with errors {expected_errors}')
+        else:
+            print('Batch failed')
+            print(f'Compare:\n[Result  ]: {completed.returncode} {completed.stdout!r} {completed.stderr!r}\n'
+                  f'[Expected]: 1 {expected_output} {expected_errors}')
+
+    def run_single_error(self) -> None:
+        '''
+        Runs the test. Without --batch, an error must also be a single line on the standard error.
+        '''
+
+        print('Running tests for a nondeterministic automaton given to the minimization script')
+
+        completed = subprocess.run([sys.executable, 'minimization.py'],
+                                   input='2;A;{B};{a};A,a,A;A,a,B\n',
+                                   capture_output=True,
+                                   text=True,
+                                   check=False)
+        expected_errors = ['ValueError: O autômato não é determinístico.']
+
+        if completed.returncode == 1 and completed.stdout == '' and completed.stderr.splitlines() == expected_errors:
+            print(f'Minimization passed with errors {expected_errors}')
+        else:
+            print('Minimization failed')
+            print(f'Compare:\n[Result  ]: {completed.returncode} {completed.stdout!r} {completed.stderr!r}\n'
+                  f'[Expected]: 1 {expected_errors}')
+
+    def run_instrumentation(self) -> None:
+        '''
+        Runs the test. The counters must measure the work of the subset construction.
+        '''
+
+        print('Running tests for the determinization counters')
+
+        # Only A and B have closures larger than themselves, merged once into the moves A,1,A and B,2,B.
+        nfa = FiniteAutomatonBuilder.build('3;A;{C};{1,2,3,&};A,1,A;A,&,B;B,2,B;B,&,C;C,3,C')
+        instrumentation = Instrumentation()
+        FiniteAutomatonDeterminizer.determinize(nfa, instrumentation)
+        expected_counters = {'determinize/nfa states': 3,
+                             'determinize/epsilon closures': 2,
+                             'determinize/closure unions': 2,
+                             'determinize/dfa states': 3,
+                             'determinize/worklist peak': 2}
+        phases = {'determinize', 'determinize/epsilon closure', 'determinize/subset construction'}
+
+        if instrumentation.counters == expected_counters and set(instrumentation.times) == phases:
+            print(f'Counters passed with {instrumentation.counters}')
+        else:
+            print('Counters failed')
+            print(f'Compare:\n[Result  ]: {instrumentation.as_dict()}\n[Expected]: {expected_counters}')
+
+    def run_report(self) -> None:
+        '''
+        Runs the test. In batch mode, the counters of the items must be added up and the peaks kept.
+        '''
+
+        print('Running tests for --report')
+
+        nfa = '3;A;{C};{1,2,3,&};A,1,A;A,&,B;B,2,B;B,&,C;C,3,C'
+        completed = subprocess.run([sys.executable, 'determinization.py', '--batch', '--workers', '2', '--report'],
+                                   input=f'{nfa}\n{nfa}\n',
+                                   capture_output=True,
+                                   text=True,
+                                   check=False)
+        lines = completed.stderr.splitlines()
+        counters = lines[lines.index('Counters:') + 1:] if 'Counters:' in lines else []
+        expected_counters = ['  determinize/closure unions: 4',
+                             '  determinize/dfa states: 6',
+                             '  determinize/epsilon closures: 4',
+                             '  determinize/nfa states: 6',
+                             '  determinize/worklist peak: 2']
+
+        if completed.returncode == 0 and lines[0] == 'Phase times:' and counters == expected_counters and \
+                '  determinize/subset construction' in [line.split(':')[0] for line in lines]:
+            print(f'Report passed with counters {counters}')
+        else:
+            print('Report failed')
+            print(f'Compare:\n[Result  ]: {completed.stderr!r}\n[Expected]: {expected_counters}')
+
+    def run_epsilon_removal(self, input_nfa: str, output_nfa: str) -> None:
+        '''
+        Runs the test.
+        '''
+
+        print(f'Running tests for {input_nfa}')
+
+        nfa = FiniteAutomatonBuilder.build(input_nfa)
+        epsilon_free_nfa = FiniteAutomatonEpsilonRemover.remove_epsilon_transitions(nfa)
+
+        if str(epsilon_free_nfa) == output_nfa:
+            print(f'{input_nfa} passed with result {epsilon_free_nfa}')
+        else:
+            print(f'{input_nfa} failed')
+            print(f'Compare:\n[Result  ]: {epsilon_free_nfa}\n[Expected]: {output_nfa}')
+
+    def run_matching(self, automaton: str, words: dict[str, bool]) -> None:
+        '''
+        Runs the test.
+        '''
+
+        print(f'Running tests for {automaton}')
+
+        finite_automaton = FiniteAutomatonBuilder.build(automaton)
+        matcher = LazyDFAMatcher(finite_automaton, cache_size=2, thrash_window=4)
+        passed = True
+
+        for word, expected in words.items():
+            if matcher.accepts(word) != expected:
+                passed = False
+                print(f'Failed for "{word}" (expected {expected})')
+
+        if passed:
+            print(f'{automaton} passed ({matcher.hits} hits, {matcher.misses} misses, {matcher.evictions} evictions)')
+
+    def run_vectorized_acceptance(self, automaton: str, words: list[str]) -> None:
+        '''
+        Runs the test. The words are accepted in one batch, split in chunks of two words, and each result must
+        match the one of walking the transitions of the DFA one symbol at a time.
+        '''
+
+        print(f'Running tests for {automaton}')
+
+        dfa = FiniteAutomatonBuilder.build(automaton)
+        results = VectorizedAcceptor(dfa, chunk_size=2).accepts(words).tolist()
+        expected = []
+
+        for word in words:
+            states = {dfa.initial_state}
+
+            for symbol in word:
+                states = dfa.transition(states.pop(), symbol) if len(states) > 0 else states
+
+            expected.append(len(states & dfa.final_states) > 0)
+
+        if results == expected:
+            print(f'{automaton} passed with result {results}')
+        else:
+            print(f'{automaton} failed')
+            print(f'Compare:\n[Result  ]: {results}\n[Expected]: {expected}')
+
+    def run_derivatives(self, regular_expression: str, words: dict[str, bool]) -> None:
+        '''
+        Runs the test.
+        '''
+
+        print(f'Running tests for {regular_expression}')
+
+        dfa = RegexToDFAConversor.convert(regular_expression, backend=RegexToDFAConversor.DERIVATIVES)
+        followpos_dfa = RegexToDFAConversor.convert(regular_expression)
+        matcher = RegexToDFAConversor.matcher(regular_expression)
+        passed = FiniteAutomatonEquivalence.equivalent(dfa, followpos_dfa)
+
+        if not passed:
+            print(f'Compare:\n[Result  ]: {dfa}\n[Expected]: {followpos_dfa}')
+
+        for word, expected in words.items():
+            if matcher.accepts(word) != expected:
+                passed = False
+                print(f'Failed for "{word}" (expected {expected})')
+
+        if passed:
+            print(f'{regular_expression} passed with result {dfa}')
+        else:
+            print(f'{regular_expression} failed')
+
+    def run_glushkov(self, regular_expression: str, words: dict[str, bool]) -> None:
+        '''
+        Runs the test.
+        '''
+
+        print(f'Running tests for {regular_expression}')
+
+        matcher = RegexToDFAConversor.glushkov_matcher(regular_expression)
+        passed = True
+
+        for word, expected in words.items():
+            if matcher.accepts(word) != expected:
+                passed = False
+                print(f'Failed for "{word}" (expected {expected})')
+
+        if passed:
+            print(f'{regular_expression} passed ({matcher.position_count} positions)')
+        else:
+            print(f'{regular_expression} failed')
+
+    def run_serialization(self, input_nfa: str, output_dfa: str) -> None:
+        '''
+        Runs the test.
+        '''
+
+        print(f'Running tests for {input_nfa}')
+
+        nfa = FiniteAutomatonBuilder.build(input_nfa)
+        file = BytesIO()
+        FiniteAutomatonSerializer.dump(nfa, file)
+        loaded_nfa = FiniteAutomatonSerializer.load_buffer(file.getvalue())
+        dfa = FiniteAutomatonDeterminizer.determinize(loaded_nfa)
+        passed = True
+
+        # Every proper prefix of the file must be rejected.
+        for size in range(len(file.getvalue())):
+            try:
+                FiniteAutomatonSerializer.load_buffer(file.getvalue()[:size])
+                passed = False
+                print(f'Failed for a file truncated to {size} bytes')
+            except ValueError:
+                pass
+
+        if passed and str(loaded_nfa) == str(nfa) and str(dfa) == output_dfa:
+            print(f'{input_nfa} passed with result {dfa}')
+        else:
+            print(f'{input_nfa} failed')
+            print(f'Compare:\n[Result  ]: {loaded_nfa} -> {dfa}\n[Expected]: {nfa} -> {output_dfa}')
+
+    def run_cache(self, regular_expression: str) -> None:
+        '''
+        Runs the test. A truncated cache file must count as a miss and the ER must be compiled again.
+        '''
+
+        print(f'Running tests for {regular_expression}')
+
+        with TemporaryDirectory() as directory:
+            dfa = RegexToDFAConversor.convert(regular_expression, RegexCache(directory=directory))
+            path = os.path.join(directory, os.listdir(directory)[0])
+
+            with open(path, 'r+b') as file:
+                file.truncate(os.path.getsize(path) // 2)
+
+            cache = RegexCache(directory=directory)
+            recompiled_dfa = RegexToDFAConversor.convert(regular_expression, cache)
+            reloaded_dfa = RegexToDFAConversor.convert(regular_expression, RegexCache(directory=directory))
+
+        if cache.misses == 1 and cache.disk_hits == 0 and str(recompiled_dfa) == str(dfa) == str(reloaded_dfa):
+            print(f'{regular_expression} passed with result {recompiled_dfa}')
+        else:
+            print(f'{regular_expression} failed')
+            print(f'Compare:\n[Result  ]: {recompiled_dfa} ({cache.misses} misses)\n[Expected]: {dfa}')
+
+    def run_product(self, operation: str, automaton_a: str, automaton_b: str, words: dict[str, bool]) -> None:
+        '''
+        Runs the test.
+        '''
+
+        print(f'Running tests for {operation} of {automaton_a} and {automaton_b}')
+
+        finite_automaton_a = FiniteAutomatonBuilder.build(automaton_a)
+
+        if operation == 'complement':
+            result = FiniteAutomatonProduct.complement(finite_automaton_a)
+        else:
+            finite_automaton_b = FiniteAutomatonBuilder.build(automaton_b)
+            result = getattr(FiniteAutomatonProduct, operation)(finite_automaton_a, finite_automaton_b)
+
+        matcher = LazyDFAMatcher(result)
+        passed = result.is_deterministic
+
+        for word, expected in words.items():
+            if matcher.accepts(word) != expected:
+                passed = False
+                print(f'Failed for "{word}" (expected {expected})')
+
+        # The result must agree with the operation on every word, decided on the minimal DFAs of the operands.
+        operations: dict[str, Callable[[tuple[bool, ...]], bool]] = {
+            'intersection': all,
+            'union': any,
+            'difference': lambda accepted: accepted[0] and not accepted[1],
+            'symmetric_difference': lambda accepted: accepted[0] != accepted[1],
+            'complement': lambda accepted: not accepted[0]
+        }
+        operands = [finite_automaton_a] if operation == 'complement' else [finite_automaton_a, finite_automaton_b]
+        mismatch = Tests.shortest_word([result] + operands,
+                                       lambda accepted: accepted[0] != operations[operation](accepted[1:]))
+
+        if mismatch is not None:
+            passed = False
+            print(f'Failed for "{"".join(mismatch)}", found by determinizing and minimizing')
+
+        if passed:
+            print(f'{operation} passed with result {result}')
+        else:
+            print(f'{operation} failed')
+
+    def run_equivalence(self, automaton_a: str, automaton_b: str, length: int | None) -> None:
+        '''
+        Runs the test. `length` is the length of a shortest counterexample or None for equal languages.
+        '''
+
+        print(f'Running tests for {automaton_a} and {automaton_b}')
+
+        finite_automaton_a = FiniteAutomatonBuilder.build(automaton_a)
+        finite_automaton_b = FiniteAutomatonBuilder.build(automaton_b)
+        word = FiniteAutomatonEquivalence.counterexample(finite_automaton_a, finite_automaton_b)
+
+        if word is None:
+            passed = length is None
+        else:
+            accepted_a = LazyDFAMatcher(finite_automaton_a).accepts(word)
+            accepted_b = LazyDFAMatcher(finite_automaton_b).accepts(word)
+            passed = len(word) == length and accepted_a != accepted_b
+
+        if passed:
+            print(f'{automaton_a} and {automaton_b} passed with counterexample {word}')
+        else:
+            print(f'{automaton_a} and {automaton_b} failed')
+            print(f'Compare:\n[Result  ]: {word}\n[Expected]: length {length}')
+
+    def run_inclusion(self, automaton_a: str, automaton_b: str, length: int | None) -> None:
+        '''
+        Runs the test. `length` is the length of a shortest counterexample or None if L(A) ⊆ L(B). Both must
+        agree with a search on the minimal DFAs of A and B.
+        '''
+
+        print(f'Running tests for {automaton_a} and {automaton_b}')
+
+        finite_automaton_a = FiniteAutomatonBuilder.build(automaton_a)
+        finite_automaton_b = FiniteAutomatonBuilder.build(automaton_b)
+        word = FiniteAutomatonInclusion.inclusion_counterexample(finite_automaton_a, finite_automaton_b)
+        expected_word = Tests.shortest_word([finite_automaton_a, finite_automaton_b],
+                                            lambda accepted: accepted[0] and not accepted[1])
+
+        if word is None:
+            passed = length is None and expected_word is None
+        else:
+            accepted_a = LazyDFAMatcher(finite_automaton_a).accepts(word)
+            accepted_b = LazyDFAMatcher(finite_automaton_b).accepts(word)
+            passed = expected_word is not None and len(word) == length == len(expected_word) and \
+                accepted_a and not accepted_b
+
+        if passed:
+            print(f'{automaton_a} and {automaton_b} passed with counterexample {word}')
+        else:
+            print(f'{automaton_a} and {automaton_b} failed')
+            print(f'Compare:\n[Result  ]: {word}\n[Expected]: length {length}, as {expected_word}')
+
+    def run_universality(self, automaton: str, length: int | None) -> None:
+        '''
+        Runs the test. `length` is the length of a shortest rejected word or None for universal automata. Both
+        must agree with a search on the minimal DFA.
+        '''
+
+        print(f'Running tests for {automaton}')
+
+        finite_automaton = FiniteAutomatonBuilder.build(automaton)
+        word = FiniteAutomatonInclusion.universality_counterexample(finite_automaton)
+        expected_word = Tests.shortest_word([finite_automaton], lambda accepted: not accepted[0])
+
+        if word is None:
+            passed = length is None and expected_word is None
+        else:
+            passed = expected_word is not None and len(word) == length == len(expected_word) and \
+                not LazyDFAMatcher(finite_automaton).accepts(word)
+
+        if passed:
+            print(f'{automaton} passed with counterexample {word}')
+        else:
+            print(f'{automaton} failed')
+            print(f'Compare:\n[Result  ]: {word}\n[Expected]: length {length}, as {expected_word}')
+
+    @staticmethod
+    def shortest_word(automata: list[FiniteAutomaton],
+                      predicate: Callable[[tuple[bool, ...]], bool]) -> list[str] | None:
+        '''
+        Returns the symbols of a shortest word whose acceptance by each automaton satisfies a predicate, or None.
+
+        The automata are determinized and minimized first and the search runs on the product of the minimal DFAs,
+        so it does not depend on the constructions under test.
+        '''
+
+        dfas = [FiniteAutomatonMinimizer.minimize(FiniteAutomatonDeterminizer.determinize(finite_automaton))
+                for finite_automaton in automata]
+        symbols = sorted(set().union(*(dfa.alphabet for dfa in dfas)) - {'&'})
+        initial_states = tuple(dfa.initial_state_id for dfa in dfas)
+        parents: dict[tuple[int, ...], tuple[tuple[int, ...], str] | None] = {initial_states: None}
+        unprocessed_states = deque([initial_states])
+
+        while len(unprocessed_states) > 0:
+            states = unprocessed_states.popleft()
+
+            if predicate(tuple(state in dfa.final_state_ids for dfa, state in zip(dfas, states))):
+                word = []
+
+                while parents[states] is not None:
+                    states, symbol = parents[states]  # type: ignore
+                    word.append(symbol)
+
+                word.reverse()
+
+                return word
+
+            for symbol in symbols:
+                targets = tuple(dfa.table.target(state, dfa.symbol_id(symbol))
+                                if state >= 0 and dfa.symbol_id(symbol) is not None else -1
+                                for dfa, state in zip(dfas, states))
+
+                if targets not in parents:
+                    parents[targets] = (states, symbol)
+                    unprocessed_states.append(targets)
+
+        return None
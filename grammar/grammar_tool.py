@@ -36,4 +36,5 @@ if MODE == 'generate':
         print(string)
 else:
     tests = Tests(DEPTH)
+    tests.run_all_derivations()
     tests.run_all()
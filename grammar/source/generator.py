@@ -20,15 +20,7 @@ class Generator():
         strings = []
 
         for _ in range(str_count):
-            string = grammar.initial_production_rule
-
-            while True:
-                string, is_done = grammar.derive_random_step(string)
-
-                if is_done:
-                    break
-
-            strings.append(string)
+            strings.append(grammar.derive_random())
 
         return sorted(strings, key=len)
 
@@ -38,11 +30,12 @@ class Generator():
         Runs the generator.
         '''
 
-        strings = Generator.proccess_branch_step(grammar, grammar.initial_production_rule, 0, max_depth)
+        tokens = grammar.tokenize(grammar.initial_production_rule)
+        strings = Generator.proccess_branch_step(grammar, tokens, 0, max_depth)
         return sorted(strings, key=len)
 
     @staticmethod
-    def proccess_branch_step(grammar: Grammar, string: str, call_depth: int, max_depth: int) -> list[str]:
+    def proccess_branch_step(grammar: Grammar, tokens: tuple[str, ...], call_depth: int, max_depth: int) -> list[str]:
         '''
         Runs the generator.
         '''
@@ -50,10 +43,10 @@ class Generator():
         if call_depth > max_depth:
             return []
 
-        possible_results, is_done = grammar.derive_branching_step(string)
+        possible_results, is_done = grammar.derive_branching_tokens(tokens)
 
         if is_done:
-            return possible_results
+            return [''.join(possible_result) for possible_result in possible_results]
 
         results = []
 
@@ -2,7 +2,10 @@
 Grammar.
 '''
 
+import re
 from random import choice
+from typing import Iterable
+from source.sentential_form import SententialForm
 
 
 class Grammar():
@@ -13,6 +16,12 @@ class Grammar():
 
     _initial_production_rule: str
     _production_rules: dict[str, list[str]]
+    _nonterminals: set[str]
+    _token_pattern: re.Pattern
+    _character_tokens: bool
+    _patterns: dict[str, tuple[str, ...]]
+    _pattern_heads: set[str]
+    _tokenized_rules: dict[str, list[tuple[str, ...]]]
 
     def __init__(self, grammar: str) -> None:
         self._initial_production_rule = ''
@@ -37,6 +46,42 @@ class Grammar():
             else:
                 raise ValueError('Invalid production.')
 
+        # A left-hand side made of two or more symbols, like BR in BR -> RB or aB in aB -> ab, is a context and
+        # not a nonterminal. Symbols are the nonterminals and the tokens of the right-hand sides, and splitting a
+        # context out makes the right-hand sides split finer, so the contexts are removed until none is left.
+        self._nonterminals = set(self._production_rules)
+
+        while True:
+            symbols = set(self._nonterminals)
+
+            for right_hand_sides in self._production_rules.values():
+                for right_hand_side in right_hand_sides:
+                    if right_hand_side != 'null':
+                        symbols.update(Grammar.split(right_hand_side, self._nonterminals))
+
+            contexts = set()
+
+            for left_hand_side in self._nonterminals:
+                tokens = Grammar.split(left_hand_side, self._nonterminals - {left_hand_side})
+
+                if len(tokens) > 1 and all(token in symbols for token in tokens):
+                    contexts.add(left_hand_side)
+
+            if len(contexts) == 0:
+                break
+
+            self._nonterminals -= contexts
+
+        self._token_pattern = Grammar.token_pattern(self._nonterminals)
+        self._character_tokens = all(len(nonterminal) == 1 for nonterminal in self._nonterminals)
+        self._patterns = {left_hand_side: self.tokenize(left_hand_side) for left_hand_side in self._production_rules}
+        self._pattern_heads = {pattern[0] for pattern in self._patterns.values()}
+        self._tokenized_rules = {}
+
+        for left_hand_side, right_hand_sides in self._production_rules.items():
+            self._tokenized_rules[left_hand_side] = [self.tokenize(right_hand_side) if right_hand_side != 'null' else ()
+                                                     for right_hand_side in right_hand_sides]
+
     def __str__(self) -> str:
         '''
         Returns a string representation of the grammar.
@@ -62,44 +107,165 @@ class Grammar():
 
         return self._initial_production_rule
 
-    def derive_random_step(self, string: str) -> tuple[str, bool]:
+    @property
+    def nonterminals(self) -> set[str]:
+        '''
+        Returns the nonterminals.
+        '''
+
+        return self._nonterminals
+
+    @staticmethod
+    def token_pattern(names: Iterable[str]) -> re.Pattern:
+        '''
+        Returns a pattern that matches the longest name at a position or a single character.
+        '''
+
+        alternatives = [re.escape(name) for name in sorted(names, key=len, reverse=True)]
+
+        return re.compile('|'.join(alternatives + ['.']), re.DOTALL)
+
+    @staticmethod
+    def split(string: str, names: Iterable[str]) -> tuple[str, ...]:
+        '''
+        Splits a string into the longest names at each position and single characters elsewhere.
+        '''
+
+        return tuple(Grammar.token_pattern(names).findall(string))
+
+    @staticmethod
+    def find(tokens: tuple[str, ...], pattern: tuple[str, ...]) -> int:
+        '''
+        Returns the position of the first occurrence of a pattern in a tokenized string or -1.
+        '''
+
+        position = -1
+
+        try:
+            while True:
+                position = tokens.index(pattern[0], position + 1)
+
+                if tokens[position:position + len(pattern)] == pattern:
+                    return position
+        except ValueError:
+            return -1
+
+    def tokenize(self, string: str) -> tuple[str, ...]:
+        '''
+        Splits a string into nonterminal and terminal tokens.
+        '''
+
+        return tuple(self._token_pattern.findall(string))
+
+    def sentential_form(self, string: str) -> SententialForm:
+        '''
+        Returns the sentential form of a string.
+        '''
+
+        # Contexts may start with a terminal, so the form indexes the first token of every left-hand side.
+        return SententialForm(self.tokenize(string), self._pattern_heads)
+
+    def derive_random(self) -> str:
+        '''
+        Derives a random string from the initial production rule.
+        '''
+
+        form = self.sentential_form(self._initial_production_rule)
+
+        while not self.derive_random_form_step(form):
+            pass
+
+        return str(form)
+
+    def derive_random_form_step(self, form: SententialForm) -> bool:
         '''
-        Proccesses a step.
+        Proccesses a step in place on a sentential form. Returns true if no rule applies.
+
+        A rule is chosen among the ones that apply and one of its occurrences is replaced at random.
         '''
 
+        if form.is_irreducible:
+            return True
+
         possible_rules = []
 
-        for left_hand_side in self._production_rules:
-            if left_hand_side in string:
+        for left_hand_side, pattern in self._patterns.items():
+            occurrences = form.occurrences(pattern[0])
+
+            if len(occurrences) > 0 and (len(pattern) == 1 or
+                                         any(form.matches(node, pattern) for node in occurrences)):
                 possible_rules.append(left_hand_side)
 
+        if len(possible_rules) == 0:
+            return True
+
+        left_hand_side = choice(possible_rules)
+        pattern = self._patterns[left_hand_side]
+        nodes = form.occurrences(pattern[0])
+
+        if len(pattern) > 1:
+            nodes = [node for node in nodes if form.matches(node, pattern)]
+
+        form.replace(choice(nodes), len(pattern), choice(self._tokenized_rules[left_hand_side]))
+
+        return False
+
+    def derive_random_step(self, string: str) -> tuple[str, bool]:
+        '''
+        Proccesses a step, replacing the first occurrence of a random rule.
+        '''
+
+        # With one-character nonterminals every token is a character, so the string can be searched directly.
+        tokens = string if self._character_tokens else self.tokenize(string)
+        possible_rules = []
+
+        for left_hand_side, pattern in self._patterns.items():
+            position = string.find(left_hand_side) if self._character_tokens else Grammar.find(tokens, pattern)
+
+            if position >= 0:
+                possible_rules.append((left_hand_side, position))
+
         if len(possible_rules) > 0:
-            left_hand_side = choice(possible_rules)
-            return (string.replace(left_hand_side, self.random_replacement(left_hand_side), 1), False)
+            left_hand_side, position = choice(possible_rules)
+            prefix = tokens[:position]
+            suffix = tokens[position + len(self._patterns[left_hand_side]):]
+
+            if not self._character_tokens:
+                prefix = ''.join(prefix)
+                suffix = ''.join(suffix)
+
+            return (prefix + self.random_replacement(left_hand_side) + suffix, False)
 
         return (string, True)
 
-    def derive_branching_step(self, string: str) -> tuple[list[str], bool]:
+    def derive_branching_tokens(self, tokens: tuple[str, ...]) -> tuple[list[tuple[str, ...]], bool]:
         '''
-        Proccesses possible steps.
+        Proccesses possible steps on a tokenized string, replacing the first occurrence of each rule.
         '''
 
-        possible_rules = []
         possible_results = []
 
-        for left_hand_side in self._production_rules:
-            if left_hand_side in string:
-                possible_rules.append(left_hand_side)
+        for left_hand_side, pattern in self._patterns.items():
+            position = Grammar.find(tokens, pattern)
 
-        if len(possible_rules) == 0:
-            return ([string], True)
+            if position >= 0:
+                for replacement in self._tokenized_rules[left_hand_side]:
+                    possible_results.append(tokens[:position] + replacement + tokens[position + len(pattern):])
 
-        for possible_rule in possible_rules:
-            for possible_replacement in self.all_replacements(possible_rule):
-                possible_results.append(string.replace(possible_rule, possible_replacement, 1))
+        if len(possible_results) == 0:
+            return ([tokens], True)
 
         return (possible_results, False)
 
+    def derive_branching_step(self, string: str) -> tuple[list[str], bool]:
+        '''
+        Proccesses possible steps.
+        '''
+
+        possible_results, is_done = self.derive_branching_tokens(self.tokenize(string))
+
+        return ([''.join(possible_result) for possible_result in possible_results], is_done)
+
     def random_replacement(self, left_hand_side: str) -> str:
         '''
         Derives a step.
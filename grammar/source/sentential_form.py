@@ -0,0 +1,145 @@
+'''
+Sentential form.
+'''
+
+from typing import Iterable, Sequence
+
+
+class SententialForm():
+
+    '''
+    Sentential form stored as a doubly linked list of tokens.
+
+    Every node holding an indexed token, such as a nonterminal or the first token of a context, is indexed by
+    that token, so its occurrences are found without scanning the form. Replacing a node splices the replacement tokens into the list in place,
+    so a derivation step costs time proportional to the length of the replacement, not of the whole form.
+    Nodes 0 and 1 are sentinels for the start and the end of the form.
+    '''
+
+    HEAD = 0
+    TAIL = 1
+
+    _tokens: list[str]
+    _next: list[int]
+    _previous: list[int]
+    _slots: list[int]
+    _occurrences: dict[str, list[int]]
+    _indexed_count: int
+
+    def __init__(self, tokens: Sequence[str], indexed_tokens: Iterable[str]) -> None:
+        self._tokens = ['', '']
+        self._next = [SententialForm.TAIL, -1]
+        self._previous = [-1, SententialForm.HEAD]
+        self._slots = [-1, -1]
+        self._occurrences = {token: [] for token in indexed_tokens}
+        self._indexed_count = 0
+
+        self.insert(SententialForm.HEAD, tokens)
+
+    def __str__(self) -> str:
+        '''
+        Returns the form as a string.
+        '''
+
+        tokens = []
+        node = self._next[SententialForm.HEAD]
+
+        while node != SententialForm.TAIL:
+            tokens.append(self._tokens[node])
+            node = self._next[node]
+
+        return ''.join(tokens)
+
+    @property
+    def is_irreducible(self) -> bool:
+        '''
+        Returns true if the form has no indexed tokens, so no left-hand side occurs in it.
+        '''
+
+        return self._indexed_count == 0
+
+    def occurrences(self, token: str) -> list[int]:
+        '''
+        Returns the nodes where an indexed token occurs, in no particular order.
+
+        The list is the index itself and must not be modified.
+        '''
+
+        return self._occurrences.get(token, [])
+
+    def matches(self, node: int, pattern: Sequence[str]) -> bool:
+        '''
+        Returns true if the tokens starting at a node are the tokens of the pattern.
+        '''
+
+        for token in pattern:
+            if node == SententialForm.TAIL or self._tokens[node] != token:
+                return False
+
+            node = self._next[node]
+
+        return True
+
+    def replace(self, node: int, length: int, tokens: Sequence[str]) -> None:
+        '''
+        Replaces the `length` tokens starting at a node with new tokens.
+        '''
+
+        previous = self._previous[node]
+
+        for _ in range(length):
+            following = self._next[node]
+            self.remove(node)
+            node = following
+
+        self._next[previous] = node
+        self._previous[node] = previous
+
+        self.insert(previous, tokens)
+
+    def insert(self, previous: int, tokens: Sequence[str]) -> None:
+        '''
+        Inserts tokens after a node.
+        '''
+
+        following = self._next[previous]
+
+        for token in tokens:
+            node = len(self._tokens)
+            occurrences = self._occurrences.get(token)
+
+            self._tokens.append(token)
+            self._previous.append(previous)
+            self._next.append(following)
+            self._next[previous] = node
+            self._previous[following] = node
+
+            if occurrences is not None:
+                self._slots.append(len(occurrences))
+                occurrences.append(node)
+                self._indexed_count += 1
+            else:
+                self._slots.append(-1)
+
+            previous = node
+
+    def remove(self, node: int) -> None:
+        '''
+        Removes a node from the index of its token.
+
+        The node stays linked; `replace` relinks its neighbours.
+        '''
+
+        slot = self._slots[node]
+
+        if slot >= 0:
+            # The last occurrence takes the place of the removed one.
+            occurrences = self._occurrences[self._tokens[node]]
+            last_node = occurrences.pop()
+
+            if last_node != node:
+                occurrences[slot] = last_node
+                self._slots[last_node] = slot
+
+            self._slots[node] = -1
+            self._indexed_count -= 1
@@ -3,7 +3,9 @@ First list.
 '''
 
 import sys
+from json import loads
 from os.path import join
+from random import seed
 from typing import Callable
 from source.generator import Generator
 from source.grammar import Grammar
@@ -20,20 +22,24 @@ class Tests():
     def __init__(self, depth: int) -> None:
         self._depth = depth
 
-    def generate_strings(self, grammar_file: str) -> list[str]:
+    def load_grammar(self, grammar_file: str) -> Grammar:
         '''
-        Generates strings.
+        Loads a grammar.
         '''
 
         try:
             with open(grammar_file, 'r', encoding='utf-8') as file:
-                grammar = Grammar(file.read())
+                return Grammar(file.read())
         except (FileNotFoundError, ValueError) as error:
             print(error)
             sys.exit(1)
 
-        return Generator.generate_branches(grammar, self._depth)
+    def generate_strings(self, grammar_file: str) -> list[str]:
+        '''
+        Generates strings.
+        '''
 
+        return Generator.generate_branches(self.load_grammar(grammar_file), self._depth)
 
     def run_all(self) -> None:
         '''
@@ -46,6 +52,61 @@ class Tests():
             self.run(join('samples', f'list_{i}.txt'), lambda string: self.test_rule(string, i))
             print()
 
+    def run_all_derivations(self) -> None:
+        '''
+        Runs the tests.
+        '''
+
+        print('Running tests\n')
+
+        with open(join('tests', 'cases', 'derivations.json'), 'r', encoding='utf-8') as file:
+            derivations = loads(file.read())
+
+        for grammar_file, derivation in derivations.items():
+            self.run_derivation(grammar_file, derivation['depth'], derivation['branches'], derivation['random'])
+            print()
+
+    def run_derivation(self, grammar_file: str, depth: int, branches: list[str], random_strings: list[str]) -> None:
+        '''
+        Runs the tests. The expected strings are the ones derived by replacing substrings of the whole string, so
+        the derivations on tokens must produce the same strings: all of them up to `depth` steps and, for each
+        seed in order, the one derived by random steps. For the same seeds, the string derived at random on a
+        sentential form must have no nonterminals and no rule may apply to it.
+        '''
+
+        print(f'Running tests for {grammar_file}')
+
+        grammar = self.load_grammar(grammar_file)
+        passed = True
+        strings = Generator.generate_branches(grammar, depth)
+
+        if strings != branches:
+            passed = False
+            print(f'Compare:\n[Result  ]: {strings}\n[Expected]: {branches}')
+
+        for random_seed, expected in enumerate(random_strings):
+            seed(random_seed)
+            string, is_done = grammar.initial_production_rule, False
+
+            while not is_done:
+                string, is_done = grammar.derive_random_step(string)
+
+            if string != expected:
+                passed = False
+                print(f'Failed for seed {random_seed}: {string} (expected {expected})')
+
+        for random_seed in range(len(random_strings)):
+            seed(random_seed)
+            string = grammar.derive_random()
+            nonterminals = [token for token in grammar.tokenize(string) if token in grammar.nonterminals]
+
+            if len(nonterminals) > 0 or not grammar.derive_branching_step(string)[1]:
+                passed = False
+                print(f'Failed for seed {random_seed}: {string} can still be derived')
+
+        if passed:
+            print(f'{grammar_file} passed')
+
     def run(self, grammar_file: str, test_rule: Callable[[str], bool]) -> None:
         '''
         Runs the tests.